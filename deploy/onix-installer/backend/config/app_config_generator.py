@@ -12,11 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import functools
 import logging
 import os
-from typing import Dict, List
-
-import urllib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import AbstractSet, Dict, Iterable, List, Optional, Sequence
 
 from core.models import AppDeploymentRequest
 from core.constants import TERRAFORM_DIRECTORY, TEMPLATE_DIRECTORY, GENERATED_CONFIGS_DIR
@@ -32,27 +32,152 @@ SUBSCRIBER_CONFIG_TEMPLATE_NAME = "subscriber.yaml.j2"
 REGISTRY_ADMIN_CONFIG_TEMPLATE_NAME = "registry-admin.yaml.j2"
 TFVARS_TEMPLATE_NAME = "p2.tfvars.j2"
 
+# Context keys read by each template; a template is rendered with only these values.
+# Templates without an entry receive the full context.
+TEMPLATE_CONTEXT_KEYS = {
+    ADAPTER_CONFIG_TEMPLATE_NAME: frozenset({
+        "adapter", "adapter_modules", "adapter_topic_name", "project_id", "redis_instance_ip", "registry_url",
+    }),
+    GATEWAY_CONFIG_TEMPLATE_NAME: frozenset({
+        "gateway", "project_id", "redis_instance_ip", "registry_url",
+    }),
+    SUBSCRIBER_CONFIG_TEMPLATE_NAME: frozenset({
+        "onix_topic_name", "project_id", "redis_instance_ip", "registry", "registry_url",
+    }),
+    REGISTRY_CONFIG_TEMPLATE_NAME: frozenset({
+        "database_user_sa_email", "onix_topic_name", "project_id", "registry_database_name", "registry_db_connection_name",
+    }),
+    REGISTRY_ADMIN_CONFIG_TEMPLATE_NAME: frozenset({
+        "onix_topic_name", "project_id", "registry", "registry_admin_database_user_sa_email", "registry_database_name",
+        "registry_db_connection_name", "registry_url",
+    }),
+    TFVARS_TEMPLATE_NAME: frozenset({
+        "cluster_region", "dns_zone", "domain_list", "domains", "enable_auto_approver", "enable_subscriber",
+        "global_ip_address", "is_google_domain", "onix_topic_name", "project_id", "suffix", "url_map",
+    }),
+}
+
+# Adapter modules rendered into 'adapter.yaml' for each enabled role, in order.
+# The template reads each module's role and direction from its path.
+ADAPTER_MODULES_BY_ROLE = {
+    "bap": (
+        {"name": "bapTxnReceiver", "path": "/bap/receiver/"},
+        {"name": "bapTxnCaller", "path": "/bap/caller/"},
+    ),
+    "bpp": (
+        {"name": "bppTxnReceiver", "path": "/bpp/receiver/"},
+        {"name": "bppTxnCaller", "path": "/bpp/caller/"},
+    ),
+}
+
+# Upper bound on templates rendered concurrently by generate_app_configs.
+_MAX_TEMPLATE_WORKERS = 8
+
+# Container names of the services the installer deploys, matching their Helm chart names.
+_CONTAINER_NAMES = {
+    "adapter": "onix-adapter",
+    "gateway": "onix-gateway",
+    "registry": "onix-registry",
+    "registry_admin": "onix-registry-admin",
+    "subscriber": "onix-subscriber",
+}
+
+# Parsed infrastructure outputs keyed by 'outputs.json' path, stored with the file's mtime.
+_infra_cache: Dict[str, tuple[int, dict]] = {}
+
+# Parsed 'adapter.yaml' contents keyed by path, stored with the file's mtime.
+_adapter_config_cache: Dict[str, tuple[int, dict]] = {}
+
 def _should_deploy_adapter(components: dict) -> bool:
     """
     Determines if the adapter should be deployed based on the 'bap' or 'bpp' components.
     """
     return components.get("bap", False) or components.get("bpp", False)
 
+def get_adapter_modules(components: dict) -> List[dict]:
+    """
+    Returns the adapter modules (name and path) that 'adapter.yaml' is rendered with
+    for the given components.
+    """
+    return [
+        dict(module)
+        for role, modules in ADAPTER_MODULES_BY_ROLE.items()
+        if components.get(role, False)
+        for module in modules
+    ]
+
 def should_deploy_subscriber(components: dict) -> bool:
     """
     Determines if the subscriber should be deployed based on the 'bap', 'bpp', or 'gateway' components.
     """
     return components.get("bap", False) or components.get("bpp", False) or components.get("gateway", False)
 
+# Upper-cases ASCII letters and turns '-' into '_' in a single pass over a component key.
+_ENV_KEY_TRANSLATION = str.maketrans("abcdefghijklmnopqrstuvwxyz-", "ABCDEFGHIJKLMNOPQRSTUVWXYZ_")
+
+@functools.lru_cache(maxsize=64)
+def _env_key(key: str) -> str:
+    """
+    Returns the environment variable prefix for a component key, e.g. 'registry-admin' -> 'REGISTRY_ADMIN'.
+    """
+    return key.translate(_ENV_KEY_TRANSLATION)
+
+def invalidate_infra_cache():
+    """
+    Drops all cached infrastructure outputs so the next load re-reads 'outputs.json'.
+    """
+    _infra_cache.clear()
+
+def invalidate_adapter_config_cache():
+    """
+    Drops all cached 'adapter.yaml' contents so the next read re-parses the file.
+    """
+    _adapter_config_cache.clear()
+
+def _read_adapter_config(adapter_config_yaml_path: str) -> dict:
+    """
+    Reads the generated 'adapter.yaml', re-parsing it only when its modification time changes.
+    The returned dict is shared between callers and must not be mutated.
+    """
+    try:
+        mtime_ns = os.stat(adapter_config_yaml_path).st_mtime_ns
+    except OSError:
+        # Let the read below report the missing or unreadable file.
+        mtime_ns = None
+
+    cached = _adapter_config_cache.get(adapter_config_yaml_path)
+    if mtime_ns is not None and cached is not None and cached[0] == mtime_ns:
+        logger.debug("Using cached adapter config for %s", adapter_config_yaml_path)
+        return cached[1]
+
+    app_config_data = utils.read_yaml_file(adapter_config_yaml_path)
+    if mtime_ns is not None:
+        _adapter_config_cache[adapter_config_yaml_path] = (mtime_ns, app_config_data)
+    return app_config_data
+
 def _load_infrastructure_outputs(terraform_outputs_dir: str) -> dict:
     """
     Loads and returns infrastructure outputs from the 'outputs.json' file.
+    The parsed values are cached until the file's modification time changes.
     """
-    outputs_json_path = os.path.join(terraform_outputs_dir, "outputs.json")
+    outputs_json_path = f"{terraform_outputs_dir}{os.sep}outputs.json"
+    try:
+        mtime_ns = os.stat(outputs_json_path).st_mtime_ns
+    except OSError:
+        # Let the read below report the missing or unreadable file.
+        mtime_ns = None
+
+    cached = _infra_cache.get(outputs_json_path)
+    if mtime_ns is not None and cached is not None and cached[0] == mtime_ns:
+        logger.debug("Using cached infrastructure outputs for %s", outputs_json_path)
+        return cached[1]
+
     logger.info(f"Loading infrastructure outputs from {outputs_json_path}")
     try:
         raw_outputs = utils.read_json_file(outputs_json_path)
         infra_output_values = {k: v.get("value") for k, v in raw_outputs.items()}
+        if mtime_ns is not None:
+            _infra_cache[outputs_json_path] = (mtime_ns, infra_output_values)
         logger.info("Infrastructure outputs loaded successfully.")
         return infra_output_values
     except FileNotFoundError as e:
@@ -66,16 +191,20 @@ def _load_infrastructure_outputs(terraform_outputs_dir: str) -> dict:
         raise
 
 
-def _prepare_template_context(app_deployment_request: AppDeploymentRequest, infra_output_values: dict) -> dict:
+def _prepare_template_context(
+    app_deployment_request: AppDeploymentRequest,
+    infra_output_values: dict,
+    context_keys: Optional[AbstractSet[str]] = None
+) -> dict:
     """
     Prepares the context dictionary for Jinja2 template rendering.
+    Component configs are only serialized when their key is in context_keys (all of them when it is None).
     """
     iam_sa_suffix = ".gserviceaccount.com"
 
     logger.debug("Preparing Jinja2 template context for application configurations...")
     context = {
         "project_id": infra_output_values.get("project_id"),
-        "region": infra_output_values.get("cluster_region"),
         "cluster_region": infra_output_values.get("cluster_region"),
         "redis_instance_ip": infra_output_values.get("redis_instance_ip"),
         "onix_topic_name": infra_output_values.get("onix_topic_name"),
@@ -89,12 +218,8 @@ def _prepare_template_context(app_deployment_request: AppDeploymentRequest, infr
         "suffix": app_deployment_request.app_name,
         "registry_url": str(app_deployment_request.registry_url),
 
-        "adapter": app_deployment_request.adapter_config.model_dump() if app_deployment_request.adapter_config else {},
-        "registry": app_deployment_request.registry_config.model_dump(),
-        "gateway": app_deployment_request.gateway_config.model_dump() if app_deployment_request.gateway_config else {},
         "domains": app_deployment_request.domain_names,
-        "deploy_bap": app_deployment_request.components.get("bap", False),
-        "deploy_bpp": app_deployment_request.components.get("bpp", False),
+        "adapter_modules": get_adapter_modules(app_deployment_request.components),
 
         "url_map": infra_output_values.get("url_map", ""),
         "enable_subscriber": should_deploy_subscriber(app_deployment_request.components),
@@ -105,9 +230,39 @@ def _prepare_template_context(app_deployment_request: AppDeploymentRequest, infr
         "global_ip_address": infra_output_values.get("global_ip_address"),
         "domain_list": list(app_deployment_request.domain_names.values()),
     }
+    component_configs = {
+        "adapter": app_deployment_request.adapter_config,
+        "registry": app_deployment_request.registry_config,
+        "gateway": app_deployment_request.gateway_config,
+    }
+    for key, component_config in component_configs.items():
+        if context_keys is None or key in context_keys:
+            context[key] = component_config.model_dump(exclude_none=True) if component_config else {}
     logger.debug("Jinja2 template context prepared.")
     return context
 
+def _get_required_context_keys(template_j2_filenames: Iterable[str]) -> Optional[frozenset]:
+    """
+    Returns the context keys read by any of the given templates, or None if one of them
+    has no key set and needs the full context.
+    """
+    required_keys = set()
+    for template_j2_filename in template_j2_filenames:
+        context_keys = TEMPLATE_CONTEXT_KEYS.get(template_j2_filename)
+        if context_keys is None:
+            return None
+        required_keys |= context_keys
+    return frozenset(required_keys)
+
+def _build_template_context(template_context: dict, template_j2_filename: str) -> dict:
+    """
+    Returns the subset of the template context that the given template reads.
+    """
+    context_keys = TEMPLATE_CONTEXT_KEYS.get(template_j2_filename)
+    if context_keys is None:
+        return template_context
+    return {key: template_context[key] for key in context_keys}
+
 def _generate_file_from_template(
     template_source_dir: str,
     template_j2_filename: str,
@@ -115,37 +270,39 @@ def _generate_file_from_template(
     context: dict
 ):
     """
-    Helper function to render a Jinja2 template and write the content to a file.
+    Helper function to render a Jinja2 template straight into a file.
     """
     output_filename = template_j2_filename.replace('.j2', '')
     output_path = os.path.join(output_dir, output_filename)
 
     logger.info(f"Processing template: '{template_j2_filename}' -> '{output_path}'...")
     try:
-        rendered_content = utils.render_jinja_template(
+        utils.render_jinja_template_to_file(
             template_dir=template_source_dir,
             template_name=template_j2_filename,
-            context=context
+            context=context,
+            file_path=output_path
         )
-        utils.write_file_content(output_path, rendered_content)
-        logger.debug(f"Generated successfully: {output_path}")
+        logger.debug("Generated successfully: %s", output_path)
     except (FileNotFoundError, RuntimeError, IOError) as e:
         logger.error(f"Failed to generate '{output_filename}': {e}", exc_info=True)
         raise
 
 # Main Configuration Functions.
 
-def generate_app_configs(app_deployment_request: AppDeploymentRequest):
+def generate_app_configs(app_deployment_request: AppDeploymentRequest) -> List[dict]:
     """
     Generates application configuration YAML files based on the AppDeploymentRequest object
     and infrastructure outputs. Generates templates for selected components.
+
+    Returns the adapter modules written to 'adapter.yaml' (empty when the adapter is not
+    deployed), so callers can pass them to extract_final_urls instead of re-reading the file.
     """
     logger.info("Starting Application Configuration YAML Generation")
 
     try:
         # Loading infrastructure outputs.
         infra_output_values = _load_infrastructure_outputs(TERRAFORM_DIRECTORY)
-        template_context = _prepare_template_context(app_deployment_request, infra_output_values)
 
         os.makedirs(GENERATED_CONFIGS_DIR, exist_ok=True)
 
@@ -168,70 +325,86 @@ def generate_app_configs(app_deployment_request: AppDeploymentRequest):
 
         logger.info(f"Templates selected for generation: {list(templates_to_generate)}")
         template_source_dir = os.path.join(TEMPLATE_DIRECTORY, 'configs')
-        # Loop through templates and generate files.
-        for template_j2_filename in templates_to_generate:
-            _generate_file_from_template(
-                template_source_dir=template_source_dir,
-                template_j2_filename=template_j2_filename,
-                output_dir=GENERATED_CONFIGS_DIR,
-                context=template_context
-            )
+        generation_jobs = [
+            (template_source_dir, template_j2_filename, GENERATED_CONFIGS_DIR)
+            for template_j2_filename in templates_to_generate
+        ]
 
         tf_vars_output_dir = os.path.join(TERRAFORM_DIRECTORY, 'phase2')
         tf_template_source_dir = os.path.join(TEMPLATE_DIRECTORY, 'tf_configs')
-        _generate_file_from_template(
-            template_source_dir=tf_template_source_dir,
-            template_j2_filename=TFVARS_TEMPLATE_NAME,
-            output_dir=tf_vars_output_dir,
-            context=template_context
+        generation_jobs.append((tf_template_source_dir, TFVARS_TEMPLATE_NAME, tf_vars_output_dir))
+
+        template_context = _prepare_template_context(
+            app_deployment_request,
+            infra_output_values,
+            _get_required_context_keys(template_j2_filename for _, template_j2_filename, _ in generation_jobs)
         )
 
+        # Templates are independent of each other, so render and write them concurrently.
+        with ThreadPoolExecutor(max_workers=min(_MAX_TEMPLATE_WORKERS, len(generation_jobs))) as executor:
+            futures = [
+                executor.submit(
+                    _generate_file_from_template,
+                    template_source_dir=source_dir,
+                    template_j2_filename=template_j2_filename,
+                    output_dir=output_dir,
+                    context=_build_template_context(template_context, template_j2_filename)
+                )
+                for source_dir, template_j2_filename, output_dir in generation_jobs
+            ]
+            for future in as_completed(futures):
+                future.result() # Re-raises the first failure; the executor still waits for the other jobs.
+
     except (FileNotFoundError, ValueError, IOError, RuntimeError) as e:
         logger.critical(f"Critical Error during Application Configuration YAML Generation: {e}", exc_info=True)
         raise
 
     logger.info("Application Ccnfig YAML files generation completed")
+    return get_adapter_modules(app_deployment_request.components)
 
 
-def get_deployment_environment_variables(app_deployment_request: AppDeploymentRequest, services_to_deploy: List[str]) -> dict[str, str]:
+def get_deployment_environment_variables(app_deployment_request: AppDeploymentRequest, services_to_deploy: Sequence[str]) -> dict[str, str]:
     """
     Prepares environment variables needed for the deploy-app.sh script based on the
     AppDeploymentRequest.
+
+    services_to_deploy must already be in canonical (sorted) order; it is joined as-is.
     """
     logger.info("Preparing environment variables for deploy-app.sh...")
-    env_vars = {}
-
-    env_vars["DEPLOY_SERVICES"] = ",".join(sorted(services_to_deploy))
-    logger.debug(f"  DEPLOY_SERVICES environment variable set to: {env_vars['DEPLOY_SERVICES']}")
-
-    # Add Domain Names to environment variables if provided.
-    for key, domain in app_deployment_request.domain_names.items():
-        env_var_name = f"{key.upper().replace('-', '_')}_DOMAIN"
-        env_vars[env_var_name] = domain
-        logger.debug(f"  Setting ENV: {env_var_name}={domain}")
-
-    # Add Image URLs to environment variables if provided.
-    for key, url in app_deployment_request.image_urls.items():
-        env_var_name = f"{key.upper().replace('-', '_')}_IMAGE_URL"
-        env_vars[env_var_name] = url
-        logger.debug(f"  Setting ENV: {env_var_name}={url}")
-
-     # Add schema validation flag
-    if app_deployment_request.adapter_config and app_deployment_request.adapter_config.enable_schema_validation:
-        env_vars["ENABLE_SCHEMA_VALIDATION"] = "true"
-        logger.debug("  Setting ENV: ENABLE_SCHEMA_VALIDATION=true")
-    else:
-        env_vars["ENABLE_SCHEMA_VALIDATION"] = "false"
-        logger.debug("  Setting ENV: ENABLE_SCHEMA_VALIDATION=false")
+
+    # Add Domain Names and Image URLs to environment variables if provided.
+    domain_env_vars = {f"{_env_key(key)}_DOMAIN": domain for key, domain in app_deployment_request.domain_names.items()}
+    image_env_vars = {f"{_env_key(key)}_IMAGE_URL": url for key, url in app_deployment_request.image_urls.items()}
+    adapter_config = app_deployment_request.adapter_config
+    enable_schema_validation = "true" if adapter_config and adapter_config.enable_schema_validation else "false"
+
+    env_vars = {
+        "DEPLOY_SERVICES": ",".join(services_to_deploy),
+        **domain_env_vars,
+        **image_env_vars,
+        "ENABLE_SCHEMA_VALIDATION": enable_schema_validation,
+    }
+    if logger.isEnabledFor(logging.DEBUG):
+        for env_var_name, value in env_vars.items():
+            logger.debug("  Setting ENV: %s=%s", env_var_name, value)
 
     logger.info("Environment variables prepared for deploy-app.sh.")
     return env_vars
 
-def extract_final_urls(domain_names: Dict[str, str], services: List[str]) -> Dict[str, str]:
+def extract_final_urls(
+    domain_names: Dict[str, str],
+    services: List[str],
+    adapter_modules: Optional[List[dict]] = None
+) -> Dict[str, str]:
+    """
+    Builds the public URL of each service, plus one URL per adapter module.
+    Adapter modules are read from the generated 'adapter.yaml' unless adapter_modules
+    (as returned by generate_app_configs) is given.
+    """
 
     logger.info("Extracting final URLs for services...")
     service_urls = {}
-    logger.debug(f"Domain names provided: {domain_names}")
+    logger.debug("Domain names provided: %s", domain_names)
     for service_name in services:
         service_domain = domain_names.get(service_name)
 
@@ -241,24 +414,26 @@ def extract_final_urls(domain_names: Dict[str, str], services: List[str]) -> Dic
 
         url = f"https://{service_domain}"
         if service_name == "adapter":
-            service_urls[service_name] = url
-            adapter_config_yaml_path = os.path.join(GENERATED_CONFIGS_DIR, "adapter.yaml")
+            adapter_urls = {service_name: url}
+            service_urls.update(adapter_urls)
+            adapter_config_yaml_path = f"{GENERATED_CONFIGS_DIR}{os.sep}adapter.yaml"
 
             try:
-                app_config_data = utils.read_yaml_file(adapter_config_yaml_path)
+                if adapter_modules is None:
+                    app_config_data = _read_adapter_config(adapter_config_yaml_path)
+                else:
+                    app_config_data = {"modules": adapter_modules}
 
                 if 'modules' in app_config_data and isinstance(app_config_data['modules'], list):
+                    # The parsed modules are only read, never mutated, so they are iterated in place.
                     for module in app_config_data['modules']:
                         if isinstance(module, dict) and 'name' in module and 'path' in module:
-                            module_name = module['name']
-                            module_path = module['path']
-                            if url:
-                                combined_path = f"{url}/{module_path.lstrip('/')}"
-                                service_urls[f"adapter_{module_name}"] = combined_path
+                            adapter_urls[f"adapter_{module['name']}"] = f"{url}/{module['path'].lstrip('/')}"
+                    service_urls.update(adapter_urls)
                 else:
                     logger.warning(f"'modules' key not found or not a list in '{adapter_config_yaml_path}'. Cannot extract adapter module paths.")
 
-                logger.debug(f"Extracted adapter paths from '{adapter_config_yaml_path}': {service_urls}")
+                logger.debug("Extracted adapter paths from '%s': %s", adapter_config_yaml_path, adapter_urls)
 
             except FileNotFoundError:
                 logger.warning(f"Application config YAML for adapter not found at '{adapter_config_yaml_path}'. Skipping adapter module data extraction.")
@@ -269,7 +444,7 @@ def extract_final_urls(domain_names: Dict[str, str], services: List[str]) -> Dic
 
         else:
             service_urls[service_name] = url
-            logger.debug(f"Generated URL for {service_name}: {service_urls[service_name]}")
+            logger.debug("Generated URL for %s: %s", service_name, url)
 
     return service_urls
 
@@ -289,27 +464,28 @@ def generate_logs_explorer_urls(service_names: List[str]) -> Dict[str, str]:
         cluster_name = infra_output_values.get("cluster_name")
         cluster_region = infra_output_values.get("cluster_region")
 
-        for service_name in service_names:
-            container_name = f"onix-{service_name.replace('_', '-')}"
-            log_query_parts = [
-                f'resource.type="k8s_container"',
-                f'resource.labels.cluster_name="{cluster_name}"',
-                f'resource.labels.location="{cluster_region}"',
-                f'resource.labels.container_name="{container_name}"'
-            ]
-            log_query = "\n".join(log_query_parts)
+        # Only the container name differs between services, so the shared part of the query is encoded once.
+        common_query_parts = [
+            'resource.type="k8s_container"',
+            f'resource.labels.cluster_name="{cluster_name}"',
+            f'resource.labels.location="{cluster_region}"',
+            'resource.labels.container_name="',
+        ]
+        # Imported here so module import does not pay for urllib.parse on paths that never build these URLs.
+        from urllib.parse import quote
+        encoded_common_query = quote("\n".join(common_query_parts))
+
+        # Everything around the container name is fixed for this call; percent-encoding works
+        # character by character, so encoding the pieces separately yields the same URL.
+        url_head = f"https://console.cloud.google.com/logs/query;query={encoded_common_query}"
+        url_tail = f"%22;?project={project_id}"
 
-            # URL-encode the query string
-            encoded_log_query = urllib.parse.quote(log_query)
-
-            # Construct the full Logs Explorer URL
-            logs_explorer_url = (
-                f"https://console.cloud.google.com/logs/query;"
-                f"query={encoded_log_query};"
-                f"?project={project_id}"
-            )
+        for service_name in service_names:
+            container_name = _CONTAINER_NAMES.get(service_name) or f"onix-{service_name.replace('_', '-')}"
+            encoded_container_name = quote(container_name)
+            logs_explorer_url = "".join((url_head, encoded_container_name, url_tail))
             logs_explorer_urls[service_name] = logs_explorer_url
-            logger.debug(f"Generated Logs Explorer URL for {service_name}: {logs_explorer_url}")
+            logger.debug("Generated Logs Explorer URL for %s: %s", service_name, logs_explorer_url)
 
     except Exception as e:
         logger.warning(f"An error occurred while generating Logs Explorer URLs: {e}", exc_info=True)
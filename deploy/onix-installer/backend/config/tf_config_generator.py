@@ -25,6 +25,22 @@ logger = logging.getLogger(__name__)
 MAIN_CONFIG_TEMPLATE_NAME = "main_tfvars.tfvars.j2"
 OUTPUT_TFVARS_FILENAME = "generated-terraform.tfvars"
 
+def _prepare_template_context(deploy_infra_req: InfraDeploymentRequest) -> dict:
+    """
+    Builds the Jinja2 context for the main tfvars template from the infra deployment request.
+    The deployment size is included so conditional logic can be used within the template.
+    """
+    components = deploy_infra_req.components
+    return {
+        "project_id": deploy_infra_req.project_id,
+        "region": deploy_infra_req.region,
+        "suffix": deploy_infra_req.app_name,
+        "deployment_size": deploy_infra_req.type.value.lower(),
+        "provision_adapter_infra": components.get('bap', False) or components.get('bpp', False),
+        "provision_gateway_infra": components.get('gateway', False),
+        "provision_registry_infra": components.get('registry', False),
+    }
+
 def generate_config(deploy_infra_req: InfraDeploymentRequest):
     """
     Orchestrates the configuration generation process for Terraform.
@@ -38,18 +54,8 @@ def generate_config(deploy_infra_req: InfraDeploymentRequest):
     # Define the output directory and file for the generated tfvars.
     output_tfvars_path = os.path.join(TERRAFORM_DIRECTORY, OUTPUT_TFVARS_FILENAME)
 
-    # Prepare Jinja2 context from user overrides.
-    # The deployment_type is included so conditional logic can be used within the template.
-    jinja_context = {
-        "project_id": deploy_infra_req.project_id,
-        "region": deploy_infra_req.region,
-        "suffix": deploy_infra_req.app_name,
-        "deployment_size": deploy_infra_req.type.value.lower(),
-        "provision_adapter_infra": deploy_infra_req.components.get('bap', False) or deploy_infra_req.components.get('bpp', False),
-        "provision_gateway_infra": deploy_infra_req.components.get('gateway', False),
-        "provision_registry_infra": deploy_infra_req.components.get('registry', False),
-    }
-    logger.debug(f"Jinja2 context for Terraform: {jinja_context}")
+    jinja_context = _prepare_template_context(deploy_infra_req)
+    logger.debug("Jinja2 context for Terraform: %s", jinja_context)
 
     # Process the main terraform configuration template.
     logger.info(f"Processing main configuration template: '{MAIN_CONFIG_TEMPLATE_NAME}'...")
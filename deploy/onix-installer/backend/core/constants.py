@@ -15,8 +15,17 @@
 import os
 import re
 
-# Regex to clean ANSI escape codes from script output
-ANSI_ESCAPE_PATTERN = re.compile(r'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+# Regex to clean ANSI escape codes from script output.
+# Compiled as a bytes pattern so raw output can be cleaned before it is decoded.
+ANSI_ESCAPE_PATTERN = re.compile(rb'\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])')
+
+# Script output is sent to the frontend in batches: a batch is flushed once it holds
+# LOG_BATCH_MAX_LINES lines or LOG_BATCH_FLUSH_INTERVAL_SECONDS after its first line arrived.
+LOG_BATCH_MAX_LINES = 32
+LOG_BATCH_FLUSH_INTERVAL_SECONDS = 0.05
+
+# How long the list of Google Cloud regions is served from memory before gcloud is queried again.
+REGIONS_CACHE_TTL_SECONDS = 3600
 
 # Base directory of the application
 # Assumes this file is in backend/core and the root is 'backend'
@@ -13,16 +13,39 @@
 # limitations under the License.
 
 import asyncio
-import json
+import functools
 import logging
 import os
-from jinja2 import Environment, FileSystemLoader, TemplateNotFound
-import yaml
+import orjson
 
-from core.constants import ANSI_ESCAPE_PATTERN
+from core.constants import ANSI_ESCAPE_PATTERN, LOG_BATCH_FLUSH_INTERVAL_SECONDS, LOG_BATCH_MAX_LINES
 
 logger = logging.getLogger(__name__)
 
+# Buffer size for whole-file reads and writes, large enough to hold any config or outputs file.
+_IO_BUFFER_SIZE = 1 << 20
+
+# Output directories already created by write_file_content in this process.
+_ensured_dirs: set[str] = set()
+
+@functools.lru_cache(maxsize=8)
+def _get_env(template_dir: str):
+    """
+    Returns a Jinja2 Environment for the given template directory, created once and reused.
+    Templates are not edited while the installer runs, so auto-reload is disabled, every loaded
+    template stays cached for the life of the process, and compiled templates are also kept in a
+    bytecode cache that survives process restarts.
+    """
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader # Imported on first render only.
+    return Environment(
+        loader=FileSystemLoader(template_dir),
+        trim_blocks=True,
+        lstrip_blocks=True,
+        auto_reload=False,
+        cache_size=-1,
+        bytecode_cache=FileSystemBytecodeCache()
+    )
+
 def render_jinja_template(template_dir: str, template_name: str, context: dict) -> str:
     """
     Renders a Jinja2 template with the given context.
@@ -39,11 +62,11 @@ def render_jinja_template(template_dir: str, template_name: str, context: dict)
         FileNotFoundError: If the Jinja2 template is not found.
         RuntimeError: If an error occurs during template rendering.
     """
+    from jinja2 import TemplateNotFound
     try:
-        env = Environment(loader=FileSystemLoader(template_dir), trim_blocks=True, lstrip_blocks=True)
-        template = env.get_template(template_name)
+        template = _get_env(template_dir).get_template(template_name)
         rendered_content = template.render(context)
-        logger.debug(f"Successfully rendered template: '{template_name}' from '{template_dir}'")
+        logger.debug("Successfully rendered template: '%s' from '%s'", template_name, template_dir)
         return rendered_content
     except TemplateNotFound:
         logger.error(f"Jinja2 template not found: '{os.path.join(template_dir, template_name)}'")
@@ -54,6 +77,56 @@ def render_jinja_template(template_dir: str, template_name: str, context: dict)
         logger.exception(f"Error rendering template '{template_name}': {e}")
         raise RuntimeError(f"Error rendering template '{template_name}': {e}")
 
+def render_jinja_template_to_file(template_dir: str, template_name: str, context: dict, file_path: str):
+    """
+    Renders a Jinja2 template with the given context and streams the output into a file,
+    without building the whole rendered content in memory first.
+    Output goes to a temporary file that is moved into place once rendering succeeds,
+    so a failed render leaves any previous file untouched.
+
+    Args:
+        template_dir (str): The directory where the template file is located.
+        template_name (str): The name of the template file.
+        context (dict): A dictionary of variables to pass to the template.
+        file_path (str): The path of the file to write.
+
+    Raises:
+        FileNotFoundError: If the Jinja2 template is not found.
+        RuntimeError: If an error occurs during template rendering.
+        IOError: If the output file cannot be written.
+    """
+    from jinja2 import TemplateNotFound
+    tmp_file_path = f"{file_path}.tmp"
+    try:
+        template = _get_env(template_dir).get_template(template_name)
+        _ensure_dir(os.path.dirname(file_path))
+        with open(tmp_file_path, 'w', buffering=_IO_BUFFER_SIZE) as f:
+            template.stream(context).dump(f)
+        os.replace(tmp_file_path, file_path)
+        logger.info(f"Successfully rendered template '{template_name}' to file: '{file_path}'")
+    except TemplateNotFound:
+        logger.error(f"Jinja2 template not found: '{os.path.join(template_dir, template_name)}'")
+        raise FileNotFoundError(
+            f"Jinja2 template not found: '{os.path.join(template_dir, template_name)}'"
+        )
+    except OSError as e:
+        _remove_file_silently(tmp_file_path)
+        logger.exception(f"Error writing to file '{file_path}': {e}")
+        raise IOError(f"Error writing to file '{file_path}': {e}")
+    except Exception as e:
+        _remove_file_silently(tmp_file_path)
+        logger.exception(f"Error rendering template '{template_name}': {e}")
+        raise RuntimeError(f"Error rendering template '{template_name}': {e}")
+
+def _remove_file_silently(file_path: str):
+    """
+    Removes a file if it exists, ignoring any error.
+    """
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
 def read_file_content(file_path: str) -> str:
     """
     Reads and returns the entire content of a file as a string.
@@ -61,7 +134,7 @@ def read_file_content(file_path: str) -> str:
     try:
         with open(file_path, 'r') as f:
             content = f.read()
-        logger.debug(f"Successfully read content from file: '{file_path}'")
+        logger.debug("Successfully read content from file: '%s'", file_path)
         return content
     except FileNotFoundError:
         logger.error(f"File not found: '{file_path}'")
@@ -75,28 +148,40 @@ def read_json_file(file_path: str) -> dict:
     Reads and returns the content of a JSON file as a dictionary.
     """
     try:
-        with open(file_path, 'r') as f:
-            content = json.load(f)
-        logger.debug(f"Successfully read JSON from file: '{file_path}'")
+        with open(file_path, 'rb', buffering=_IO_BUFFER_SIZE) as f:
+            content = orjson.loads(f.read())
+        logger.debug("Successfully read JSON from file: '%s'", file_path)
         return content
     except FileNotFoundError:
         logger.error(f"JSON file not found: '{file_path}'")
         raise FileNotFoundError(f"JSON file not found: '{file_path}'")
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.error(f"Error decoding JSON from '{file_path}': {e}")
         raise ValueError(f"Error decoding JSON from '{file_path}': {e}")
     except IOError as e:
         logger.exception(f"Error reading JSON file '{file_path}': {e}")
         raise IOError(f"Error reading file '{file_path}': {e}")
 
+@functools.lru_cache(maxsize=1)
+def _yaml_safe_loader():
+    """
+    Returns the libyaml C safe loader, or the pure-Python one if PyYAML was built without libyaml.
+    Cached, so the missing-libyaml warning is logged at most once per process.
+    """
+    import yaml # Imported on first YAML read only.
+    if not getattr(yaml, "__with_libyaml__", False):
+        logger.warning("PyYAML was built without libyaml; falling back to the slower pure-Python YAML loader.")
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
 def read_yaml_file(file_path: str) -> dict:
     """
     Reads and returns the content of a YAML file as a dictionary.
     """
+    import yaml
     try:
-        with open(file_path, 'r') as f:
-            content = yaml.safe_load(f) # Use safe_load for security
-        logger.debug(f"Successfully read YAML from file: '{file_path}'")
+        with open(file_path, 'rb', buffering=_IO_BUFFER_SIZE) as f:
+            content = yaml.load(f.read(), Loader=_yaml_safe_loader()) # Safe loader only, for security
+        logger.debug("Successfully read YAML from file: '%s'", file_path)
         return content
     except FileNotFoundError:
         logger.error(f"YAML file not found: '{file_path}'")
@@ -108,34 +193,87 @@ def read_yaml_file(file_path: str) -> dict:
         logger.exception(f"Error reading YAML file '{file_path}': {e}")
         raise IOError(f"Error reading file '{file_path}': {e}")
 
+def _ensure_dir(dir_path: str):
+    """
+    Creates the directory if needed, once per directory for the lifetime of the process.
+    """
+    if dir_path not in _ensured_dirs:
+        os.makedirs(dir_path, exist_ok=True)
+        _ensured_dirs.add(dir_path)
+
 def write_file_content(file_path: str, content: str):
     """
     Writes content to a specified file, ensuring the directory exists.
     """
     try:
-        # Ensure the directory exists
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w') as f:
+        _ensure_dir(os.path.dirname(file_path))
+        with open(file_path, 'w', buffering=_IO_BUFFER_SIZE) as f:
             f.write(content)
         logger.info(f"Successfully wrote content to file: '{file_path}'")
     except IOError as e:
         logger.exception(f"Error writing to file '{file_path}': {e}")
         raise IOError(f"Error writing to file '{file_path}': {e}")
 
+@functools.lru_cache(maxsize=16)
+def _log_batch_prefix(stream_name: str) -> bytes:
+    """
+    Returns the serialized start of a 'log_batch' message for the given stream, up to the messages array.
+    """
+    return b'{"type":"log_batch","action":' + orjson.dumps(stream_name) + b',"messages":'
+
+async def _flush_log_batch(websocket, stream_name: str, raw_lines: list):
+    """
+    Cleans a batch of raw subprocess output lines and sends the non-empty ones
+    to the WebSocket as a single 'log_batch' message.
+    """
+    raw_chunk = b"".join(raw_lines)
+    # Clean ANSI escape codes over the raw chunk in one pass, skipping the regex when no ESC byte is present.
+    if b'\x1b' in raw_chunk:
+        raw_chunk = ANSI_ESCAPE_PATTERN.sub(b'', raw_chunk)
+    chunk = raw_chunk.decode(errors='replace')
+    messages = [cleaned_line for line in chunk.split("\n") if (cleaned_line := line.strip())]
+    if not messages: # Only send non-empty lines after cleaning.
+        return
+    # Only the messages array changes between batches; the rest of the frame is prebuilt per stream.
+    log_batch = b"".join((_log_batch_prefix(stream_name), orjson.dumps(messages), b"}"))
+    await websocket.send_text(log_batch.decode())
+    for message in messages:
+        logger.info(f"[{stream_name}] {message}")
+
 async def stream_subprocess_output(process: asyncio.subprocess.Process, websocket, stream_name: str):
     """
     Asynchronously streams output from a subprocess to the WebSocket.
-    This helper is common and efficient, so retaining it.
+    Lines are grouped into 'log_batch' messages, flushed when LOG_BATCH_MAX_LINES lines are
+    buffered or LOG_BATCH_FLUSH_INTERVAL_SECONDS after the first buffered line, whichever is first.
     """
-    if process.stdout:
-        while True:
+    if not process.stdout:
+        return
+
+    loop = asyncio.get_running_loop()
+    batch = []
+    flush_deadline = 0.0
+    while True:
+        if batch:
+            try:
+                line = await asyncio.wait_for(
+                    process.stdout.readline(), timeout=max(flush_deadline - loop.time(), 0)
+                )
+            except asyncio.TimeoutError:
+                # A cancelled readline leaves any partial line buffered in the stream reader.
+                await _flush_log_batch(websocket, stream_name, batch)
+                batch = []
+                continue
+        else:
             line = await process.stdout.readline()
-            if not line:
-                break
-            decoded_line = line.decode(errors='replace').strip()
-            # Clean ANSI escape codes before sending to frontend.
-            cleaned_line = ANSI_ESCAPE_PATTERN.sub('', decoded_line)
-            if cleaned_line: # Only send non-empty lines after cleaning.
-                log_message = {"type": "log", "action": stream_name, "message": cleaned_line}
-                await websocket.send_text(json.dumps(log_message))
-                logger.info(f"[{stream_name}] {cleaned_line}")
\ No newline at end of file
+
+        if not line:
+            break
+        if not batch:
+            flush_deadline = loop.time() + LOG_BATCH_FLUSH_INTERVAL_SECONDS
+        batch.append(line)
+        if len(batch) >= LOG_BATCH_MAX_LINES:
+            await _flush_log_batch(websocket, stream_name, batch)
+            batch = []
+
+    if batch:
+        await _flush_log_batch(websocket, stream_name, batch)
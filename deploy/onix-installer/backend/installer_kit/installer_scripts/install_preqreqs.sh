@@ -111,15 +111,15 @@ if [[ "$OS" == "linux" ]]; then
     if command -v apt-get &> /dev/null; then
         sudo add-apt-repository ppa:deadsnakes/ppa -y
         sudo apt-get update
-        sudo apt-get install -y python3.12 python3.12-venv python3.12-dev
+        sudo apt-get install -y python3.13 python3.13-venv python3.13-dev
     elif command -v yum &> /dev/null; then
-        sudo yum install -y python3.12
+        sudo yum install -y python3.13
     fi
 elif [[ "$OS" == "macOS" ]]; then
     if command -v brew &> /dev/null; then
         brew install pyenv
-        pyenv install 3.12.0
-        pyenv global 3.12.0
+        pyenv install 3.13.0
+        pyenv global 3.13.0
     fi
 fi
 
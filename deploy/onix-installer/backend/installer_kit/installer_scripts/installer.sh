@@ -240,9 +240,10 @@ if [ -d "$BACKEND_DIR" ] && [ -f "$BACKEND_DIR/main.py" ]; then
     (
         cd "$BACKEND_DIR" || exit 1 # Change to backend directory, exit if fails
 
-        # Create venv inside backend directory
+        # Create venv inside backend directory, preferring Python 3.13 when it is installed
         echo "Creating virtual environment in $BACKEND_DIR/venv..."
-        python3 -m venv venv
+        PYTHON_BIN="$(command -v python3.13 || command -v python3)"
+        "$PYTHON_BIN" -m venv venv
 
         # Activate venv
         echo "Activating virtual environment..."
@@ -258,7 +259,7 @@ if [ -d "$BACKEND_DIR" ] && [ -f "$BACKEND_DIR/main.py" ]; then
 
         echo "🔵 Starting backend server..."
         echo "View logs at $LOG_DIR/backend.log"
-        uvicorn main:app --reload > "$LOG_DIR/backend.log" 2>&1 &
+        MALLOC_ARENA_MAX=2 uvicorn main:app --reload --loop uvloop --http httptools --timeout-keep-alive 30 > "$LOG_DIR/backend.log" 2>&1 &
 
         # Store the PID of uvicorn for potential future use in cleanup if needed
         # (though pkill -f is generally sufficient)
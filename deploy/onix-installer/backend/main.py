@@ -12,14 +12,17 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
 import logging
 import sys
+from contextlib import asynccontextmanager
 from typing import Dict, Any
 import httpx
+import orjson
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Response, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
 
 from core.models import InfraDeploymentRequest, AppDeploymentRequest, ProxyRequest
 from services.gcp_resource_manager import list_google_cloud_projects, list_google_cloud_regions
@@ -27,14 +30,33 @@ from services.deployment_manager import run_infra_deployment, run_app_deployment
 from services import ui_state_manager as ui_state
 from services.health_checks import run_websocket_health_check
 
-logging.basicConfig(level=logging.DEBUG,
+logging.basicConfig(level=logging.INFO,
                     format='%(name)s - %(levelname)s - %(message)s',
                     handlers=[
                         logging.StreamHandler(sys.stdout)
                     ])
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled client for /api/dynamic-proxy, so repeat targets reuse open connections.
+    app.state.http_client = httpx.AsyncClient(
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+    # Shared by all health check websockets, so connections stay open between polling attempts.
+    # HTTP/2 lets probes to services behind the same host share one TLS connection.
+    app.state.health_client = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+    )
+    try:
+        yield
+    finally:
+        await app.state.http_client.aclose()
+        await app.state.health_client.aclose()
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -44,10 +66,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# The root response never changes, so its body is serialized once.
+_ROOT_RESPONSE_BODY = orjson.dumps({"message": "FastAPI deployment server is running"})
+
 @app.get("/root")
 def read_root():
     logger.info("Root endpoint accessed.")
-    return {"message": "FastAPI deployment server is running"}
+    return Response(content=_ROOT_RESPONSE_BODY, media_type="application/json")
 
 @app.get("/projects", response_model=list[str])
 async def get_projects():
@@ -90,26 +115,40 @@ async def get_regions():
             detail=f"An unexpected internal server error occurred: {e}"
         )
 
+async def _send_payload_validation_error(websocket: WebSocket, endpoint: str, error: ValidationError):
+    """
+    Reports a request payload that failed to parse or validate to the WebSocket client.
+    """
+    if any(detail["type"] == "json_invalid" for detail in error.errors()):
+        logger.error(f"Received invalid JSON payload from client for {endpoint}.")
+        await websocket.send_text(orjson.dumps({"type": "error", "message": "Invalid JSON payload."}).decode())
+        return
+    logger.error(f"Received invalid request payload from client for {endpoint}: {error}")
+    await websocket.send_text(orjson.dumps({
+        "type": "error",
+        "message": f"Invalid request payload: {error.error_count()} validation error(s).",
+        "errors": error.errors(include_url=False, include_context=False, include_input=False)
+    }).decode())
+
 @app.websocket("/ws/deployInfra")
 async def websocket_deploy_infra(websocket: WebSocket):
     await websocket.accept()
     logger.info("WebSocket connection established for /ws/deployInfra.")
     try:
-        data = await websocket.receive_json()
-        config = InfraDeploymentRequest(**data)
-        logger.info(f"Received infrastructure deployment request with payload: {config}.")
+        # The frontend sends JSON as text frames; parse and validate them in one step.
+        config = InfraDeploymentRequest.model_validate_json(await websocket.receive_text())
+        logger.info("Received infrastructure deployment request with payload: %s.", config)
 
         await run_infra_deployment(config, websocket)
 
     except WebSocketDisconnect:
         logger.info("Client disconnected from /ws/deployInfra.")
-    except json.JSONDecodeError:
-        logger.error("Received invalid JSON payload from client for /ws/deployInfra.")
-        await websocket.send_text(json.dumps({"type": "error", "message": "Invalid JSON payload."}))
+    except ValidationError as e:
+        await _send_payload_validation_error(websocket, "/ws/deployInfra", e)
     except Exception as e:
         error_message = f"An error occurred during infrastructure deployment: {str(e)}"
         logger.exception(error_message)
-        await websocket.send_text(json.dumps({"type": "error", "message": error_message}))
+        await websocket.send_text(orjson.dumps({"type": "error", "message": error_message}).decode())
     finally:
         # Check if websocket is still connected (State 1 means CONNECTED)
         if websocket.client_state == 1:
@@ -123,21 +162,19 @@ async def websocket_deploy_application(websocket: WebSocket):
     logger.info("WebSocket connection established for /ws/deployApp.")
 
     try:
-        app_request_payload = await websocket.receive_json()
-        app_deployment_request = AppDeploymentRequest(**app_request_payload)
-        logger.info(f"Received application deployment request with payload: {app_deployment_request}")
+        app_deployment_request = AppDeploymentRequest.model_validate_json(await websocket.receive_text())
+        logger.info("Received application deployment request with payload: %s", app_deployment_request)
 
         await run_app_deployment(app_deployment_request, websocket)
 
     except WebSocketDisconnect:
         logger.info("Client disconnected from /ws/deployApp.")
-    except json.JSONDecodeError:
-        logger.error("Received invalid JSON payload from client for /ws/deployApp.")
-        await websocket.send_text(json.dumps({"type": "error", "message": "Invalid JSON payload."}))
+    except ValidationError as e:
+        await _send_payload_validation_error(websocket, "/ws/deployApp", e)
     except Exception as e:
         error_message = f"An unexpected error occurred during application deployment: {str(e)}"
         logger.exception(error_message)
-        await websocket.send_text(json.dumps({"type": "error", "message": error_message}))
+        await websocket.send_text(orjson.dumps({"type": "error", "message": error_message}).decode())
     finally:
         # Check if websocket is still connected (State 1 means CONNECTED)
         if websocket.client_state == 1:
@@ -150,21 +187,21 @@ async def websocket_health_check(websocket: WebSocket):
     await websocket.accept()
     logger.info("WebSocket connection established for /ws/healthCheck.")
     try:
-        service_urls_to_check: Dict[str, str] = await websocket.receive_json()
-        logger.info(f"Received health check request for services: {list(service_urls_to_check.keys())}.")
-        await run_websocket_health_check(websocket, service_urls_to_check)
+        service_urls_to_check: Dict[str, str] = orjson.loads(await websocket.receive_text())
+        logger.info("Received health check request for services: %s.", list(service_urls_to_check))
+        await run_websocket_health_check(websocket, service_urls_to_check, websocket.app.state.health_client)
     except WebSocketDisconnect:
         logger.info("Client disconnected from /ws/healthCheck.")
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         logger.error("Received invalid JSON from client for healthCheck. Expected a dictionary of serviceName: serviceUrl strings.")
-        await websocket.send_text(json.dumps({
+        await websocket.send_text(orjson.dumps({
             "type": "error",
             "message": "Invalid JSON received. Expected a dictionary of serviceName: serviceUrl strings."
-        }))
+        }).decode())
     except Exception as e:
         error_message = f"An unexpected error occurred during health check: {str(e)}"
         logger.exception(error_message)
-        await websocket.send_text(json.dumps({"type": "error", "message": error_message}))
+        await websocket.send_text(orjson.dumps({"type": "error", "message": error_message}).decode())
     finally:
         # Check if websocket is still connected (State 1 means CONNECTED)
         if websocket.client_state == 1:
@@ -174,74 +211,86 @@ async def websocket_health_check(websocket: WebSocket):
 
 
 @app.post("/store/bulk", status_code=201)
-def store_or_update_values(items: Dict[str, Any]) -> Dict[str, Any]:
+def store_or_update_values(items: Dict[str, Any]) -> ORJSONResponse:
     """
     Accepts a dictionary of key-value pairs for bulk storage/update in ui_state.json.
     Args:
         items (Dict[str, Any]): A dictionary where keys are strings and values can be of any type.
     Returns:
-        Dict[str, Any]: A confirmation message along with the data that was processed.
+        ORJSONResponse: A confirmation message along with the data that was processed.
     """
-    logger.info(f"Received request for bulk store/update of data. Keys: {list(items.keys())}")
+    keys = list(items)
+    logger.info("Received request for bulk store/update of data. Keys: %s", keys)
     try:
         ui_state.store_bulk_values(items)
-        logger.info(f"Successfully stored/updated bulk data for keys: {list(items.keys())}")
-        return {
-            "message": "Data stored or updated successfully",
-            "processed_data": items
-        }
+        logger.info("Successfully stored/updated bulk data for keys: %s", keys)
+        # Returned as a response directly so the already JSON-compatible body skips FastAPI's encoder.
+        return ORJSONResponse(
+            content={
+                "message": "Data stored or updated successfully",
+                "processed_data": items
+            },
+            status_code=201
+        )
     except Exception as e:
-        logger.error(f"Failed to perform bulk store/update for keys {list(items.keys())}: {e}")
+        logger.error(f"Failed to perform bulk store/update for keys {keys}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to store bulk data: {e}")
 
 
 @app.get("/store")
-def get_all_stored_data() -> Dict[str, Any]:
+def get_all_stored_data() -> ORJSONResponse:
     """
     Retrieves all key-value pairs from ui_state.json.
     Returns:
-        Dict[str, Any]: A dictionary containing all the stored data.
+        ORJSONResponse: A dictionary containing all the stored data.
     """
     logger.info("Received request to retrieve all stored data.")
     try:
         data_store = ui_state.load_all_data()
         logger.info("Successfully retrieved all stored data.")
-        return data_store
+        return ORJSONResponse(content=data_store)
     except Exception as e:
         logger.error(f"Failed to retrieve all stored data: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to retrieve data: {e}")
 
 
 @app.post("/api/dynamic-proxy")
-async def dynamic_proxy(request: ProxyRequest) -> Any:
+async def dynamic_proxy(request: ProxyRequest) -> Response:
     """
     Forwards a POST request to a specified target URL with a given payload.
     Args:
         request (ProxyRequest): A request object containing the target URL and the payload.
     Returns:
-        Any: The Text response from the target URL.
+        Response: The raw response body, status code and content type from the target URL.
     """
     target_url = request.targetUrl
     payload = request.payload
 
     logger.info(f"Forwarding request to: {target_url}")
 
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(target_url, json=payload, timeout=10.0)
-            response.raise_for_status()
-            # todo : send response.status_code as well
-            return response.content
-        except httpx.HTTPStatusError as exc:
-            logger.error(f"HTTP error occurred: {exc.response.status_code} - {exc.response.text}")
-            raise HTTPException(
-                status_code=exc.response.status_code,
-                detail=exc.response.text
-            )
-        except Exception as e:
-            logger.error(f"An unexpected error occurred: {e}")
-            raise HTTPException(
-                status_code=500,
-                detail="An internal server error occurred."
-            )
+    try:
+        response = await app.state.http_client.post(
+            target_url,
+            content=orjson.dumps(payload),
+            headers={"content-type": "application/json"},
+            timeout=10.0
+        )
+        response.raise_for_status()
+        return Response(
+            content=response.content,
+            status_code=response.status_code,
+            media_type=response.headers.get("content-type")
+        )
+    except httpx.HTTPStatusError as exc:
+        logger.error(f"HTTP error occurred: {exc.response.status_code} - {exc.response.text}")
+        raise HTTPException(
+            status_code=exc.response.status_code,
+            detail=exc.response.text
+        )
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="An internal server error occurred."
+        )
 
@@ -13,10 +13,11 @@
 # limitations under the License.
 
 import asyncio
-import json
 import logging
 import os
 from typing import List
+
+import orjson
 import core.utils as utils
 from core.models import InfraDeploymentRequest, AppDeploymentRequest
 from core.constants import INFRA_SCRIPT_PATH, APP_SCRIPT_PATH, TERRAFORM_DIRECTORY, ANSI_ESCAPE_PATTERN
@@ -25,6 +26,14 @@ import config.app_config_generator as app_config
 
 logger = logging.getLogger(__name__)
 
+# Fixed progress messages, serialized once at import.
+_TF_CONFIG_GENERATING_MESSAGE = orjson.dumps({"type": "info", "message": "Generating Terraform configurations..."}).decode()
+_TF_CONFIG_GENERATED_MESSAGE = orjson.dumps({"type": "info", "message": "Terraform configurations generated successfully."}).decode()
+_INFRA_SCRIPT_STARTING_MESSAGE = orjson.dumps({"type": "info", "message": "Executing infrastructure deployment script..."}).decode()
+_APP_CONFIG_GENERATING_MESSAGE = orjson.dumps({"type": "info", "message": "Generating application configurations..."}).decode()
+_APP_CONFIG_GENERATED_MESSAGE = orjson.dumps({"type": "info", "message": "Application configurations generated successfully."}).decode()
+_APP_SCRIPT_STARTING_MESSAGE = orjson.dumps({"type": "info", "message": "Executing application deployment script..."}).decode()
+
 async def run_infra_deployment(config: InfraDeploymentRequest, websocket):
     """
     Generates Terraform configurations and executes the infrastructure deployment script.
@@ -32,19 +41,19 @@ async def run_infra_deployment(config: InfraDeploymentRequest, websocket):
     """
     logger.info(f"Initiating infrastructure deployment for project: {config.project_id}, region: {config.region}")
 
-    await websocket.send_text(json.dumps({"type": "info", "message": "Generating Terraform configurations..."}))
+    await websocket.send_text(_TF_CONFIG_GENERATING_MESSAGE)
     try:
         # Calling generate_config() to populate/process the terraform.tfvars file.
         tf_config.generate_config(config)
-        await websocket.send_text(json.dumps({"type": "info", "message": "Terraform configurations generated successfully."}))
+        await websocket.send_text(_TF_CONFIG_GENERATED_MESSAGE)
         logger.info("Terraform configurations generated successfully.")
     except Exception as e:
         error_message = f"Failed to generate Terraform configurations: {e}"
         logger.error(error_message, exc_info=True)
-        await websocket.send_text(json.dumps({"type": "error", "message": error_message}))
+        await websocket.send_text(orjson.dumps({"type": "error", "message": error_message}).decode())
         return # Exit if config generation fails.
 
-    await websocket.send_text(json.dumps({"type": "info", "message": "Executing infrastructure deployment script..."}))
+    await websocket.send_text(_INFRA_SCRIPT_STARTING_MESSAGE)
     logger.info(f"Executing infrastructure deployment script: {INFRA_SCRIPT_PATH}")
 
     # Prepare the command to run the infrastructure deployment script.
@@ -70,79 +79,78 @@ async def run_infra_deployment(config: InfraDeploymentRequest, websocket):
         if return_code == 0:
             outputs_json_path = os.path.join(TERRAFORM_DIRECTORY, "outputs.json")
             try:
-                with open(outputs_json_path, "r") as f:
-                    outputs_data = json.load(f)
-                
-                logger.info(f"Successfully loaded outputs.json: {outputs_data}")
-                await websocket.send_text(json.dumps({
+                outputs_data = utils.read_json_file(outputs_json_path)
+
+                logger.info("Successfully loaded outputs.json: %s", outputs_data)
+                await websocket.send_text(orjson.dumps({
                     "type": "success",
                     "message": outputs_data
-                }))
+                }).decode())
                 logger.info("Successfully sent outputs.json content to client.")
             except FileNotFoundError:
                 error_msg = f"Error: outputs.json not found at {outputs_json_path}"
                 logger.error(error_msg)
-                await websocket.send_text(json.dumps({"type": "error", "message": error_msg}))
-            except json.JSONDecodeError:
+                await websocket.send_text(orjson.dumps({"type": "error", "message": error_msg}).decode())
+            except ValueError:
                 error_msg = f"Error: Could not decode outputs.json at {outputs_json_path}"
                 logger.error(error_msg)
-                await websocket.send_text(json.dumps({"type": "error", "message": error_msg}))
+                await websocket.send_text(orjson.dumps({"type": "error", "message": error_msg}).decode())
         else:
-            await websocket.send_text(json.dumps({
+            await websocket.send_text(orjson.dumps({
                 "type": "error",
                 "message": f"Script failed with exit code: {return_code}"
-            }))
+            }).decode())
 
     except FileNotFoundError:
         error_message = f"Infrastructure deployment script not found at: {INFRA_SCRIPT_PATH}"
         logger.error(error_message)
-        await websocket.send_text(json.dumps({"type": "error", "message": error_message}))
+        await websocket.send_text(orjson.dumps({"type": "error", "message": error_message}).decode())
     except Exception as e:
         error_message = f"An error occurred during infrastructure deployment: {str(e)}"
         logger.exception(error_message)
-        await websocket.send_text(json.dumps({"type": "error", "message": error_message}))
+        await websocket.send_text(orjson.dumps({"type": "error", "message": error_message}).decode())
 
 def _get_services_to_deploy(app_deployment_request: AppDeploymentRequest) -> List[str]:
     """
     Calculates and returns a sorted list of services to be deployed based on the
     AppDeploymentRequest components.
     """
-    services_to_deploy = set()
-
-    if app_deployment_request.components.get("bap", False) or app_deployment_request.components.get("bpp", False):
-        services_to_deploy.add("adapter")
-    if app_deployment_request.components.get("gateway", False):
-        services_to_deploy.add("gateway")
-    if app_deployment_request.components.get("registry", False):
-        services_to_deploy.add("registry")
-        services_to_deploy.add("registry_admin")
-    if app_config.should_deploy_subscriber(app_deployment_request.components):
-        services_to_deploy.add("subscriber")
-    sorted_services = sorted(list(services_to_deploy))
-    logger.debug(f"Determined services to deploy: {sorted_services}")
-    return sorted_services
+    components = app_deployment_request.components
+    # Services are appended in sorted order, so the list needs no sorting afterwards.
+    services_to_deploy = []
+
+    if components.get("bap", False) or components.get("bpp", False):
+        services_to_deploy.append("adapter")
+    if components.get("gateway", False):
+        services_to_deploy.append("gateway")
+    if components.get("registry", False):
+        services_to_deploy.append("registry")
+        services_to_deploy.append("registry_admin")
+    if app_config.should_deploy_subscriber(components):
+        services_to_deploy.append("subscriber")
+    logger.debug("Determined services to deploy: %s", services_to_deploy)
+    return services_to_deploy
 
 async def run_app_deployment(app_deployment_request: AppDeploymentRequest, websocket):
     """
     Generates application configurations and executes the application deployment script.
     Mimics the logic from the provided main.py.
     """
-    logger.info(f"Initiating application deployment with payload: {app_deployment_request}")
+    logger.info("Initiating application deployment with payload: %s", app_deployment_request)
 
-    await websocket.send_text(json.dumps({"type": "info", "message": "Generating application configurations..."}))
+    await websocket.send_text(_APP_CONFIG_GENERATING_MESSAGE)
     try:
-        app_config.generate_app_configs(app_deployment_request)
+        adapter_modules = app_config.generate_app_configs(app_deployment_request)
         logger.info("Application configuration YAMLs generated successfully.")
-        await websocket.send_text(json.dumps({"type": "info", "message": "Application configurations generated successfully."}))
+        await websocket.send_text(_APP_CONFIG_GENERATED_MESSAGE)
 
         services = _get_services_to_deploy(app_deployment_request)
     
         env_vars_for_script = app_config.get_deployment_environment_variables(app_deployment_request, services)
         logger.info("Environment variables for app script prepared.")
         
-        # Combine generated environment variables with current process environment.
-        subprocess_env = os.environ.copy()
-        subprocess_env.update(env_vars_for_script)
+        # Combine generated environment variables with the current process environment in a single merge.
+        subprocess_env = os.environ | env_vars_for_script
 
         # Prepare and Run the deploy-app.sh shell script
         shell_command = [
@@ -150,7 +158,7 @@ async def run_app_deployment(app_deployment_request: AppDeploymentRequest, webso
             APP_SCRIPT_PATH
         ]
 
-        await websocket.send_text(json.dumps({"type": "info", "message": "Executing application deployment script..."}))
+        await websocket.send_text(_APP_SCRIPT_STARTING_MESSAGE)
         logger.info(f"Executing application deployment script: {APP_SCRIPT_PATH}")
 
         subprocess_handle = await asyncio.create_subprocess_exec(
@@ -168,20 +176,13 @@ async def run_app_deployment(app_deployment_request: AppDeploymentRequest, webso
 
         # Handle Script Result.
         if return_code == 0:
-            log_exploer_urls = app_config.generate_logs_explorer_urls(services)
-
-            service_urls = app_config.extract_final_urls(app_deployment_request.domain_names, services)
-            logger.info(json.dumps({
-                "type": "success",
-                "action": "app_deploy_complete",
-                "message": "Application deployment successful!",
-                "data": {
-                    "service_urls": service_urls,
-                    "services_deployed": services,
-                    "logs_explorer_urls": log_exploer_urls,
-                }
-            }))
-            await websocket.send_text(json.dumps({
+            # Both lookups are independent; run them off the event loop concurrently.
+            # gather() re-raises the original exception, which the handlers below rely on.
+            log_exploer_urls, service_urls = await asyncio.gather(
+                asyncio.to_thread(app_config.generate_logs_explorer_urls, services),
+                asyncio.to_thread(app_config.extract_final_urls, app_deployment_request.domain_names, services, adapter_modules)
+            )
+            success_message = orjson.dumps({
                 "type": "success",
                 "action": "app_deploy_complete",
                 "message": "Application deployment successful!",
@@ -190,19 +191,23 @@ async def run_app_deployment(app_deployment_request: AppDeploymentRequest, webso
                     "services_deployed": services,
                     "logs_explorer_urls": log_exploer_urls,
                 }
-            }))
+            }).decode()
+            logger.info("Application deployment successful; sending %d-byte completion message.", len(success_message))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(success_message)
+            await websocket.send_text(success_message)
         else:
-            await websocket.send_text(json.dumps({
+            await websocket.send_text(orjson.dumps({
                 "type": "error",
                 "action": "app_deploy_failed",
                 "message": f"Application deployment script failed with exit code: {return_code}. Check logs above for details."
-            }))
+            }).decode())
 
     except FileNotFoundError as e:
         error_message = f"Error generating application configs: Required outputs.json not found or script not found: {str(e)}. Ensure infrastructure is deployed."
         logger.error(error_message)
-        await websocket.send_text(json.dumps({"type": "error", "action": "app_config_error", "message": error_message}))
+        await websocket.send_text(orjson.dumps({"type": "error", "action": "app_config_error", "message": error_message}).decode())
     except Exception as e:
         error_message = f"An unexpected error occurred during app deployment: {str(e)}"
         logger.exception(error_message)
-        await websocket.send_text(json.dumps({"type": "error", "action": "app_deploy_exception", "message": error_message}))
+        await websocket.send_text(orjson.dumps({"type": "error", "action": "app_deploy_exception", "message": error_message}).decode())
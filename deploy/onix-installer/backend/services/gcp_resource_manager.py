@@ -13,34 +13,44 @@
 # limitations under the License.
 
 import asyncio
-import json
 import logging
 import subprocess
-from typing import List
+import time
+from typing import List, Optional
 
+import orjson
 from fastapi import HTTPException
 from google.auth.exceptions import GoogleAuthError
 from google.cloud import resourcemanager_v3
 
+from core.constants import REGIONS_CACHE_TTL_SECONDS
+
 logger = logging.getLogger(__name__)
 
+# Region names from the last successful gcloud call, with the monotonic time they expire at.
+_regions_cache: Optional[tuple[float, List[str]]] = None
+_regions_lock = asyncio.Lock()
+
+def clear_regions_cache():
+    """
+    Drops the cached region list so the next call queries gcloud again.
+    """
+    global _regions_cache
+    _regions_cache = None
+
 async def list_google_cloud_projects() -> List[str]:
     """
     Lists all Google Cloud projects accessible by the authenticated user/service account.
     Mimics the logic from the provided main.py using google-cloud-resource-manager library.
     """
-    project_ids = []
     try:
-        client = resourcemanager_v3.ProjectsClient()
-
-        request = resourcemanager_v3.SearchProjectsRequest()
-        project_pager = client.search_projects(request=request)
+        # The async client fetches result pages without blocking the event loop.
+        async with resourcemanager_v3.ProjectsAsyncClient() as client:
+            request = resourcemanager_v3.SearchProjectsRequest()
+            project_pager = await client.search_projects(request=request)
 
-        for project in project_pager:
-            project_ids.append(project.project_id)
-
-        # Sort the list for consistent output.
-        project_ids.sort()
+            # Sort the list for consistent output.
+            project_ids = sorted([project.project_id async for project in project_pager])
         logger.info(f"Successfully retrieved {len(project_ids)} Google Cloud projects.")
         return project_ids
 
@@ -62,20 +72,40 @@ async def list_google_cloud_regions() -> List[str]:
     """
     Lists all available Google Cloud regions for Compute Engine using the gcloud CLI.
     Mimics the logic from the provided main.py using subprocess.
+    Successful results are cached for REGIONS_CACHE_TTL_SECONDS; concurrent callers
+    wait for a single gcloud call instead of each starting their own.
+    """
+    global _regions_cache
+    async with _regions_lock:
+        if _regions_cache is not None and time.monotonic() < _regions_cache[0]:
+            logger.debug("Returning cached Google Cloud regions.")
+            return list(_regions_cache[1])
+
+        region_names = await _fetch_google_cloud_regions()
+        _regions_cache = (time.monotonic() + REGIONS_CACHE_TTL_SECONDS, region_names)
+        return list(region_names)
+
+async def _fetch_google_cloud_regions() -> List[str]:
+    """
+    Runs 'gcloud compute regions list' and returns the region names.
     """
     logger.info("Listing Google Cloud regions using gcloud CLI...")
     try:
         command = ["gcloud", "compute", "regions", "list", "--format=json"]
 
-        result = await asyncio.to_thread(
-            subprocess.run,
-            command,
-            capture_output=True,
-            text=True,
-            check=True
+        # Run gcloud as an asyncio subprocess so no worker thread is held while it runs.
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
+        stdout, stderr = await process.communicate()
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(
+                process.returncode, command, output=stdout, stderr=stderr.decode(errors="replace")
+            )
 
-        regions_data = json.loads(result.stdout)
+        regions_data = orjson.loads(stdout)
         region_names = [region['name'] for region in regions_data]
         logger.info(f"Successfully retrieved {len(region_names)} Google Cloud regions via gcloud CLI.")
         return region_names
@@ -88,7 +118,7 @@ async def list_google_cloud_regions() -> List[str]:
         error_msg = f"An error occurred while executing the gcloud command. Stderr: {e.stderr}"
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         error_msg = "Error: Could not parse the JSON output from the gcloud command."
         logger.error(error_msg)
         raise HTTPException(status_code=500, detail=error_msg)
@@ -13,167 +13,342 @@
 # limitations under the License.
 
 import asyncio
-import json
+import contextlib
 import logging
-from typing import Dict
+import random
+import time
+from typing import Any, Dict, Optional, Tuple
 import httpx
+import orjson
 
 logger = logging.getLogger(__name__)
 
 class HealthCheckConstants:
     HEALTH_CHECK_URL_SUFFIX: str = "/health"
     HEALTH_CHECK_TIMEOUT_SECONDS: int = 15 * 60 # 15 minutes total timeout
-    HEALTH_CHECK_ATTEMPT_DELAY_SECONDS: int = 10 # Seconds between polls
+    HEALTH_CHECK_ATTEMPT_DELAY_SECONDS: int = 10 # Seconds before the first retry
+    HEALTH_CHECK_BACKOFF_FACTOR: float = 1.5 # Growth of the delay after each failed attempt
+    HEALTH_CHECK_MAX_ATTEMPT_DELAY_SECONDS: int = 60 # Upper bound on the delay before jitter
+    HEALTH_CHECK_MAX_JITTER_SECONDS: float = 5.0 # Random spread so concurrent checks do not poll in lockstep
+    HEALTH_CHECK_CACHE_TTL_SECONDS: float = 5.0 # How long a probe result is reused across websockets
+    HEALTH_CHECK_MAX_SERVICES: int = 64 # Largest service map accepted in one request
+    HEALTH_CHECK_MAX_CONCURRENT_PROBES: int = 32 # Probes in flight at once for one request
 
 
+# Fixed frames are serialized once at import.
+_INVALID_PAYLOAD_MESSAGE = orjson.dumps({
+    "type": "error",
+    "message": "Invalid payload format. Expected a dictionary of serviceName: serviceUrl strings."
+}).decode()
+_STARTING_MESSAGE = orjson.dumps({
+    "type": "info",
+    "message": "Starting health checks for provided service URLs..."
+}).decode()
+_NO_SERVICES_MESSAGE = orjson.dumps({
+    "type": "warning",
+    "message": "No service URLs provided for health check. Health check skipped."
+}).decode()
+
+# Health URL -> (HTTP status code, monotonic time the response arrived), oldest first.
+_health_cache: Dict[str, Tuple[int, float]] = {}
+# Health URL -> probe currently awaiting a response, shared by every check of that URL.
+_inflight_probes: Dict[str, asyncio.Task] = {}
+# Probe -> number of checks currently waiting on it.
+_probe_waiters: Dict[asyncio.Task, int] = {}
+
+def clear_health_cache():
+    """
+    Drops all cached probe results so the next checks go to the network.
+    """
+    _health_cache.clear()
+    _inflight_probes.clear()
+    _probe_waiters.clear()
+
+def _health_cache_ttl() -> float:
+    return min(HealthCheckConstants.HEALTH_CHECK_CACHE_TTL_SECONDS, HealthCheckConstants.HEALTH_CHECK_ATTEMPT_DELAY_SECONDS)
+
+def _cache_health_status(health_url: str, status_code: int, now: float):
+    """
+    Stores a probe result and drops the entries that have expired, so URLs that are
+    no longer checked do not stay in the cache.
+    """
+    # Re-inserting keeps the cache ordered by arrival time, so expired entries are at the front.
+    _health_cache.pop(health_url, None)
+    _health_cache[health_url] = (status_code, now)
+    ttl = _health_cache_ttl()
+    while _health_cache:
+        oldest_url = next(iter(_health_cache))
+        if now - _health_cache[oldest_url][1] < ttl:
+            break
+        del _health_cache[oldest_url]
+
+async def _probe_health_url(health_url: str, client: httpx.AsyncClient) -> int:
+    # HEAD skips the response body; services that do not allow it are probed with GET instead.
+    response = await client.head(health_url)
+    if response.status_code == 405:
+        response = await client.get(health_url)
+    _cache_health_status(health_url, response.status_code, time.monotonic())
+    return response.status_code
+
+def _forget_inflight_probe(health_url: str, probe: asyncio.Task):
+    if _inflight_probes.get(health_url) is probe:
+        del _inflight_probes[health_url]
+    _probe_waiters.pop(probe, None)
+    if not probe.cancelled():
+        # Marks a failure as retrieved even if every waiter went away.
+        probe.exception()
+
+async def _get_health_status_code(health_url: str, client: httpx.AsyncClient) -> int:
+    """
+    Returns the HTTP status code of the health endpoint, reusing a recent result for the same URL.
+    Entries never outlive the polling delay, so a retry always probes the service again.
+    Services sharing a URL that are checked at the same time wait on a single request,
+    which is cancelled once every check waiting on it has been cancelled.
+    """
+    cached = _health_cache.get(health_url)
+    if cached is not None and time.monotonic() - cached[1] < _health_cache_ttl():
+        logger.debug("Reusing cached health status %s for %s.", cached[0], health_url)
+        return cached[0]
+
+    probe = _inflight_probes.get(health_url)
+    if probe is None:
+        probe = asyncio.create_task(_probe_health_url(health_url, client))
+        _inflight_probes[health_url] = probe
+        probe.add_done_callback(lambda done_probe: _forget_inflight_probe(health_url, done_probe))
+    _probe_waiters[probe] = _probe_waiters.get(probe, 0) + 1
+    try:
+        # Shielded so one cancelled waiter does not cancel the request for the others.
+        return await asyncio.shield(probe)
+    finally:
+        waiters = _probe_waiters.pop(probe, 1) - 1
+        if not probe.done():
+            if waiters:
+                _probe_waiters[probe] = waiters
+            else:
+                # Nobody is left to use the response, so the request is not left running.
+                if _inflight_probes.get(health_url) is probe:
+                    del _inflight_probes[health_url]
+                probe.cancel()
+
+def get_attempt_delay(attempt: int) -> float:
+    """
+    Returns how long to wait after the given failed attempt: exponential backoff capped
+    at the maximum delay, plus random jitter.
+    """
+    delay = min(
+        HealthCheckConstants.HEALTH_CHECK_ATTEMPT_DELAY_SECONDS * HealthCheckConstants.HEALTH_CHECK_BACKOFF_FACTOR ** (attempt - 1),
+        HealthCheckConstants.HEALTH_CHECK_MAX_ATTEMPT_DELAY_SECONDS
+    )
+    return delay + random.uniform(0, HealthCheckConstants.HEALTH_CHECK_MAX_JITTER_SECONDS)
+
+def build_health_url(base_url: str) -> str:
+    """
+    Returns the HTTPS health endpoint for a service's base URL.
+    """
+    return f"https://{base_url.rstrip('/')}{HealthCheckConstants.HEALTH_CHECK_URL_SUFFIX}"
+
+def _make_result_message(
+    log_level: str,
+    service_name: str,
+    base_url: str,
+    health_url: str,
+    status_code: Optional[int],
+    message: str
+) -> Dict[str, Any]:
+    """
+    Builds the per-service result message sent to the client.
+    """
+    return {
+        "type": log_level,
+        "service": service_name,
+        "url": base_url,
+        "health_url": health_url,
+        "status_code": status_code,
+        "message": message
+    }
+
 async def perform_single_health_check(
     service_name: str,
     base_url: str,
-    websocket,
+    health_url: str,
     client: httpx.AsyncClient
-) -> bool:
+) -> Tuple[bool, Dict[str, Any]]:
     """
-    Performs a single health check against a given service URL and sends the result via WebSocket.
-    Returns True if the check passes, False otherwise.
+    Performs a single health check against a given service URL.
+    Returns whether the check passed, along with the result message to send to the client.
     """
-    health_url = f"https://{base_url.rstrip('/')}{HealthCheckConstants.HEALTH_CHECK_URL_SUFFIX}"
     try:
-        response = await client.get(health_url)
-        if response.status_code == 200:
+        status_code = await _get_health_status_code(health_url, client)
+        if status_code == 200:
             message = f"Health check for {service_name} at {base_url} (endpoint: {health_url}) PASSED (HTTP 200)."
-            log_level = "success"
             logger.info(message)
-        else:
-            message = f"Health check for {service_name} at {base_url} (endpoint: {health_url}) FAILED: HTTP {response.status_code}."
-            log_level = "warning"
-            logger.warning(message)
-
-        await websocket.send_text(json.dumps({
-            "type": log_level,
-            "service": service_name,
-            "url": base_url,
-            "health_url": health_url,
-            "status_code": response.status_code,
-            "message": message
-        }))
-        return response.status_code == 200
+            return True, _make_result_message("success", service_name, base_url, health_url, status_code, message)
+
+        message = f"Health check for {service_name} at {base_url} (endpoint: {health_url}) FAILED: HTTP {status_code}."
+        logger.warning(message)
+        return False, _make_result_message("warning", service_name, base_url, health_url, status_code, message)
 
     except httpx.RequestError as e:
         message = f"Health check for {service_name} at {base_url} (endpoint: {health_url}) FAILED: Request Error - {e}."
         logger.warning(message)
-        await websocket.send_text(json.dumps({
-            "type": "warning",
-            "service": service_name,
-            "url": base_url,
-            "health_url": health_url,
-            "status_code": None,
-            "message": message
-        }))
-        return False
+        return False, _make_result_message("warning", service_name, base_url, health_url, None, message)
     except Exception as e:
         message = f"An unexpected error occurred during health check for {service_name}: {e}."
         logger.exception(message)
-        await websocket.send_text(json.dumps({
-            "type": "error",
-            "service": service_name,
-            "url": base_url,
-            "health_url": health_url,
-            "status_code": None,
-            "message": message
-        }))
-        return False
+        return False, _make_result_message("error", service_name, base_url, health_url, None, message)
+
 
+async def _wait_for_disconnect(websocket):
+    """
+    Returns once the client disconnects. Other incoming messages are ignored,
+    and a failed receive is treated as a disconnect.
+    """
+    try:
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    except Exception:
+        pass
+
+async def _finished_before_disconnect(task: asyncio.Task, disconnect_task: asyncio.Task) -> bool:
+    """
+    Waits for the task or a client disconnect, whichever comes first.
+    If the client disconnected, the task is cancelled and False is returned.
+    The task is also cancelled if the caller is.
+    """
+    try:
+        await asyncio.wait({task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+    if task.done():
+        return True
+    task.cancel()
+    with contextlib.suppress(asyncio.CancelledError):
+        await task
+    return False
 
-async def run_websocket_health_check(websocket, service_urls_to_check: Dict[str, str]):
+async def run_websocket_health_check(websocket, service_urls_to_check: Dict[str, str], client: httpx.AsyncClient):
     """
     Manages the health check polling process for multiple services over a WebSocket.
     Sends updates and final status to the connected client.
+    Probes go through the given shared client so pooled connections are reused across attempts.
     """
     if not isinstance(service_urls_to_check, dict) or \
        not all(isinstance(k, str) and isinstance(v, str) for k, v in service_urls_to_check.items()):
         logger.error("Invalid payload format received for healthCheck in service.")
-        await websocket.send_text(json.dumps({
+        await websocket.send_text(_INVALID_PAYLOAD_MESSAGE)
+        return
+
+    if len(service_urls_to_check) > HealthCheckConstants.HEALTH_CHECK_MAX_SERVICES:
+        logger.error(f"Rejected healthCheck request with {len(service_urls_to_check)} services.")
+        await websocket.send_text(orjson.dumps({
             "type": "error",
-            "message": "Invalid payload format. Expected a dictionary of serviceName: serviceUrl strings."
-        }))
+            "message": f"Too many service URLs. At most {HealthCheckConstants.HEALTH_CHECK_MAX_SERVICES} can be checked at once."
+        }).decode())
         return
 
-    await websocket.send_text(json.dumps({
-        "type": "info",
-        "message": "Starting health checks for provided service URLs..."
-    }))
+    await websocket.send_text(_STARTING_MESSAGE)
     logger.info(f"Starting comprehensive health checks for: {', '.join(service_urls_to_check.keys())}")
 
     if not service_urls_to_check:
-        await websocket.send_text(json.dumps({
-            "type": "warning",
-            "message": "No service URLs provided for health check. Health check skipped."
-        }))
+        await websocket.send_text(_NO_SERVICES_MESSAGE)
         logger.warning("No service URLs provided for health check.")
         return
 
     total_timeout_seconds = HealthCheckConstants.HEALTH_CHECK_TIMEOUT_SECONDS
-    delay_between_attempts = HealthCheckConstants.HEALTH_CHECK_ATTEMPT_DELAY_SECONDS
 
-    start_time = asyncio.get_event_loop().time()
-    pending_services = {name: url for name, url in service_urls_to_check.items()}
+    probe_semaphore = asyncio.Semaphore(HealthCheckConstants.HEALTH_CHECK_MAX_CONCURRENT_PROBES)
+
+    async def bounded_health_check(service_name: str, service_url: str, health_url: str) -> Tuple[bool, Dict[str, Any]]:
+        async with probe_semaphore:
+            return await perform_single_health_check(service_name, service_url, health_url, client)
+
+    start_time = time.monotonic()
+    # Health endpoints are built once per request instead of on every polling attempt.
+    pending_services = {
+        name: (url, build_health_url(url)) for name, url in service_urls_to_check.items()
+    }
+
+    async def check_pending_services(batch: list):
+        tasks = [
+            asyncio.create_task(bounded_health_check(service_name, service_url, health_url))
+            for service_name, (service_url, health_url) in pending_services.items()
+        ]
+
+        # Results are sent as their checks finish rather than after the slowest one; checks
+        # finishing together share a frame, and the last of them is left for the caller to send.
+        try:
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in tasks:
+                    if task in done:
+                        passed, result_message = task.result()
+                        batch.append(result_message)
+                        if passed:
+                            pending_services.pop(result_message["service"], None)
+                tasks = [task for task in tasks if task not in done]
+                if not tasks:
+                    return
+                await websocket.send_text(orjson.dumps({"type": "batch", "messages": batch}).decode())
+                batch.clear()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    # Probing and waiting stop as soon as the client goes away, instead of at the next send.
+    disconnect_task = asyncio.create_task(_wait_for_disconnect(websocket))
 
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            attempt = 0
-            while pending_services:
-                attempt += 1
-                current_time = asyncio.get_event_loop().time()
-                elapsed_time = current_time - start_time
-
-                if elapsed_time > total_timeout_seconds:
-                    await websocket.send_text(json.dumps({
-                        "type": "error",
-                        "action": "health_check_timeout",
-                        "message": f"Health checks timed out after {int(elapsed_time)} seconds ({total_timeout_seconds / 60} minutes). The following service URLs are still unhealthy: {', '.join(pending_services.keys())}"
-                    }))
-                    logger.error(f"Health checks timed out. Unhealthy services: {', '.join(pending_services.keys())}")
-                    break
-
-                await websocket.send_text(json.dumps({
-                    "type": "log",
-                    "message": f"Attempt {attempt}: Checking {len(pending_services)} service URL(s) for health... ({int(elapsed_time)}s elapsed / {total_timeout_seconds}s timeout)"
-                }))
-                logger.info(f"Attempt {attempt}: Checking {len(pending_services)} services. Elapsed: {int(elapsed_time)}s.")
-
-                tasks = [
-                    perform_single_health_check(service_name, service_url, websocket, client)
-                    for service_name, service_url in pending_services.items()
-                ]
-
-                results = await asyncio.gather(*tasks)
-
-                services_that_passed_this_round = [
-                    service_name
-                    for i, (service_name, _) in enumerate(pending_services.items())
-                    if results[i] # If the check passed (True)
-                ]
-
-                for service_name in services_that_passed_this_round:
-                    del pending_services[service_name]
-
-                if not pending_services:
-                    await websocket.send_text(json.dumps({
-                        "type": "success",
-                        "action": "all_services_healthy",
-                        "message": "All deployed service URLs are now healthy and reachable!"
-                    }))
-                    logger.info("All services are healthy.")
-                    break
-
-                if pending_services:
-                    await websocket.send_text(json.dumps({
-                        "type": "log",
-                        "message": f"{len(pending_services)} service URL(s) are not yet healthy. Retrying in {delay_between_attempts} seconds..."
-                    }))
-                    logger.warning(f"{len(pending_services)} services still pending health check. Retrying...")
-                    await asyncio.sleep(delay_between_attempts)
+        attempt = 0
+        while pending_services:
+            attempt += 1
+            current_time = time.monotonic()
+            elapsed_time = current_time - start_time
+
+            if elapsed_time > total_timeout_seconds:
+                await websocket.send_text(orjson.dumps({
+                    "type": "error",
+                    "action": "health_check_timeout",
+                    "message": f"Health checks timed out after {int(elapsed_time)} seconds ({total_timeout_seconds / 60} minutes). The following service URLs are still unhealthy: {', '.join(pending_services.keys())}"
+                }).decode())
+                logger.error(f"Health checks timed out. Unhealthy services: {', '.join(pending_services.keys())}")
+                break
+
+            batch = [{
+                "type": "log",
+                "message": f"Attempt {attempt}: Checking {len(pending_services)} service URL(s) for health... ({int(elapsed_time)}s elapsed / {total_timeout_seconds}s timeout)"
+            }]
+            logger.info(f"Attempt {attempt}: Checking {len(pending_services)} services. Elapsed: {int(elapsed_time)}s.")
+
+            attempt_task = asyncio.create_task(check_pending_services(batch))
+            if not await _finished_before_disconnect(attempt_task, disconnect_task):
+                logger.info("Client disconnected during health checks. Cancelled pending checks.")
+                return
+            await attempt_task
+
+            if not pending_services:
+                batch.append({
+                    "type": "success",
+                    "action": "all_services_healthy",
+                    "message": "All deployed service URLs are now healthy and reachable!"
+                })
+                await websocket.send_text(orjson.dumps({"type": "batch", "messages": batch}).decode())
+                logger.info("All services are healthy.")
+                break
+
+            delay_between_attempts = get_attempt_delay(attempt)
+            batch.append({
+                "type": "log",
+                "message": f"{len(pending_services)} service URL(s) are not yet healthy. Retrying in {delay_between_attempts:.0f} seconds..."
+            })
+            await websocket.send_text(orjson.dumps({"type": "batch", "messages": batch}).decode())
+            logger.warning(f"{len(pending_services)} services still pending health check. Retrying...")
+            if not await _finished_before_disconnect(asyncio.create_task(asyncio.sleep(delay_between_attempts)), disconnect_task):
+                logger.info("Client disconnected while waiting to retry health checks.")
+                return
 
     except Exception as e:
         logger.exception(f"An unexpected error occurred within run_websocket_health_check: {e}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        disconnect_task.cancel()
\ No newline at end of file
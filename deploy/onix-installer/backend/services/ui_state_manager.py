@@ -12,33 +12,59 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+import contextlib
 import logging
 import os
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Optional
+
+import orjson
 
 logger = logging.getLogger(__name__)
 
 DB_FILE = "ui_state.json" 
 
+# The state file lives in the backend directory; resolve it once at import.
+_DB_FILE_PATH = os.path.join(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')), DB_FILE)
+
+# This process is the only writer of the state file, so it is read once and then served from memory.
+_state_cache: Optional[Dict[str, Any]] = None
+_state_lock = threading.RLock()
+
 def _get_db_file_path() -> str:
-    current_dir = os.path.dirname(__file__)
-    backend_dir = os.path.abspath(os.path.join(current_dir, '..')) 
-    return os.path.join(backend_dir, DB_FILE)
+    return _DB_FILE_PATH
+
+def clear_state_cache():
+    """
+    Drops the in-memory UI state so the next load reads the file again.
+    """
+    global _state_cache
+    with _state_lock:
+        _state_cache = None
 
 def load_all_data() -> Dict[str, Any]:
+    """
+    Returns a copy of the stored UI state, reading the state file only on first use.
+    """
+    global _state_cache
+    with _state_lock:
+        if _state_cache is None:
+            _state_cache = _read_state_file()
+        return dict(_state_cache)
+
+def _read_state_file() -> Dict[str, Any]:
     file_path = _get_db_file_path()
-    logger.debug(f"Attempting to load data from: {file_path}")
+    logger.debug("Attempting to load data from: %s", file_path)
 
     if not os.path.exists(file_path) or os.path.getsize(file_path) == 0:
         logger.info(f"UI state file '{file_path}' not found or is empty. Returning empty dictionary.")
         return {}
     try:
-        with open(file_path, "r") as f:
-            data = json.load(f)
-            logger.debug(f"Successfully loaded data from '{file_path}'.")
+        with open(file_path, "rb") as f:
+            data = orjson.loads(f.read())
+            logger.debug("Successfully loaded data from '%s'.", file_path)
             return data
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         logger.warning(f"UI state file '{file_path}' is corrupted or not valid JSON: {e}. Returning empty dictionary.")
         return {}
     except IOError as e:
@@ -47,10 +73,20 @@ def load_all_data() -> Dict[str, Any]:
 
 def _save_data(data: Dict[str, Any]):
     file_path = _get_db_file_path()
+    tmp_file_path = f"{file_path}.tmp"
     try:
-        with open(file_path, "w") as f:
-            json.dump(data, f, indent=4)
-        logger.debug(f"Successfully saved data to '{file_path}'.")
+        # The file is only read back by this module, so it is written compactly.
+        # Writing to a temporary file first means a failed write never truncates the saved state.
+        try:
+            with open(tmp_file_path, "wb") as f:
+                f.write(orjson.dumps(data))
+            os.replace(tmp_file_path, file_path)
+        except BaseException:
+            # Do not leave a partial temporary file behind; the original error is re-raised.
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_file_path)
+            raise
+        logger.debug("Successfully saved data to '%s'.", file_path)
     except IOError as e:
         logger.error(f"Error writing to UI state file '{file_path}': {e}")
         raise 
@@ -59,7 +95,10 @@ def store_bulk_values(items: Dict[str, Any]):
     """
     Accepts a dictionary of key-value pairs for bulk storage/update.
     """
-    data_store = load_all_data()
-    data_store.update(items)
-    _save_data(data_store)
-    logger.info(f"UI State: Stored/Updated bulk keys: {list(items.keys())}.")
\ No newline at end of file
+    global _state_cache
+    with _state_lock:
+        data_store = load_all_data()
+        data_store.update(items)
+        _save_data(data_store)
+        _state_cache = data_store
+    logger.info("UI State: Stored/Updated bulk keys: %s.", list(items))
\ No newline at end of file
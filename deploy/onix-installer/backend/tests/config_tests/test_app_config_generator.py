@@ -14,15 +14,13 @@
 
 import unittest
 import os
-import sys
 import logging
-from unittest.mock import patch, MagicMock, call
+import tempfile
+from unittest.mock import patch, MagicMock, call, DEFAULT
 
-import urllib
-
-# Add the project root to sys.path for proper imports
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
-sys.path.insert(0, project_root)
+from urllib.parse import quote
+import yaml
+from jinja2 import Environment, FileSystemLoader, meta
 
 from core.models import (
     AppDeploymentRequest,
@@ -34,87 +32,134 @@ from core.models import (
 )
 
 from config import app_config_generator
+from core.constants import TEMPLATE_DIRECTORY
+
+# Template context returned by the mocked _prepare_template_context; renders are checked against it by identity.
+_MOCK_CONTEXT = {"mock_context": True}
+
+# Infrastructure outputs returned by the mocked _load_infrastructure_outputs.
+_INFRA_OUTPUTS = {
+    "project_id": "test-project", "cluster_name": "test-cluster", "cluster_region": "us-central1",
+    "redis_instance_ip": "1.2.3.4", "onix_topic_name": "onix-topic", "adapter_topic_name": "adapter-topic",
+    "database_user_sa_email": "db-user@example.gserviceaccount.com", "registry_admin_database_user_sa_email": "reg-admin@example.gserviceaccount.com",
+    "registry_database_name": "reg-db", "registry_db_connection_name": "reg-conn", "config_bucket_name": "config-bucket",
+    "url_map": "mock-url-map", "global_ip_address": "35.35.35.35",
+}
+
+
+# Collaborators of generate_app_configs, replaced together on every generate test.
+_patch_generate_inputs = patch.multiple(
+    'config.app_config_generator', spec_set=True,
+    _load_infrastructure_outputs=DEFAULT, _prepare_template_context=DEFAULT,
+)
+_patch_generate_outputs = patch.multiple(
+    'config.app_config_generator.utils', spec_set=True, render_jinja_template_to_file=DEFAULT,
+)
+_patch_generate_makedirs = patch.multiple('config.app_config_generator.os', spec_set=True, makedirs=DEFAULT)
 
 
 class TestAppConfigGenerator(unittest.TestCase):
 
-    def setUp(self):
-        self.patcher_tf_dir = patch('config.app_config_generator.TERRAFORM_DIRECTORY', '/mock/tf_output')
-        self.patcher_template_dir = patch('config.app_config_generator.TEMPLATE_DIRECTORY', '/mock/templates')
-        self.patcher_generated_configs_dir = patch('config.app_config_generator.GENERATED_CONFIGS_DIR', '/mock/generated_app_configs')
-        
-        self.patcher_adapter_template = patch('config.app_config_generator.ADAPTER_CONFIG_TEMPLATE_NAME', 'mock_adapter.yaml.j2')
-        self.patcher_registry_template = patch('config.app_config_generator.REGISTRY_CONFIG_TEMPLATE_NAME', 'mock_registry.yaml.j2')
-        self.patcher_gateway_template = patch('config.app_config_generator.GATEWAY_CONFIG_TEMPLATE_NAME', 'mock_gateway.yaml.j2')
-        self.patcher_subscriber_template = patch('config.app_config_generator.SUBSCRIBER_CONFIG_TEMPLATE_NAME', 'mock_subscriber.yaml.j2')
-        self.patcher_registry_admin_template = patch('config.app_config_generator.REGISTRY_ADMIN_CONFIG_TEMPLATE_NAME', 'mock_registry-admin.yaml.j2')
-        self.patcher_tfvars_template = patch('config.app_config_generator.TFVARS_TEMPLATE_NAME', 'mock_p2.tfvars.j2')
-
-
-        self.mock_tf_dir = self.patcher_tf_dir.start()
-        self.mock_template_dir = self.patcher_template_dir.start()
-        self.mock_generated_configs_dir = self.patcher_generated_configs_dir.start()
-
-        self.mock_adapter_template = self.patcher_adapter_template.start()
-        self.mock_registry_template = self.patcher_registry_template.start()
-        self.mock_gateway_template = self.patcher_gateway_template.start()
-        self.mock_subscriber_template = self.patcher_subscriber_template.start()
-        self.mock_registry_admin_template = self.patcher_registry_admin_template.start()
-        self.mock_tfvars_template = self.patcher_tfvars_template.start()
-
-        # Reset logger handlers and capture logs
-        self.mock_logger = patch('config.app_config_generator.logger').start()
-        self.mock_logger.handlers = [] # Clear handlers to prevent actual logging output during tests
-        self.mock_logger.propagate = False
-        self.mock_logger.setLevel(logging.NOTSET) # Ensure all levels are captured
-
-        # Define default infra outputs to be used by mocks when needed
-        self.default_infra_outputs = {
-            "project_id": "default-project",
-            "cluster_name": "default-cluster",
-            "cluster_region": "default-region",
-            "redis_instance_ip": "1.2.3.4",
-            "onix_topic_name": "onix-topic",
-            "adapter_topic_name": "adapter-topic",
-            "database_user_sa_email": "db-user@example.gserviceaccount.com",
-            "registry_admin_database_user_sa_email": "reg-admin@example.gserviceaccount.com",
-            "registry_database_name": "reg-db",
-            "registry_db_connection_name": "reg-conn",
-            "config_bucket_name": "config-bucket",
-            "url_map": "mock-url-map",
-            "global_ip_address": "35.35.35.35",
+    # Module-level path and template name constants swapped for the duration of the class.
+    MOCK_MODULE_CONSTANTS = {
+        'TERRAFORM_DIRECTORY': '/mock/tf_output',
+        'TEMPLATE_DIRECTORY': '/mock/templates',
+        'GENERATED_CONFIGS_DIR': '/mock/generated_app_configs',
+        'ADAPTER_CONFIG_TEMPLATE_NAME': 'mock_adapter.yaml.j2',
+        'REGISTRY_CONFIG_TEMPLATE_NAME': 'mock_registry.yaml.j2',
+        'GATEWAY_CONFIG_TEMPLATE_NAME': 'mock_gateway.yaml.j2',
+        'SUBSCRIBER_CONFIG_TEMPLATE_NAME': 'mock_subscriber.yaml.j2',
+        'REGISTRY_ADMIN_CONFIG_TEMPLATE_NAME': 'mock_registry-admin.yaml.j2',
+        'TFVARS_TEMPLATE_NAME': 'mock_p2.tfvars.j2',
+    }
+
+    mock_tf_dir = MOCK_MODULE_CONSTANTS['TERRAFORM_DIRECTORY']
+    mock_template_dir = MOCK_MODULE_CONSTANTS['TEMPLATE_DIRECTORY']
+    mock_generated_configs_dir = MOCK_MODULE_CONSTANTS['GENERATED_CONFIGS_DIR']
+
+    mock_adapter_template = MOCK_MODULE_CONSTANTS['ADAPTER_CONFIG_TEMPLATE_NAME']
+    mock_registry_template = MOCK_MODULE_CONSTANTS['REGISTRY_CONFIG_TEMPLATE_NAME']
+    mock_gateway_template = MOCK_MODULE_CONSTANTS['GATEWAY_CONFIG_TEMPLATE_NAME']
+    mock_subscriber_template = MOCK_MODULE_CONSTANTS['SUBSCRIBER_CONFIG_TEMPLATE_NAME']
+    mock_registry_admin_template = MOCK_MODULE_CONSTANTS['REGISTRY_ADMIN_CONFIG_TEMPLATE_NAME']
+    mock_tfvars_template = MOCK_MODULE_CONSTANTS['TFVARS_TEMPLATE_NAME']
+
+    @classmethod
+    def setUpClass(cls):
+        # No test rebinds these constants or the logger, so they are swapped once for the
+        # whole class and restored in tearDownClass.
+        cls._saved_module_constants = {
+            name: getattr(app_config_generator, name) for name in cls.MOCK_MODULE_CONSTANTS
         }
+        for name, value in cls.MOCK_MODULE_CONSTANTS.items():
+            setattr(app_config_generator, name, value)
+
+        cls._original_logger = app_config_generator.logger
+        cls.mock_logger = MagicMock(spec=logging.Logger)
+        app_config_generator.logger = cls.mock_logger
 
+        # No test reads a real adapter.yaml, so the reader is patched once and reset before each test.
+        cls._read_yaml_file_patcher = patch.object(app_config_generator.utils, 'read_yaml_file', spec_set=True)
+        cls.mock_read_yaml_file = cls._read_yaml_file_patcher.start()
+
+        # Validated once; tests derive variants with model_copy instead of re-running validation.
+        cls.base_app_request = AppDeploymentRequest(
+            app_name="test-app",
+            components={},
+            domain_names={},
+            image_urls={},
+            registry_url="http://mock-reg.com",
+            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
+            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        for name, value in cls._saved_module_constants.items():
+            setattr(app_config_generator, name, value)
+        app_config_generator.logger = cls._original_logger
+        cls._read_yaml_file_patcher.stop()
+
+    def setUp(self):
+        # Only per-test state is reset here: recorded logger calls and the infra outputs cache.
+        self.mock_logger.reset_mock(return_value=True, side_effect=True)
+        self.mock_read_yaml_file.reset_mock(return_value=True, side_effect=True)
+        app_config_generator.invalidate_infra_cache()
+        app_config_generator.invalidate_adapter_config_cache()
 
     def tearDown(self):
-        # Stop all patchers
-        self.patcher_tf_dir.stop()
-        self.patcher_template_dir.stop()
-        self.patcher_generated_configs_dir.stop()
-        self.patcher_adapter_template.stop()
-        self.patcher_registry_template.stop()
-        self.patcher_gateway_template.stop()
-        self.patcher_subscriber_template.stop()
-        self.patcher_registry_admin_template.stop()
-        self.patcher_tfvars_template.stop()
-
-        # Stop the logger patch
-        patch.stopall()
-
-    def test_should_deploy_adapter(self):
-        self.assertTrue(app_config_generator._should_deploy_adapter({"bap": True}))
-        self.assertTrue(app_config_generator._should_deploy_adapter({"bpp": True}))
-        self.assertTrue(app_config_generator._should_deploy_adapter({"bap": True, "bpp": True}))
-        self.assertFalse(app_config_generator._should_deploy_adapter({"gateway": True}))
-        self.assertFalse(app_config_generator._should_deploy_adapter({}))
-
-    def testshould_deploy_subscriber(self):
-        self.assertTrue(app_config_generator.should_deploy_subscriber({"bap": True}))
-        self.assertTrue(app_config_generator.should_deploy_subscriber({"bpp": True}))
-        self.assertTrue(app_config_generator.should_deploy_subscriber({"gateway": True}))
-        self.assertTrue(app_config_generator.should_deploy_subscriber({"bap": True, "bpp": True, "gateway": True}))
-        self.assertFalse(app_config_generator.should_deploy_subscriber({"registry": True}))
-        self.assertFalse(app_config_generator.should_deploy_subscriber({}))
+        app_config_generator.invalidate_infra_cache()
+        app_config_generator.invalidate_adapter_config_cache()
+
+    def _generate_mocks(self, mocks, render_side_effect=None):
+        """Configures the patch.multiple mocks of a generate test and returns them in call order."""
+        mocks['_load_infrastructure_outputs'].return_value = _INFRA_OUTPUTS
+        mocks['_prepare_template_context'].return_value = _MOCK_CONTEXT
+        mocks['render_jinja_template_to_file'].side_effect = render_side_effect
+        return (
+            mocks['_load_infrastructure_outputs'],
+            mocks['_prepare_template_context'],
+            mocks['render_jinja_template_to_file'],
+            mocks['makedirs'],
+        )
+
+    def test_should_deploy_component(self):
+        cases = [
+            (app_config_generator._should_deploy_adapter, {"bap": True}, True),
+            (app_config_generator._should_deploy_adapter, {"bpp": True}, True),
+            (app_config_generator._should_deploy_adapter, {"bap": True, "bpp": True}, True),
+            (app_config_generator._should_deploy_adapter, {"gateway": True}, False),
+            (app_config_generator._should_deploy_adapter, {}, False),
+            (app_config_generator.should_deploy_subscriber, {"bap": True}, True),
+            (app_config_generator.should_deploy_subscriber, {"bpp": True}, True),
+            (app_config_generator.should_deploy_subscriber, {"gateway": True}, True),
+            (app_config_generator.should_deploy_subscriber, {"bap": True, "bpp": True, "gateway": True}, True),
+            (app_config_generator.should_deploy_subscriber, {"registry": True}, False),
+            (app_config_generator.should_deploy_subscriber, {}, False),
+        ]
+        for predicate, components, expected in cases:
+            with self.subTest(predicate=predicate.__name__, components=components):
+                self.assertEqual(predicate(components), expected)
 
     @patch('config.app_config_generator.utils.read_json_file', return_value={
         "project_id": {"value": "test-project"},
@@ -131,8 +176,7 @@ class TestAppConfigGenerator(unittest.TestCase):
         "global_ip_address": {"value": "35.35.35.35"},
     })
 
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_load_infrastructure_outputs_success(self, mock_os_path_join, mock_read_json_file):
+    def test_load_infrastructure_outputs_success(self, mock_read_json_file):
         """
         Test successful loading of infrastructure outputs.
         """
@@ -154,57 +198,61 @@ class TestAppConfigGenerator(unittest.TestCase):
             "url_map": "mock-url-map",
             "global_ip_address": "35.35.35.35",
         })
-        self.mock_logger.info.assert_any_call(f"Loading infrastructure outputs from {expected_path}")
-        self.mock_logger.info.assert_any_call("Infrastructure outputs loaded successfully.")
+        self.mock_logger.info.assert_has_calls([
+            call(f"Loading infrastructure outputs from {expected_path}"),
+            call("Infrastructure outputs loaded successfully."),
+        ], any_order=True)
 
-    @patch('config.app_config_generator.utils.read_json_file', side_effect=FileNotFoundError("Outputs not found"))
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_load_infrastructure_outputs_file_not_found(self, mock_os_path_join, mock_read_json_file):
+    def test_load_infrastructure_outputs_errors(self):
         """
-        Test error handling when infrastructure outputs file is not found.
+        Test that read errors are logged and re-raised: expected errors through
+        logger.error, anything else through logger.exception.
         """
         expected_path = os.path.join(self.mock_tf_dir, "outputs.json")
-        with self.assertRaisesRegex(FileNotFoundError, "Outputs not found"):
-            app_config_generator._load_infrastructure_outputs(self.mock_tf_dir)
-        
-        mock_read_json_file.assert_called_once_with(expected_path)
-        self.mock_logger.error.assert_called_once()
-        self.mock_logger.info.assert_any_call(f"Loading infrastructure outputs from {expected_path}")
+        cases = [
+            (FileNotFoundError("Outputs not found"), "error"),
+            (ValueError("Invalid JSON"), "error"),
+            (RuntimeError("Simulated unexpected error"), "exception"),
+        ]
+        for error, log_method in cases:
+            with self.subTest(error=type(error).__name__), \
+                 patch('config.app_config_generator.utils.read_json_file', side_effect=error) as mock_read_json_file:
+                self.mock_logger.reset_mock()
+                app_config_generator.invalidate_infra_cache()
 
+                with self.assertRaisesRegex(type(error), str(error)):
+                    app_config_generator._load_infrastructure_outputs(self.mock_tf_dir)
 
-    @patch('config.app_config_generator.utils.read_json_file', side_effect=ValueError("Invalid JSON"))
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_load_infrastructure_outputs_decode_error(self, mock_os_path_join, mock_read_json_file):
-        """
-        Test error handling when infrastructure outputs JSON is invalid.
-        """
-        expected_path = os.path.join(self.mock_tf_dir, "outputs.json")
-        with self.assertRaisesRegex(ValueError, "Invalid JSON"):
-            app_config_generator._load_infrastructure_outputs(self.mock_tf_dir)
-        
-        mock_read_json_file.assert_called_once_with(expected_path)
-        self.mock_logger.error.assert_called_once()
-        self.mock_logger.info.assert_any_call(f"Loading infrastructure outputs from {expected_path}")
+                mock_read_json_file.assert_called_once_with(expected_path)
+                getattr(self.mock_logger, log_method).assert_called_once()
+                self.mock_logger.info.assert_any_call(f"Loading infrastructure outputs from {expected_path}")
+                if log_method == "exception":
+                    self.assertIn("An unexpected error occurred while loading infrastructure outputs",
+                                  self.mock_logger.exception.call_args[0][0])
 
 
-    @patch('config.app_config_generator.utils.read_json_file', side_effect=RuntimeError("Simulated unexpected error"))
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_load_infrastructure_outputs_unexpected_error(self, mock_os_path_join, mock_read_json_file):
+    @patch('config.app_config_generator.utils.read_json_file', return_value={"project_id": {"value": "test-project"}})
+    def test_load_infrastructure_outputs_cached_until_file_changes(self, mock_read_json_file):
         """
-        Test error handling when an unexpected generic error occurs
-        while loading infrastructure outputs.
+        Test that outputs.json is parsed once and re-read only after its mtime changes.
         """
-        expected_path = os.path.join(self.mock_tf_dir, "outputs.json")
-        with self.assertRaisesRegex(RuntimeError, "Simulated unexpected error"):
-            app_config_generator._load_infrastructure_outputs(self.mock_tf_dir)
-        
-        mock_read_json_file.assert_called_once_with(expected_path)
-        # Verify that logger.exception was called
-        self.mock_logger.exception.assert_called_once()
-        self.assertIn("An unexpected error occurred while loading infrastructure outputs", 
-                        self.mock_logger.exception.call_args[0][0])
-        self.mock_logger.info.assert_any_call(f"Loading infrastructure outputs from {expected_path}")
+        with tempfile.TemporaryDirectory() as tf_dir:
+            outputs_path = os.path.join(tf_dir, "outputs.json")
+            with open(outputs_path, "w") as f:
+                f.write("{}")
+
+            first = app_config_generator._load_infrastructure_outputs(tf_dir)
+            second = app_config_generator._load_infrastructure_outputs(tf_dir)
+
+            self.assertEqual(first, {"project_id": "test-project"})
+            self.assertIs(second, first)
+            mock_read_json_file.assert_called_once_with(outputs_path)
 
+            stat = os.stat(outputs_path)
+            os.utime(outputs_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+            app_config_generator._load_infrastructure_outputs(tf_dir)
+
+            self.assertEqual(mock_read_json_file.call_count, 2)
 
     def test_prepare_template_context(self):
         """
@@ -262,8 +310,10 @@ class TestAppConfigGenerator(unittest.TestCase):
         self.assertEqual(context["registry"], app_req.registry_config.model_dump())
         self.assertEqual(context["gateway"], app_req.gateway_config.model_dump())
 
-        self.assertTrue(context["deploy_bap"])
-        self.assertFalse(context["deploy_bpp"])
+        self.assertEqual(context["adapter_modules"], [
+            {"name": "bapTxnReceiver", "path": "/bap/receiver/"},
+            {"name": "bapTxnCaller", "path": "/bap/caller/"},
+        ])
         self.assertTrue(context["enable_subscriber"])
         self.assertTrue(context["enable_auto_approver"])
         self.assertEqual(context["url_map"], "mock-url-map-id")
@@ -274,110 +324,139 @@ class TestAppConfigGenerator(unittest.TestCase):
         self.assertIn("adapter.example.com", context["domain_list"])
         self.assertIn("gateway.example.com", context["domain_list"])
 
-    @patch('config.app_config_generator.os.makedirs')
-    @patch('config.app_config_generator.utils.write_file_content')
-    @patch('config.app_config_generator.utils.render_jinja_template', return_value="rendered_content")
-    @patch('config.app_config_generator._prepare_template_context', return_value={"mock_context": True})
-    @patch('config.app_config_generator._load_infrastructure_outputs', return_value={
-        "project_id": "test-project", "cluster_name": "test-cluster", "cluster_region": "us-central1",
-        "redis_instance_ip": "1.2.3.4", "onix_topic_name": "onix-topic", "adapter_topic_name": "adapter-topic",
-        "database_user_sa_email": "db-user@example.gserviceaccount.com", "registry_admin_database_user_sa_email": "reg-admin@example.gserviceaccount.com",
-        "registry_database_name": "reg-db", "registry_db_connection_name": "reg-conn", "config_bucket_name": "config-bucket",
-        "url_map": "mock-url-map", "global_ip_address": "35.35.35.35",
-    })
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_generate_app_configs_all_components(self, mock_os_path_join, mock_load_infra, mock_prepare_context, mock_render, mock_write_file, mock_makedirs):
+    def test_prepare_template_context_reflects_copied_component_configs(self):
+        """
+        Test that a request derived with model_copy renders its own component configs.
+        """
+        enabled = self.base_app_request.model_copy(update={"adapter_config": AdapterConfig(enable_schema_validation=True)})
+        self.assertTrue(app_config_generator._prepare_template_context(enabled, _INFRA_OUTPUTS)["adapter"]["enable_schema_validation"])
+
+        disabled = enabled.model_copy(update={"adapter_config": AdapterConfig(enable_schema_validation=False)})
+        self.assertFalse(app_config_generator._prepare_template_context(disabled, _INFRA_OUTPUTS)["adapter"]["enable_schema_validation"])
+
+    def test_prepare_template_context_skips_unused_component_configs(self):
+        """
+        Test that component configs outside the requested context keys are not serialized.
+        """
+        req = self.base_app_request.model_copy(update={"gateway_config": GatewayConfig(subscriber_id="gw")})
+        with patch.object(GatewayConfig, 'model_dump') as mock_gateway_dump:
+            context = app_config_generator._prepare_template_context(req, _INFRA_OUTPUTS, frozenset({"project_id", "registry"}))
+
+        mock_gateway_dump.assert_not_called()
+        self.assertNotIn("gateway", context)
+        self.assertNotIn("adapter", context)
+        self.assertEqual(context["registry"]["subscriber_id"], "sub_id")
+
+    def test_get_required_context_keys(self):
+        """
+        Test that the required keys are the union of the templates' key sets, or None when one has no key set.
+        """
+        keys = app_config_generator.TEMPLATE_CONTEXT_KEYS
+        self.assertEqual(
+            app_config_generator._get_required_context_keys(["gateway.yaml.j2", "p2.tfvars.j2"]),
+            keys["gateway.yaml.j2"] | keys["p2.tfvars.j2"]
+        )
+        self.assertIsNone(app_config_generator._get_required_context_keys(["gateway.yaml.j2", "unknown.yaml.j2"]))
+
+    def test_build_template_context_selects_template_keys(self):
+        """
+        Test that a template only receives the context keys listed for it.
+        """
+        template_context = {"project_id": "proj", "gateway": {"subscriber_id": "gw"}, "registry": {"key_id": "k"}}
+        with patch.dict(app_config_generator.TEMPLATE_CONTEXT_KEYS, {self.mock_gateway_template: frozenset({"project_id", "gateway"})}):
+            context = app_config_generator._build_template_context(template_context, self.mock_gateway_template)
+
+        self.assertEqual(context, {"project_id": "proj", "gateway": {"subscriber_id": "gw"}})
+
+    def test_build_template_context_unknown_template_gets_full_context(self):
+        """
+        Test that templates without a key set are rendered with the full context.
+        """
+        template_context = {"project_id": "proj"}
+        context = app_config_generator._build_template_context(template_context, "unknown.yaml.j2")
+        self.assertIs(context, template_context)
+
+    def test_template_context_keys_cover_template_variables(self):
+        """
+        Test that every variable referenced by a template is in its context key set.
+        """
+        for template_name, context_keys in app_config_generator.TEMPLATE_CONTEXT_KEYS.items():
+            sub_dir = 'tf_configs' if template_name.endswith('.tfvars.j2') else 'configs'
+            env = Environment(loader=FileSystemLoader(os.path.join(TEMPLATE_DIRECTORY, sub_dir)))
+            source = env.loader.get_source(env, template_name)[0]
+            with self.subTest(template=template_name):
+                self.assertLessEqual(meta.find_undeclared_variables(env.parse(source)), context_keys)
+
+    @_patch_generate_makedirs
+    @_patch_generate_outputs
+    @_patch_generate_inputs
+    def test_generate_app_configs_all_components(self, **mocks):
         """
         Test generation of app configs when all components that create config files are enabled.
         """
-        req = AppDeploymentRequest(
-            app_name="test-app",
-            components={
+        mock_load_infra, mock_prepare_context, mock_render, mock_makedirs = self._generate_mocks(mocks)
+        req = self.base_app_request.model_copy(update={
+            "components": {
                 "bap": True,
                 "bpp": True,
                 "gateway": True,
                 "registry": True
             },
-            domain_names={},
-            image_urls={},
-            registry_url="http://mock-reg.com",
-            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
-            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
-        )
+        })
 
-        app_config_generator.generate_app_configs(req)
+        adapter_modules = app_config_generator.generate_app_configs(req)
 
+        self.assertEqual(adapter_modules, app_config_generator.get_adapter_modules(req.components))
         mock_load_infra.assert_called_once_with(self.mock_tf_dir)
-        mock_prepare_context.assert_called_once_with(req, mock_load_infra.return_value)
+        # The mocked template names have no key sets, so the full context is prepared.
+        mock_prepare_context.assert_called_once_with(req, mock_load_infra.return_value, None)
         mock_makedirs.assert_called_once_with(self.mock_generated_configs_dir, exist_ok=True)
 
         expected_template_source_dir = os.path.join(self.mock_template_dir, 'configs')
         
-        expected_render_calls_configs = [
-            call(template_dir=expected_template_source_dir, template_name=self.mock_adapter_template, context={"mock_context": True}),
-            call(template_dir=expected_template_source_dir, template_name=self.mock_gateway_template, context={"mock_context": True}),
-            call(template_dir=expected_template_source_dir, template_name=self.mock_subscriber_template, context={"mock_context": True}),
-            call(template_dir=expected_template_source_dir, template_name=self.mock_registry_template, context={"mock_context": True}),
-            call(template_dir=expected_template_source_dir, template_name=self.mock_registry_admin_template, context={"mock_context": True}),
-        ]
+        expected_renders = {
+            (expected_template_source_dir, template_name,
+             os.path.join(self.mock_generated_configs_dir, template_name.replace('.j2', '')))
+            for template_name in (
+                self.mock_adapter_template,
+                self.mock_gateway_template,
+                self.mock_subscriber_template,
+                self.mock_registry_template,
+                self.mock_registry_admin_template,
+            )
+        }
         
         # Test for tfvars template as well
         tf_template_source_dir = os.path.join(self.mock_template_dir, 'tf_configs')
-        expected_render_calls_tfvars = [
-            call(template_dir=tf_template_source_dir, template_name=self.mock_tfvars_template, context={"mock_context": True}),
-        ]
+        tf_vars_output_dir = os.path.join(self.mock_tf_dir, 'phase2')
+        expected_renders.add(
+            (tf_template_source_dir, self.mock_tfvars_template,
+             os.path.join(tf_vars_output_dir, self.mock_tfvars_template.replace('.j2', '')))
+        )
 
-        all_expected_render_calls = sorted(expected_render_calls_configs + expected_render_calls_tfvars, key=lambda c: str(c))
-        actual_render_calls = sorted(mock_render.call_args_list, key=lambda c: str(c))
-        self.assertEqual(actual_render_calls, all_expected_render_calls)
+        actual_renders = {
+            (c.kwargs['template_dir'], c.kwargs['template_name'], c.kwargs['file_path'])
+            for c in mock_render.call_args_list
+        }
+        self.assertEqual(actual_renders, expected_renders)
+        for c in mock_render.call_args_list:
+            self.assertIs(c.kwargs['context'], _MOCK_CONTEXT)
         self.assertEqual(mock_render.call_count, 6) # 5 app configs + 1 tfvars
 
-        expected_write_calls_configs = [
-            call(os.path.join(self.mock_generated_configs_dir, self.mock_adapter_template.replace('.j2', '')), "rendered_content"),
-            call(os.path.join(self.mock_generated_configs_dir, self.mock_gateway_template.replace('.j2', '')), "rendered_content"),
-            call(os.path.join(self.mock_generated_configs_dir, self.mock_subscriber_template.replace('.j2', '')), "rendered_content"),
-            call(os.path.join(self.mock_generated_configs_dir, self.mock_registry_template.replace('.j2', '')), "rendered_content"),
-            call(os.path.join(self.mock_generated_configs_dir, self.mock_registry_admin_template.replace('.j2', '')), "rendered_content"),
-        ]
-
-        tf_vars_output_dir = os.path.join(self.mock_tf_dir, 'phase2')
-        expected_write_calls_tfvars = [
-            call(os.path.join(tf_vars_output_dir, self.mock_tfvars_template.replace('.j2', '')), "rendered_content"),
-        ]
 
-        all_expected_write_calls = sorted(expected_write_calls_configs + expected_write_calls_tfvars, key=lambda c: str(c))
-        actual_write_calls = sorted(mock_write_file.call_args_list, key=lambda c: str(c))
-        self.assertEqual(actual_write_calls, all_expected_write_calls)
-        self.assertEqual(mock_write_file.call_count, 6)
-
-
-    @patch('config.app_config_generator.os.makedirs')
-    @patch('config.app_config_generator.utils.write_file_content')
-    @patch('config.app_config_generator.utils.render_jinja_template', return_value="rendered_content")
-    @patch('config.app_config_generator._prepare_template_context', return_value={"mock_context": True})
-    @patch('config.app_config_generator._load_infrastructure_outputs', return_value={
-        "project_id": "test-project", "cluster_name": "test-cluster", "cluster_region": "us-central1",
-        "redis_instance_ip": "1.2.3.4", "onix_topic_name": "onix-topic", "adapter_topic_name": "adapter-topic",
-        "database_user_sa_email": "db-user@example.gserviceaccount.com", "registry_admin_database_user_sa_email": "reg-admin@example.gserviceaccount.com",
-        "registry_database_name": "reg-db", "registry_db_connection_name": "reg-conn", "config_bucket_name": "config-bucket",
-        "url_map": "mock-url-map", "global_ip_address": "35.35.35.35",
-    })
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_generate_app_configs_only_registry(self, mock_os_path_join, mock_load_infra, mock_prepare_context, mock_render, mock_write_file, mock_makedirs):
+    @_patch_generate_makedirs
+    @_patch_generate_outputs
+    @_patch_generate_inputs
+    def test_generate_app_configs_only_registry(self, **mocks):
         """
         Test generation of app configs when only registry component is enabled.
         """
-        req = AppDeploymentRequest(
-            app_name="test-app",
-            components={
+        mock_load_infra, mock_prepare_context, mock_render, mock_makedirs = self._generate_mocks(mocks)
+        req = self.base_app_request.model_copy(update={
+            "components": {
                 "registry": True
             },
-            domain_names={},
-            image_urls={},
-            registry_url="http://mock-reg.com",
-            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
-            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
-        )
+        })
 
         app_config_generator.generate_app_configs(req)
 
@@ -386,102 +465,66 @@ class TestAppConfigGenerator(unittest.TestCase):
         mock_makedirs.assert_called_once()
 
         expected_template_source_dir = os.path.join(self.mock_template_dir, 'configs')
-        expected_render_calls_configs = [
-            call(template_dir=expected_template_source_dir, template_name=self.mock_registry_template, context={"mock_context": True}),
-            call(template_dir=expected_template_source_dir, template_name=self.mock_registry_admin_template, context={"mock_context": True}),
-        ]
+        expected_renders = {
+            (expected_template_source_dir, template_name,
+             os.path.join(self.mock_generated_configs_dir, template_name.replace('.j2', '')))
+            for template_name in (self.mock_registry_template, self.mock_registry_admin_template)
+        }
 
         tf_template_source_dir = os.path.join(self.mock_template_dir, 'tf_configs')
-        expected_render_calls_tfvars = [
-            call(template_dir=tf_template_source_dir, template_name=self.mock_tfvars_template, context={"mock_context": True}),
-        ]
+        tf_vars_output_dir = os.path.join(self.mock_tf_dir, 'phase2')
+        expected_renders.add(
+            (tf_template_source_dir, self.mock_tfvars_template,
+             os.path.join(tf_vars_output_dir, self.mock_tfvars_template.replace('.j2', '')))
+        )
 
-        all_expected_render_calls = sorted(expected_render_calls_configs + expected_render_calls_tfvars, key=lambda c: str(c))
-        actual_render_calls = sorted(mock_render.call_args_list, key=lambda c: str(c))
-        self.assertEqual(actual_render_calls, all_expected_render_calls)
+        actual_renders = {
+            (c.kwargs['template_dir'], c.kwargs['template_name'], c.kwargs['file_path'])
+            for c in mock_render.call_args_list
+        }
+        self.assertEqual(actual_renders, expected_renders)
+        for c in mock_render.call_args_list:
+            self.assertIs(c.kwargs['context'], _MOCK_CONTEXT)
         self.assertEqual(mock_render.call_count, 3) # Registry, Registry-Admin, and tfvars
 
-        expected_write_calls_configs = [
-            call(os.path.join(self.mock_generated_configs_dir, self.mock_registry_template.replace('.j2', '')), "rendered_content"),
-            call(os.path.join(self.mock_generated_configs_dir, self.mock_registry_admin_template.replace('.j2', '')), "rendered_content"),
-        ]
 
-        tf_vars_output_dir = os.path.join(self.mock_tf_dir, 'phase2')
-        expected_write_calls_tfvars = [
-            call(os.path.join(tf_vars_output_dir, self.mock_tfvars_template.replace('.j2', '')), "rendered_content"),
-        ]
-
-        all_expected_write_calls = sorted(expected_write_calls_configs + expected_write_calls_tfvars, key=lambda c: str(c))
-        actual_write_calls = sorted(mock_write_file.call_args_list, key=lambda c: str(c))
-        self.assertEqual(actual_write_calls, all_expected_write_calls)
-        self.assertEqual(mock_write_file.call_count, 3) # Registry, Registry-Admin, and tfvars
-
-
-    @patch('config.app_config_generator.os.makedirs')
-    @patch('config.app_config_generator.utils.write_file_content')
-    @patch('config.app_config_generator.utils.render_jinja_template', side_effect=FileNotFoundError("Missing J2"))
-    @patch('config.app_config_generator._prepare_template_context', return_value={"mock_context": True})
-    @patch('config.app_config_generator._load_infrastructure_outputs', return_value={
-        "project_id": "test-project", "cluster_name": "test-cluster", "cluster_region": "us-central1",
-        "redis_instance_ip": "1.2.3.4", "onix_topic_name": "onix-topic", "adapter_topic_name": "adapter-topic",
-        "database_user_sa_email": "db-user@example.gserviceaccount.com", "registry_admin_database_user_sa_email": "reg-admin@example.gserviceaccount.com",
-        "registry_database_name": "reg-db", "registry_db_connection_name": "reg-conn", "config_bucket_name": "config-bucket",
-        "url_map": "mock-url-map", "global_ip_address": "35.35.35.35",
-    })
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_generate_app_configs_template_error_propagates(self, mock_os_path_join, mock_load_infra, mock_prepare_context, mock_render, mock_write_file, mock_makedirs):
+    @_patch_generate_makedirs
+    @_patch_generate_outputs
+    @_patch_generate_inputs
+    def test_generate_app_configs_template_error_propagates(self, **mocks):
         """
         Test that FileNotFoundError during template rendering is caught and re-raised.
         """
-        req = AppDeploymentRequest(
-            app_name="test-app",
-            components={"bap": True},
-            domain_names={},
-            image_urls={},
-            registry_url="http://mock-reg.com",
-            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
-            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
-        )
+        mock_load_infra, mock_prepare_context, mock_render, mock_makedirs = self._generate_mocks(mocks, render_side_effect=FileNotFoundError("Missing J2"))
+        req = self.base_app_request.model_copy(update={
+            "components": {"bap": True},
+        })
 
         with self.assertRaisesRegex(FileNotFoundError, "Missing J2"):
             app_config_generator.generate_app_configs(req)
         
-        mock_render.assert_called_once()
-        self.mock_logger.error.assert_called_once()
-        mock_write_file.assert_not_called()
-
-    @patch('config.app_config_generator.os.makedirs')
-    @patch('config.app_config_generator.utils.write_file_content', side_effect=IOError("No disk space"))
-    @patch('config.app_config_generator.utils.render_jinja_template', return_value="content")
-    @patch('config.app_config_generator._prepare_template_context', return_value={"mock_context": True})
-    @patch('config.app_config_generator._load_infrastructure_outputs', return_value={
-        "project_id": "test-project", "cluster_name": "test-cluster", "cluster_region": "us-central1",
-        "redis_instance_ip": "1.2.3.4", "onix_topic_name": "onix-topic", "adapter_topic_name": "adapter-topic",
-        "database_user_sa_email": "db-user@example.gserviceaccount.com", "registry_admin_database_user_sa_email": "reg-admin@example.gserviceaccount.com",
-        "registry_database_name": "reg-db", "registry_db_connection_name": "reg-conn", "config_bucket_name": "config-bucket",
-        "url_map": "mock-url-map", "global_ip_address": "35.35.35.35",
-    })
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_generate_app_configs_write_error_propagates(self, mock_os_path_join, mock_load_infra, mock_prepare_context, mock_render, mock_write_file, mock_makedirs):
+        # Templates are generated concurrently, so every selected template is attempted.
+        self.assertEqual(mock_render.call_count, 3) # Adapter, Subscriber, and tfvars
+        self.assertEqual(self.mock_logger.error.call_count, 3)
+
+    @_patch_generate_makedirs
+    @_patch_generate_outputs
+    @_patch_generate_inputs
+    def test_generate_app_configs_write_error_propagates(self, **mocks):
         """
-        Test that IOError during file writing is caught and re-raised.
+        Test that IOError while writing a rendered file is caught and re-raised.
         """
-        req = AppDeploymentRequest(
-            app_name="test-app",
-            components={"gateway": True},
-            domain_names={},
-            image_urls={},
-            registry_url="http://mock-reg.com",
-            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
-            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
-        )
+        mock_load_infra, mock_prepare_context, mock_render, mock_makedirs = self._generate_mocks(mocks, render_side_effect=IOError("No disk space"))
+        req = self.base_app_request.model_copy(update={
+            "components": {"gateway": True},
+        })
 
         with self.assertRaisesRegex(IOError, "No disk space"):
             app_config_generator.generate_app_configs(req)
         
-        mock_render.assert_called_once()
-        mock_write_file.assert_called_once()
-        self.mock_logger.error.assert_called_once()
+        # Templates are generated concurrently, so every selected template is attempted.
+        self.assertEqual(mock_render.call_count, 3) # Gateway, Subscriber, and tfvars
+        self.assertEqual(self.mock_logger.error.call_count, 3)
 
     @patch('config.app_config_generator._should_deploy_adapter', return_value=True)
     @patch('config.app_config_generator.should_deploy_subscriber', return_value=True)
@@ -489,30 +532,26 @@ class TestAppConfigGenerator(unittest.TestCase):
         """
         Test that all relevant environment variables are generated correctly for all components.
         """
-        req = AppDeploymentRequest(
-            app_name="test-app",
-            components={
+        req = self.base_app_request.model_copy(update={
+            "components": {
                 "bap": True,
                 "bpp": True,
                 "gateway": True,
                 "registry": True
             },
-            domain_names={
+            "domain_names": {
                 "adapter": "adapter.example.com",
                 "gateway": "gateway.example.com",
                 "registry": "registry.example.com",
                 "subscriber": "subscriber.example.com"
             },
-            image_urls={
+            "image_urls": {
                 "adapter": "repo/adapter:latest",
                 "registry": "repo/registry:v2",
                 "gateway": "repo/gateway:1.0",
                 "subscriber": "repo/subscriber:1.0"
             },
-            registry_url="http://mock-reg.com",
-            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
-            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
-        )
+        })
 
         # Call with an explicit list of services to deploy
         services_to_deploy = ["adapter", "gateway", "registry", "registry-admin", "subscriber"]
@@ -549,15 +588,7 @@ class TestAppConfigGenerator(unittest.TestCase):
         """
         Test environment variables when no deployable components are selected.
         """
-        req = AppDeploymentRequest(
-            app_name="test-app",
-            components={},
-            domain_names={},
-            image_urls={},
-            registry_url="http://mock-reg.com",
-            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
-            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
-        )
+        req = self.base_app_request
         services_to_deploy = []
         env_vars = app_config_generator.get_deployment_environment_variables(req, services_to_deploy)
         self.assertEqual(env_vars["DEPLOY_SERVICES"], "")
@@ -570,23 +601,19 @@ class TestAppConfigGenerator(unittest.TestCase):
         """
         Test environment variables for a subset of components.
         """
-        req = AppDeploymentRequest(
-            app_name="test-app",
-            components={
+        req = self.base_app_request.model_copy(update={
+            "components": {
                 "registry": True,
                 "bap": True
             },
-            domain_names={
+            "domain_names": {
                 "registry": "reg.example.com",
                 "adapter": "adapter.example.com"
             },
-            image_urls={
+            "image_urls": {
                 "registry": "repo/reg:1.0"
             },
-            registry_url="http://mock-reg.com",
-            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
-            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
-        )
+        })
         services_to_deploy = ["adapter", "registry", "registry-admin", "subscriber"]
         env_vars = app_config_generator.get_deployment_environment_variables(req, services_to_deploy)
         
@@ -601,27 +628,19 @@ class TestAppConfigGenerator(unittest.TestCase):
         """
         Test that ENABLE_SCHEMA_VALIDATION is set to 'true' when enabled in the request.
         """
-        req = AppDeploymentRequest(
-            app_name="test-app",
-            components={"bap": True},
-            domain_names={},
-            image_urls={},
-            registry_url="http://mock-reg.com",
-            adapter_config=AdapterConfig(enable_schema_validation=True),
-            registry_config=RegistryConfig(subscriber_id="sub_id", key_id="key_id"),
-            domain_config=DomainConfig(baseDomain="example.com", domainType="google_domain", dnsZone="example-zone")
-        )
+        req = self.base_app_request.model_copy(update={
+            "components": {"bap": True},
+            "adapter_config": AdapterConfig(enable_schema_validation=True),
+        })
         services_to_deploy = ["adapter"]
         env_vars = app_config_generator.get_deployment_environment_variables(req, services_to_deploy)
         self.assertEqual(env_vars["ENABLE_SCHEMA_VALIDATION"], "true")
 
-    @patch('os.path.join', side_effect=os.path.join)
-    @patch('config.app_config_generator.utils.read_yaml_file')
-    def test_extract_final_urls_with_adapter_modules(self, mock_read_yaml_file, mock_os_path_join):
+    def test_extract_final_urls_with_adapter_modules(self):
         """
         Test extracting final URLs, including adapter modules from a mocked adapter.yaml.
         """
-        mock_read_yaml_file.return_value = {
+        self.mock_read_yaml_file.return_value = {
             'modules': [
                 {'name': 'module1', 'path': '/api/v1/module1'},
                 {'name': 'module2', 'path': 'api/v2/module2'},
@@ -643,23 +662,77 @@ class TestAppConfigGenerator(unittest.TestCase):
 
         result_urls = app_config_generator.extract_final_urls(domain_names, services)
         self.assertEqual(result_urls, expected_urls)
-        mock_read_yaml_file.assert_called_once_with(os.path.join(self.mock_generated_configs_dir, "adapter.yaml"))
+        self.mock_read_yaml_file.assert_called_once_with(os.path.join(self.mock_generated_configs_dir, "adapter.yaml"))
 
         adapter_specific_urls_in_log = {
             "adapter": "https://adapter.example.com",
             "adapter_module1": "https://adapter.example.com/api/v1/module1",
             "adapter_module2": "https://adapter.example.com/api/v2/module2",
         }
-        self.mock_logger.debug.assert_any_call(f"Extracted adapter paths from '{os.path.join(self.mock_generated_configs_dir, 'adapter.yaml')}': {adapter_specific_urls_in_log}")
+        self.mock_logger.debug.assert_any_call("Extracted adapter paths from '%s': %s", os.path.join(self.mock_generated_configs_dir, 'adapter.yaml'), adapter_specific_urls_in_log)
+
+
+    def test_extract_final_urls_adapter_config_cached_until_file_changes(self):
+        """
+        Test that adapter.yaml is parsed once and re-read only after its mtime changes.
+        """
+        self.mock_read_yaml_file.return_value = {'modules': [{'name': 'm1', 'path': '/p1'}]}
+        with tempfile.TemporaryDirectory() as configs_dir:
+            adapter_config_path = os.path.join(configs_dir, "adapter.yaml")
+            with open(adapter_config_path, "w") as f:
+                f.write("modules: []")
+
+            with patch.object(app_config_generator, 'GENERATED_CONFIGS_DIR', configs_dir):
+                first = app_config_generator.extract_final_urls({'adapter': 'adapter.example.com'}, ['adapter'])
+                second = app_config_generator.extract_final_urls({'adapter': 'adapter.example.com'}, ['adapter'])
+
+                self.assertEqual(first, second)
+                self.assertEqual(first['adapter_m1'], 'https://adapter.example.com/p1')
+                self.mock_read_yaml_file.assert_called_once_with(adapter_config_path)
+
+                stat = os.stat(adapter_config_path)
+                os.utime(adapter_config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+                app_config_generator.extract_final_urls({'adapter': 'adapter.example.com'}, ['adapter'])
 
+            self.assertEqual(self.mock_read_yaml_file.call_count, 2)
 
-    @patch('os.path.join', side_effect=os.path.join)
-    @patch('config.app_config_generator.utils.read_yaml_file', side_effect=FileNotFoundError)
-    def test_extract_final_urls_adapter_config_not_found(self, mock_read_yaml_file, mock_os_path_join):
+    def test_extract_final_urls_with_preparsed_adapter_modules(self):
+        """
+        Test that adapter modules passed in are used instead of reading adapter.yaml.
+        """
+        adapter_modules = [{'name': 'bapTxnCaller', 'path': '/bap/caller/'}]
+
+        result_urls = app_config_generator.extract_final_urls({"adapter": "adapter.example.com"}, ["adapter"], adapter_modules)
+
+        self.assertEqual(result_urls, {
+            "adapter": "https://adapter.example.com",
+            "adapter_bapTxnCaller": "https://adapter.example.com/bap/caller/",
+        })
+        self.mock_read_yaml_file.assert_not_called()
+
+    def test_adapter_template_renders_adapter_modules(self):
+        """
+        Test that adapter.yaml is rendered with the modules returned by get_adapter_modules.
+        """
+        env = Environment(loader=FileSystemLoader(os.path.join(TEMPLATE_DIRECTORY, 'configs')), trim_blocks=True, lstrip_blocks=True)
+        template = env.get_template('adapter.yaml.j2')
+        for components in ({"bap": True}, {"bpp": True}, {"bap": True, "bpp": True}):
+            with self.subTest(components=components):
+                adapter_modules = app_config_generator.get_adapter_modules(components)
+                rendered = yaml.safe_load(template.render(adapter={}, adapter_modules=adapter_modules))
+                self.assertEqual([{"name": m["name"], "path": m["path"]} for m in rendered["modules"]], adapter_modules)
+                for module in rendered["modules"]:
+                    role, direction = module["path"].strip("/").split("/")
+                    self.assertEqual(module["handler"]["role"], role)
+                    self.assertEqual(module["handler"]["plugins"]["router"]["config"]["routingConfig"], f"/mnt/gcs/configs/{module['name']}-routing.yaml")
+                    self.assertIn("signValidator" if direction == "receiver" else "signer", module["handler"]["plugins"])
+
+    def test_extract_final_urls_adapter_config_not_found(self):
         """
         Test extracting final URLs when adapter.yaml is not found.
         It should fall back to just the base adapter URL.
         """
+        self.mock_read_yaml_file.side_effect = FileNotFoundError
         domain_names = {
             "adapter": "adapter.example.com",
             "gateway": "gateway.example.com"
@@ -673,18 +746,17 @@ class TestAppConfigGenerator(unittest.TestCase):
 
         result_urls = app_config_generator.extract_final_urls(domain_names, services)
         self.assertEqual(result_urls, expected_urls)
-        mock_read_yaml_file.assert_called_once_with(os.path.join(self.mock_generated_configs_dir, "adapter.yaml"))
+        self.mock_read_yaml_file.assert_called_once_with(os.path.join(self.mock_generated_configs_dir, "adapter.yaml"))
         self.mock_logger.warning.assert_called_with(
             f"Application config YAML for adapter not found at '{os.path.join(self.mock_generated_configs_dir, 'adapter.yaml')}'. Skipping adapter module data extraction."
         )
 
-    @patch('os.path.join', side_effect=os.path.join)
-    @patch('config.app_config_generator.utils.read_yaml_file', side_effect=ValueError("Bad YAML"))
-    def test_extract_final_urls_adapter_config_invalid_yaml(self, mock_read_yaml_file, mock_os_path_join):
+    def test_extract_final_urls_adapter_config_invalid_yaml(self):
         """
         Test extracting final URLs when adapter.yaml is invalid.
         It should fall back to just the base adapter URL and log an error.
         """
+        self.mock_read_yaml_file.side_effect = ValueError("Bad YAML")
         domain_names = {
             "adapter": "adapter.example.com"
         }
@@ -696,17 +768,16 @@ class TestAppConfigGenerator(unittest.TestCase):
 
         result_urls = app_config_generator.extract_final_urls(domain_names, services)
         self.assertEqual(result_urls, expected_urls)
-        mock_read_yaml_file.assert_called_once_with(os.path.join(self.mock_generated_configs_dir, "adapter.yaml"))
+        self.mock_read_yaml_file.assert_called_once_with(os.path.join(self.mock_generated_configs_dir, "adapter.yaml"))
         self.mock_logger.error.assert_called_with(
             f"Error parsing application config YAML from '{os.path.join(self.mock_generated_configs_dir, 'adapter.yaml')}': Bad YAML. Skipping adapter module data extraction."
         )
 
-    @patch('os.path.join', side_effect=os.path.join)
-    @patch('config.app_config_generator.utils.read_yaml_file', return_value={'not_modules': []})
-    def test_extract_final_urls_adapter_config_no_modules_key(self, mock_read_yaml_file, mock_os_path_join):
+    def test_extract_final_urls_adapter_config_no_modules_key(self):
         """
         Test extracting final URLs when adapter.yaml exists but lacks the 'modules' key.
         """
+        self.mock_read_yaml_file.return_value = {'not_modules': []}
         domain_names = {"adapter": "adapter.example.com"}
         services = ["adapter"]
         expected_urls = {"adapter": "https://adapter.example.com"}
@@ -717,13 +788,12 @@ class TestAppConfigGenerator(unittest.TestCase):
             f"'modules' key not found or not a list in '{os.path.join(self.mock_generated_configs_dir, 'adapter.yaml')}'. Cannot extract adapter module paths."
         )
 
-    @patch('os.path.join', side_effect=os.path.join)
-    @patch('config.app_config_generator.utils.read_yaml_file', return_value={'modules': [{'name': 'm1', 'path': '/p1'}, 'invalid_module']})
-    def test_extract_final_urls_adapter_config_invalid_module_entry(self, mock_read_yaml_file, mock_os_path_join):
+    def test_extract_final_urls_adapter_config_invalid_module_entry(self):
         """
         Test extracting final URLs when adapter.yaml has invalid module entries.
         It should still process valid ones and skip invalid.
         """
+        self.mock_read_yaml_file.return_value = {'modules': [{'name': 'm1', 'path': '/p1'}, 'invalid_module']}
         domain_names = {"adapter": "adapter.example.com"}
         services = ["adapter"]
         expected_urls = {
@@ -750,11 +820,24 @@ class TestAppConfigGenerator(unittest.TestCase):
         self.mock_logger.warning.assert_any_call(
             "Domain not found for service 'adapter'. Skipping URL extraction for this service."
         )
-        self.mock_logger.debug.assert_any_call("Domain names provided: {'registry': 'registry.example.com'}")
-        self.mock_logger.debug.assert_any_call("Generated URL for registry: https://registry.example.com")
-
-    @patch('urllib.parse.quote', side_effect=urllib.parse.quote)
-    @patch('config.app_config_generator._load_infrastructure_outputs')
+        self.mock_logger.debug.assert_has_calls([
+            call("Domain names provided: %s", {'registry': 'registry.example.com'}),
+            call("Generated URL for %s: %s", "registry", "https://registry.example.com"),
+        ], any_order=True)
+
+    # Encoded Logs Explorer query shared by every service for the mocked infra outputs below.
+    _LOGS_EXPLORER_QUERY_PREFIX = (
+        'https://console.cloud.google.com/logs/query;query=resource.type%3D%22k8s_container%22'
+        '%0Aresource.labels.cluster_name%3D%22test-cluster%22'
+        '%0Aresource.labels.location%3D%22us-central1%22'
+        '%0Aresource.labels.container_name%3D%22'
+    )
+
+    def _expected_logs_explorer_url(self, container_name):
+        return f"{self._LOGS_EXPLORER_QUERY_PREFIX}{container_name}%22;?project=test-project-id"
+
+    @patch('urllib.parse.quote', side_effect=quote)
+    @patch('config.app_config_generator._load_infrastructure_outputs', spec_set=True)
     def test_generate_logs_explorer_urls_success(self, mock_load_infra, mock_quote):
         """
         Test successful generation of Cloud Logs Explorer URLs.
@@ -767,9 +850,9 @@ class TestAppConfigGenerator(unittest.TestCase):
         services = ["adapter", "registry", "my_custom_service"]
         
         expected_logs_explorer_urls = {
-            'adapter': 'https://console.cloud.google.com/logs/query;query=resource.type%3D%22k8s_container%22%0Aresource.labels.cluster_name%3D%22test-cluster%22%0Aresource.labels.location%3D%22us-central1%22%0Aresource.labels.container_name%3D%22onix-adapter%22;?project=test-project-id',
-            'registry': 'https://console.cloud.google.com/logs/query;query=resource.type%3D%22k8s_container%22%0Aresource.labels.cluster_name%3D%22test-cluster%22%0Aresource.labels.location%3D%22us-central1%22%0Aresource.labels.container_name%3D%22onix-registry%22;?project=test-project-id',
-            'my_custom_service': 'https://console.cloud.google.com/logs/query;query=resource.type%3D%22k8s_container%22%0Aresource.labels.cluster_name%3D%22test-cluster%22%0Aresource.labels.location%3D%22us-central1%22%0Aresource.labels.container_name%3D%22onix-my-custom-service%22;?project=test-project-id'
+            'adapter': self._expected_logs_explorer_url('onix-adapter'),
+            'registry': self._expected_logs_explorer_url('onix-registry'),
+            'my_custom_service': self._expected_logs_explorer_url('onix-my-custom-service'),
         }
 
         result_urls = app_config_generator.generate_logs_explorer_urls(services)
@@ -777,12 +860,14 @@ class TestAppConfigGenerator(unittest.TestCase):
         self.assertEqual(result_urls, expected_logs_explorer_urls)
         mock_load_infra.assert_called_once_with(self.mock_tf_dir)
 
-        self.mock_logger.info.assert_any_call("Generating Logs Explorer URLs for services...")
-        self.mock_logger.info.assert_any_call("Generated Logs Explorer URLs.")
-        self.assertEqual(mock_quote.call_count, 3)
+        self.mock_logger.info.assert_has_calls([
+            call("Generating Logs Explorer URLs for services..."),
+            call("Generated Logs Explorer URLs."),
+        ], any_order=True)
+        self.assertEqual(mock_quote.call_count, 4) # Shared query prefix + one container name per service
 
 
-    @patch('config.app_config_generator._load_infrastructure_outputs', side_effect=Exception("Infra load failed"))
+    @patch('config.app_config_generator._load_infrastructure_outputs', spec_set=True, side_effect=Exception("Infra load failed"))
     def test_generate_logs_explorer_urls_infra_load_failure(self, mock_load_infra):
         """
         Test that generate_logs_explorer_urls handles infrastructure loading failures gracefully.
@@ -796,11 +881,13 @@ class TestAppConfigGenerator(unittest.TestCase):
         mock_load_infra.assert_called_once_with(self.mock_tf_dir)
         self.mock_logger.warning.assert_called_once()
         self.assertIn("An error occurred while generating Logs Explorer URLs", self.mock_logger.warning.call_args[0][0])
-        self.mock_logger.info.assert_any_call("Generating Logs Explorer URLs for services...")
-        self.mock_logger.info.assert_any_call("Generated Logs Explorer URLs.")
+        self.mock_logger.info.assert_has_calls([
+            call("Generating Logs Explorer URLs for services..."),
+            call("Generated Logs Explorer URLs."),
+        ], any_order=True)
 
 
-    @patch('config.app_config_generator._load_infrastructure_outputs')
+    @patch('config.app_config_generator._load_infrastructure_outputs', spec_set=True)
     def test_generate_logs_explorer_urls_empty_services(self, mock_load_infra):
         """
         Test generating URLs with an empty list of services.
@@ -816,8 +903,10 @@ class TestAppConfigGenerator(unittest.TestCase):
 
         self.assertEqual(result_urls, {})
         mock_load_infra.assert_called_once_with(self.mock_tf_dir)
-        self.mock_logger.info.assert_any_call("Generating Logs Explorer URLs for services...")
-        self.mock_logger.info.assert_any_call("Generated Logs Explorer URLs.")
+        self.mock_logger.info.assert_has_calls([
+            call("Generating Logs Explorer URLs for services..."),
+            call("Generated Logs Explorer URLs."),
+        ], any_order=True)
 
 
 if __name__ == '__main__':
@@ -17,6 +17,7 @@ import unittest
 import os
 import sys
 import logging
+from contextlib import contextmanager
 from unittest.mock import patch
 
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -27,6 +28,17 @@ from core.models import InfraDeploymentRequest, DeploymentType
 from config import tf_config_generator
 
 
+@contextmanager
+def _quiet_logger(logger):
+    """Silences a logger with a NullHandler for the duration of the block, then restores its state."""
+    saved = (logger.handlers, logger.propagate, logger.disabled, logger.level)
+    logger.handlers, logger.propagate, logger.disabled = [logging.NullHandler()], False, True
+    try:
+        yield logger
+    finally:
+        logger.handlers, logger.propagate, logger.disabled, logger.level = saved
+
+
 class TestTerraformConfigGenerator(unittest.TestCase):
 
     def setUp(self):
@@ -36,25 +48,17 @@ class TestTerraformConfigGenerator(unittest.TestCase):
         self.mock_tf_dir = self.patcher_tf_dir.start()
         self.mock_template_dir = self.patcher_template_dir.start()
 
-        # Reset logger handlers
-        self.original_handlers = tf_config_generator.logger.handlers[:]
-        tf_config_generator.logger.handlers = []
-        tf_config_generator.logger.propagate = False
-        tf_config_generator.logger.setLevel(logging.NOTSET)
+        # Silence the module logger; the context is exited automatically after tearDown.
+        self.enterContext(_quiet_logger(tf_config_generator.logger))
 
     def tearDown(self):
         # Stop all patchers
         self.patcher_tf_dir.stop()
         self.patcher_template_dir.stop()
 
-        # Restore logger state
-        tf_config_generator.logger.handlers = self.original_handlers
-        tf_config_generator.logger.propagate = True
-
     @patch('config.tf_config_generator.write_file_content')
     @patch('config.tf_config_generator.render_jinja_template')
-    @patch('os.path.join', side_effect=os.path.join) # Use real os.path.join unless specific mocks are needed
-    def test_generate_config_success_small(self, mock_os_path_join, mock_render_template, mock_write_file):
+    def test_generate_config_success_small(self, mock_render_template, mock_write_file):
         """
         Test successful generation of Terraform config for 'small' deployment type.
         """
@@ -101,8 +105,7 @@ class TestTerraformConfigGenerator(unittest.TestCase):
 
     @patch('config.tf_config_generator.write_file_content')
     @patch('config.tf_config_generator.render_jinja_template')
-    @patch('os.path.join', side_effect=os.path.join)
-    def test_generate_config_success_medium_no_bap_bpp(self, mock_os_path_join, mock_render_template, mock_write_file):
+    def test_generate_config_success_medium_no_bap_bpp(self, mock_render_template, mock_write_file):
         """
         Test successful generation for 'medium' type with no BAP/BPP components.
         """
@@ -144,9 +147,8 @@ class TestTerraformConfigGenerator(unittest.TestCase):
 
     @patch('config.tf_config_generator.write_file_content', side_effect=IOError("Disk full"))
     @patch('config.tf_config_generator.render_jinja_template', return_value="main_config_content")
-    @patch('os.path.join', side_effect=os.path.join)
     @patch('config.tf_config_generator.logger')
-    def test_generate_config_write_error(self, mock_logger, mock_os_path_join, mock_render_template, mock_write_file):
+    def test_generate_config_write_error(self, mock_logger, mock_render_template, mock_write_file):
         """
         Test error handling when writing the merged tfvars file fails.
         """
@@ -16,7 +16,9 @@ import unittest
 import os
 import sys
 import json
+import orjson
 import asyncio
+import tempfile
 from unittest.mock import patch, mock_open, MagicMock, AsyncMock, call
 from jinja2 import TemplateNotFound
 import logging
@@ -36,13 +38,18 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         self.mock_logger.handlers = []
         self.mock_logger.propagate = False
         self.mock_logger.setLevel(logging.NOTSET) # Set level to NOTSET to ensure all logs are captured by mock
+        # Environments are cached per template directory; start each test from a cold cache.
+        utils._get_env.cache_clear()
+        utils._ensured_dirs.clear()
 
     def tearDown(self):
         patch.stopall() # Stop all patches started in setUp and within tests
+        utils._get_env.cache_clear()
 
-    @patch('core.utils.FileSystemLoader')
-    @patch('core.utils.Environment')
-    def test_render_jinja_template_success(self, MockEnvironment, MockFileSystemLoader):
+    @patch('jinja2.FileSystemBytecodeCache')
+    @patch('jinja2.FileSystemLoader')
+    @patch('jinja2.Environment')
+    def test_render_jinja_template_success(self, MockEnvironment, MockFileSystemLoader, MockBytecodeCache):
         """
         Test successful rendering of a Jinja2 template.
         """
@@ -64,16 +71,34 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         MockEnvironment.assert_called_once_with(
             loader=mock_loader_instance,
             trim_blocks=True,
-            lstrip_blocks=True
+            lstrip_blocks=True,
+            auto_reload=False,
+            cache_size=-1,
+            bytecode_cache=MockBytecodeCache.return_value
         )
         
         mock_env_instance.get_template.assert_called_once_with(template_name)
         mock_template.render.assert_called_once_with(context)
         self.assertEqual(result, "rendered content")
-        self.mock_logger.debug.assert_called_once_with(f"Successfully rendered template: '{template_name}' from '{template_dir}'")
+        self.mock_logger.debug.assert_called_once_with("Successfully rendered template: '%s' from '%s'", template_name, template_dir)
 
 
-    @patch('core.utils.Environment')
+    @patch('jinja2.Environment')
+    def test_render_jinja_template_reuses_environment(self, MockEnvironment):
+        """
+        Test that the Jinja2 Environment is built once per template directory.
+        """
+        mock_env_instance = MockEnvironment.return_value
+        mock_env_instance.get_template.return_value.render.return_value = "rendered content"
+
+        utils.render_jinja_template("/tmp/templates", "a.j2", {})
+        utils.render_jinja_template("/tmp/templates", "b.j2", {})
+        utils.render_jinja_template("/tmp/other_templates", "a.j2", {})
+
+        self.assertEqual(MockEnvironment.call_count, 2)
+        self.assertEqual(mock_env_instance.get_template.call_count, 3)
+
+    @patch('jinja2.Environment')
     def test_render_jinja_template_not_found(self, MockEnvironment):
         """
         Test case where the Jinja2 template is not found.
@@ -92,7 +117,7 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
             f"Jinja2 template not found: '{os.path.join(template_dir, template_name)}'"
         )
 
-    @patch('core.utils.Environment')
+    @patch('jinja2.Environment')
     def test_render_jinja_template_rendering_error(self, MockEnvironment):
         """
         Test case where an error occurs during template rendering.
@@ -111,6 +136,54 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         
         self.mock_logger.exception.assert_called_once()
 
+    def test_render_jinja_template_to_file_success(self):
+        """
+        Test that a template is rendered straight into the output file.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, "test.j2"), "w") as f:
+                f.write("Hello {{ name }}!")
+            output_path = os.path.join(tmp_dir, "out", "test")
+
+            utils.render_jinja_template_to_file(tmp_dir, "test.j2", {"name": "World"}, output_path)
+
+            with open(output_path) as f:
+                self.assertEqual(f.read(), "Hello World!")
+            self.assertFalse(os.path.exists(f"{output_path}.tmp"))
+        self.mock_logger.info.assert_called_once_with(f"Successfully rendered template 'test.j2' to file: '{output_path}'")
+
+    def test_render_jinja_template_to_file_not_found(self):
+        """
+        Test that a missing template raises FileNotFoundError and writes nothing.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = os.path.join(tmp_dir, "out")
+            with self.assertRaisesRegex(FileNotFoundError, "Jinja2 template not found"):
+                utils.render_jinja_template_to_file(tmp_dir, "missing.j2", {}, output_path)
+            self.assertEqual(os.listdir(tmp_dir), [])
+        self.mock_logger.error.assert_called_once_with(
+            f"Jinja2 template not found: '{os.path.join(tmp_dir, 'missing.j2')}'"
+        )
+
+    def test_render_jinja_template_to_file_rendering_error_keeps_existing_file(self):
+        """
+        Test that a failed render raises RuntimeError and leaves the previous output in place.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with open(os.path.join(tmp_dir, "error.j2"), "w") as f:
+                f.write("{{ 1 / 0 }}")
+            output_path = os.path.join(tmp_dir, "out")
+            with open(output_path, "w") as f:
+                f.write("previous content")
+
+            with self.assertRaisesRegex(RuntimeError, "Error rendering template 'error.j2'"):
+                utils.render_jinja_template_to_file(tmp_dir, "error.j2", {}, output_path)
+
+            with open(output_path) as f:
+                self.assertEqual(f.read(), "previous content")
+            self.assertFalse(os.path.exists(f"{output_path}.tmp"))
+        self.mock_logger.exception.assert_called_once()
+
     @patch('builtins.open', new_callable=mock_open, read_data="file content")
     def test_read_file_content_success(self, mock_file):
         """
@@ -120,7 +193,7 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         content = utils.read_file_content(file_path)
         mock_file.assert_called_once_with(file_path, 'r')
         self.assertEqual(content, "file content")
-        self.mock_logger.debug.assert_called_once_with(f"Successfully read content from file: '{file_path}'")
+        self.mock_logger.debug.assert_called_once_with("Successfully read content from file: '%s'", file_path)
 
     @patch('builtins.open', new_callable=mock_open)
     def test_read_file_content_not_found(self, mock_file):
@@ -153,9 +226,9 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         """
         file_path = "/tmp/test.json"
         content = utils.read_json_file(file_path)
-        mock_file.assert_called_once_with(file_path, 'r')
+        mock_file.assert_called_once_with(file_path, 'rb', buffering=utils._IO_BUFFER_SIZE)
         self.assertEqual(content, {"key": "value"})
-        self.mock_logger.debug.assert_called_once_with(f"Successfully read JSON from file: '{file_path}'")
+        self.mock_logger.debug.assert_called_once_with("Successfully read JSON from file: '%s'", file_path)
 
     @patch('builtins.open', new_callable=mock_open)
     def test_read_json_file_not_found(self, mock_file):
@@ -166,7 +239,7 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         file_path = "/tmp/non_existent.json"
         with self.assertRaisesRegex(FileNotFoundError, "JSON file not found"):
             utils.read_json_file(file_path)
-        mock_file.assert_called_once_with(file_path, 'r')
+        mock_file.assert_called_once_with(file_path, 'rb', buffering=utils._IO_BUFFER_SIZE)
         self.mock_logger.error.assert_called_once_with(f"JSON file not found: '{file_path}'")
 
     @patch('builtins.open', new_callable=mock_open, read_data="invalid json")
@@ -177,7 +250,7 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         file_path = "/tmp/invalid.json"
         with self.assertRaises(ValueError):
             utils.read_json_file(file_path)
-        mock_file.assert_called_once_with(file_path, 'r')
+        mock_file.assert_called_once_with(file_path, 'rb', buffering=utils._IO_BUFFER_SIZE)
         self.mock_logger.error.assert_called_once()
 
     @patch('builtins.open', new_callable=mock_open)
@@ -189,7 +262,7 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         file_path = "/tmp/disk_full.json"
         with self.assertRaisesRegex(IOError, "Error reading file"):
             utils.read_json_file(file_path)
-        mock_file.assert_called_once_with(file_path, 'r')
+        mock_file.assert_called_once_with(file_path, 'rb', buffering=utils._IO_BUFFER_SIZE)
         self.mock_logger.exception.assert_called_once()
 
     @patch('builtins.open', new_callable=mock_open)
@@ -205,10 +278,27 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         
         mock_dirname.assert_called_once_with(file_path)
         mock_makedirs.assert_called_once_with("/tmp/dir", exist_ok=True)
-        mock_file.assert_called_once_with(file_path, 'w')
+        mock_file.assert_called_once_with(file_path, 'w', buffering=utils._IO_BUFFER_SIZE)
         mock_file().write.assert_called_once_with(content_to_write)
         self.mock_logger.info.assert_called_once_with(f"Successfully wrote content to file: '{file_path}'")
 
+    @patch('builtins.open', new_callable=mock_open)
+    @patch('os.makedirs')
+    def test_write_file_content_creates_directory_once(self, mock_makedirs, mock_file):
+        """
+        Test that the output directory is only created on the first write into it.
+        """
+        utils.write_file_content("/tmp/dir/first.txt", "first")
+        utils.write_file_content("/tmp/dir/second.txt", "second")
+        utils.write_file_content("/tmp/other_dir/third.txt", "third")
+
+        mock_makedirs.assert_has_calls([
+            call("/tmp/dir", exist_ok=True),
+            call("/tmp/other_dir", exist_ok=True),
+        ])
+        self.assertEqual(mock_makedirs.call_count, 2)
+        self.assertEqual(mock_file.call_count, 3)
+
     @patch('builtins.open', new_callable=mock_open)
     @patch('os.makedirs')
     @patch('os.path.dirname', return_value="/tmp/dir")
@@ -225,7 +315,7 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         
         mock_dirname.assert_called_once_with(file_path)
         mock_makedirs.assert_called_once_with("/tmp/dir", exist_ok=True)
-        mock_file.assert_called_once_with(file_path, 'w')
+        mock_file.assert_called_once_with(file_path, 'w', buffering=utils._IO_BUFFER_SIZE)
         self.mock_logger.exception.assert_called_once()
 
     @patch('builtins.open', new_callable=mock_open, read_data="key: value\nlist:\n  - item1\n  - item2")
@@ -236,9 +326,9 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         file_path = "/tmp/test.yaml"
         expected_content = {"key": "value", "list": ["item1", "item2"]}
         content = utils.read_yaml_file(file_path)
-        mock_file.assert_called_once_with(file_path, 'r')
+        mock_file.assert_called_once_with(file_path, 'rb', buffering=utils._IO_BUFFER_SIZE)
         self.assertEqual(content, expected_content)
-        self.mock_logger.debug.assert_called_once_with(f"Successfully read YAML from file: '{file_path}'")
+        self.mock_logger.debug.assert_called_once_with("Successfully read YAML from file: '%s'", file_path)
 
     @patch('builtins.open', new_callable=mock_open)
     def test_read_yaml_file_not_found(self, mock_file):
@@ -249,7 +339,7 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         file_path = "/tmp/non_existent.yaml"
         with self.assertRaisesRegex(FileNotFoundError, "YAML file not found"):
             utils.read_yaml_file(file_path)
-        mock_file.assert_called_once_with(file_path, 'r')
+        mock_file.assert_called_once_with(file_path, 'rb', buffering=utils._IO_BUFFER_SIZE)
         self.mock_logger.error.assert_called_once_with(f"YAML file not found: '{file_path}'")
 
     @patch('builtins.open', new_callable=mock_open, read_data="key: : invalid yaml")
@@ -260,7 +350,7 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         file_path = "/tmp/invalid.yaml"
         with self.assertRaises(ValueError):
             utils.read_yaml_file(file_path)
-        mock_file.assert_called_once_with(file_path, 'r')
+        mock_file.assert_called_once_with(file_path, 'rb', buffering=utils._IO_BUFFER_SIZE)
         self.mock_logger.error.assert_called_once()
 
     @patch('builtins.open', new_callable=mock_open)
@@ -272,9 +362,21 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         file_path = "/tmp/device_not_ready.yaml"
         with self.assertRaisesRegex(IOError, "Error reading file"):
             utils.read_yaml_file(file_path)
-        mock_file.assert_called_once_with(file_path, 'r')
+        mock_file.assert_called_once_with(file_path, 'rb', buffering=utils._IO_BUFFER_SIZE)
         self.mock_logger.exception.assert_called_once()
 
+    def test_yaml_safe_loader_warns_once_without_libyaml(self):
+        """
+        Test that the pure-Python loader fallback is reported once, not on every YAML read.
+        """
+        import yaml
+        utils._yaml_safe_loader.cache_clear()
+        self.addCleanup(utils._yaml_safe_loader.cache_clear)
+        with patch.object(yaml, '__with_libyaml__', False):
+            utils._yaml_safe_loader()
+            utils._yaml_safe_loader()
+        self.mock_logger.warning.assert_called_once()
+
     # --- Tests for stream_subprocess_output ---
 
     async def test_stream_subprocess_output_success(self):
@@ -300,14 +402,12 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
         # Assertions for readline calls
         mock_process.stdout.readline.assert_has_calls([call(), call(), call(), call()])
 
-        # Assertions for websocket send_text calls
-        expected_calls = [
-            call(json.dumps({"type": "log", "action": stream_name, "message": "Hello from subprocess"})),
-            call(json.dumps({"type": "log", "action": stream_name, "message": "Error message"})), # Cleaned ANSI
-            call(json.dumps({"type": "log", "action": stream_name, "message": "Another line"})),
-        ]
-        mock_websocket.send_text.assert_has_calls(expected_calls)
-        self.assertEqual(mock_websocket.send_text.call_count, 3)
+        # All lines arrive together, so they are sent as a single batch
+        mock_websocket.send_text.assert_called_once_with(orjson.dumps({
+            "type": "log_batch",
+            "action": stream_name,
+            "messages": ["Hello from subprocess", "Error message", "Another line"], # Cleaned ANSI
+        }).decode())
 
         # Assertions for logger info calls
         expected_log_calls = [
@@ -369,13 +469,70 @@ class TestCoreUtils(unittest.IsolatedAsyncioTestCase): # Changed to IsolatedAsyn
 
         await utils.stream_subprocess_output(mock_process, mock_websocket, stream_name)
 
-        expected_calls = [
-            call(json.dumps({"type": "log", "action": stream_name, "message": "Actual content here"})),
-        ]
-        mock_websocket.send_text.assert_has_calls(expected_calls)
-        self.assertEqual(mock_websocket.send_text.call_count, 1)
+        mock_websocket.send_text.assert_called_once_with(
+            orjson.dumps({"type": "log_batch", "action": stream_name, "messages": ["Actual content here"]}).decode()
+        )
         self.mock_logger.info.assert_called_once_with(f"[{stream_name}] Actual content here")
 
+    async def test_flush_log_batch_matches_full_serialization(self):
+        """
+        Test that the prebuilt frame prefix produces the same JSON as serializing the whole message.
+        """
+        mock_websocket = AsyncMock()
+        stream_name = 'stream "with" quotes'
+
+        await utils._flush_log_batch(mock_websocket, stream_name, [b'line "one"\n', b'line \xe2\x9c\x93\n'])
+
+        sent = mock_websocket.send_text.call_args.args[0]
+        self.assertEqual(sent, orjson.dumps({"type": "log_batch", "action": stream_name, "messages": ['line "one"', "line \u2713"]}).decode())
+
+    @patch('core.utils.LOG_BATCH_MAX_LINES', 2)
+    async def test_stream_subprocess_output_flushes_full_batch(self):
+        """
+        Test that a batch is sent as soon as it reaches the maximum number of lines.
+        """
+        mock_process = MagicMock(spec=asyncio.subprocess.Process)
+        mock_process.stdout = AsyncMock()
+        mock_process.stdout.readline.side_effect = [b"line 1\n", b"line 2\n", b"line 3\n", b""]
+
+        mock_websocket = AsyncMock()
+        stream_name = "batched_stream"
+
+        await utils.stream_subprocess_output(mock_process, mock_websocket, stream_name)
+
+        mock_websocket.send_text.assert_has_calls([
+            call(orjson.dumps({"type": "log_batch", "action": stream_name, "messages": ["line 1", "line 2"]}).decode()),
+            call(orjson.dumps({"type": "log_batch", "action": stream_name, "messages": ["line 3"]}).decode()),
+        ])
+        self.assertEqual(mock_websocket.send_text.call_count, 2)
+
+    @patch('core.utils.LOG_BATCH_FLUSH_INTERVAL_SECONDS', 0.01)
+    async def test_stream_subprocess_output_flushes_after_interval(self):
+        """
+        Test that buffered lines are sent when the next line is slower than the flush interval.
+        """
+        mock_process = MagicMock(spec=asyncio.subprocess.Process)
+        mock_process.stdout = asyncio.StreamReader()
+
+        async def produce_output():
+            mock_process.stdout.feed_data(b"first line\n")
+            await asyncio.sleep(0.1)
+            mock_process.stdout.feed_data(b"second line\n")
+            mock_process.stdout.feed_eof()
+
+        mock_websocket = AsyncMock()
+        stream_name = "slow_stream"
+
+        producer = asyncio.create_task(produce_output())
+        await utils.stream_subprocess_output(mock_process, mock_websocket, stream_name)
+        await producer
+
+        mock_websocket.send_text.assert_has_calls([
+            call(orjson.dumps({"type": "log_batch", "action": stream_name, "messages": ["first line"]}).decode()),
+            call(orjson.dumps({"type": "log_batch", "action": stream_name, "messages": ["second line"]}).decode()),
+        ])
+        self.assertEqual(mock_websocket.send_text.call_count, 2)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -14,11 +14,12 @@
 
 import unittest
 import asyncio
-import json
+import itertools
+import orjson
 import os
 import logging
 import re
-from unittest.mock import MagicMock, AsyncMock, patch, call
+from unittest.mock import AsyncMock, patch, call
 
 import sys
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
@@ -74,10 +75,9 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
         patch.stopall()
 
     @patch('asyncio.create_subprocess_exec')
-    @patch('builtins.open', new_callable=MagicMock)
-    @patch('json.load', return_value={"output_key": {"value": "output_value"}})
+    @patch('services.deployment_manager.utils.read_json_file', return_value={"output_key": {"value": "output_value"}})
     # Removed: @patch('core.utils.stream_subprocess_output')
-    async def test_run_infra_deployment_success(self, mock_json_load, mock_open, mock_create_subprocess_exec):
+    async def test_run_infra_deployment_success(self, mock_read_json_file, mock_create_subprocess_exec):
         mock_process = AsyncMock()
         mock_process.stdout = AsyncMock() # Added to simulate stdout for the actual stream_subprocess_output
         mock_process.stdout.readline.side_effect = [b"Infra log 1\n", b"Infra log 2\n", b""] # Added for actual stream_subprocess_output
@@ -99,22 +99,20 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
             cwd=self.mock_terraform_directory
         )
         # Removed assert for mock_stream_subprocess_output as it's no longer mocked
-        self.assertEqual(self.mock_websocket.send_text.call_count, 6) # 3 info + 2 log + 1 success (now that logs are simulated)
+        self.assertEqual(self.mock_websocket.send_text.call_count, 5) # 3 info + 1 log batch + 1 success (now that logs are simulated)
 
         expected_messages = [
-            json.dumps({"type": "info", "message": "Generating Terraform configurations..."}),
-            json.dumps({"type": "info", "message": "Terraform configurations generated successfully."}),
-            json.dumps({"type": "info", "message": "Executing infrastructure deployment script..."}),
-            json.dumps({"type": "log", "action": "infra_deploy_log", "message": "Infra log 1"}),
-            json.dumps({"type": "log", "action": "infra_deploy_log", "message": "Infra log 2"}),
-            json.dumps({"type": "success", "message": {"output_key": {"value": "output_value"}}}),
+            orjson.dumps({"type": "info", "message": "Generating Terraform configurations..."}).decode(),
+            orjson.dumps({"type": "info", "message": "Terraform configurations generated successfully."}).decode(),
+            orjson.dumps({"type": "info", "message": "Executing infrastructure deployment script..."}).decode(),
+            orjson.dumps({"type": "log_batch", "action": "infra_deploy_log", "messages": ["Infra log 1", "Infra log 2"]}).decode(),
+            orjson.dumps({"type": "success", "message": {"output_key": {"value": "output_value"}}}).decode(),
         ]
         
         for msg in expected_messages:
             self.mock_websocket.send_text.assert_any_call(msg)
 
-        mock_open.assert_called_once_with(os.path.join(self.mock_terraform_directory, "outputs.json"), "r")
-        mock_json_load.assert_called_once()
+        mock_read_json_file.assert_called_once_with(os.path.join(self.mock_terraform_directory, "outputs.json"))
         self.mock_logger.info.assert_any_call("Terraform configurations generated successfully.")
         self.mock_logger.info.assert_any_call("Successfully sent outputs.json content to client.")
 
@@ -130,8 +128,8 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
 
         self.mock_tf_config.generate_config.assert_called_once_with(config_request)
         self.assertEqual(self.mock_websocket.send_text.call_count, 2) # 1 info + 1 error
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "info", "message": "Generating Terraform configurations..."}))
-        self.mock_websocket.send_text.assert_called_with(json.dumps({"type": "error", "message": "Failed to generate Terraform configurations: Config error"}))
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "info", "message": "Generating Terraform configurations..."}).decode())
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({"type": "error", "message": "Failed to generate Terraform configurations: Config error"}).decode())
         self.mock_logger.error.assert_called_once()
         
         mock_create_subprocess_exec_in_this_test = patch('asyncio.create_subprocess_exec').start()
@@ -149,8 +147,8 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
 
         self.mock_tf_config.generate_config.assert_called_once()
         mock_create_subprocess_exec.assert_called_once()
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "info", "message": "Executing infrastructure deployment script..."}))
-        self.mock_websocket.send_text.assert_called_with(json.dumps({"type": "error", "message": f"Infrastructure deployment script not found at: {self.mock_infra_script_path}"}))
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "info", "message": "Executing infrastructure deployment script..."}).decode())
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({"type": "error", "message": f"Infrastructure deployment script not found at: {self.mock_infra_script_path}"}).decode())
         self.mock_logger.error.assert_called_once()
 
 
@@ -174,14 +172,14 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
         self.mock_tf_config.generate_config.assert_called_once()
         mock_create_subprocess_exec.assert_called_once()
         # Removed assert for mock_stream_subprocess_output
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "log", "action": "infra_deploy_log", "message": "Infra log error"})) # Added expected log messages
-        self.mock_websocket.send_text.assert_called_with(json.dumps({"type": "error", "message": "Script failed with exit code: 1"}))
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "log_batch", "action": "infra_deploy_log", "messages": ["Infra log error"]}).decode()) # Added expected log messages
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({"type": "error", "message": "Script failed with exit code: 1"}).decode())
         mock_open.assert_not_called()
 
     @patch('asyncio.create_subprocess_exec')
-    @patch('builtins.open', side_effect=FileNotFoundError("Outputs JSON not found"))
+    @patch('services.deployment_manager.utils.read_json_file', side_effect=FileNotFoundError("Outputs JSON not found"))
     # Removed: @patch('core.utils.stream_subprocess_output')
-    async def test_run_infra_deployment_outputs_json_not_found(self, mock_open, mock_create_subprocess_exec):
+    async def test_run_infra_deployment_outputs_json_not_found(self, mock_read_json_file, mock_create_subprocess_exec):
         mock_process = AsyncMock()
         mock_process.stdout = AsyncMock() # Added for actual stream_subprocess_output
         mock_process.stdout.readline.side_effect = [b"Infra log\n", b""] # Added for actual stream_subprocess_output
@@ -198,16 +196,15 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
         self.mock_tf_config.generate_config.assert_called_once()
         mock_create_subprocess_exec.assert_called_once()
         # Removed assert for mock_stream_subprocess_output
-        mock_open.assert_called_once_with(os.path.join(self.mock_terraform_directory, "outputs.json"), "r")
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "log", "action": "infra_deploy_log", "message": "Infra log"})) # Added expected log messages
-        self.mock_websocket.send_text.assert_called_with(json.dumps({"type": "error", "message": f"Error: outputs.json not found at {os.path.join(self.mock_terraform_directory, 'outputs.json')}"}))
+        mock_read_json_file.assert_called_once_with(os.path.join(self.mock_terraform_directory, "outputs.json"))
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "log_batch", "action": "infra_deploy_log", "messages": ["Infra log"]}).decode()) # Added expected log messages
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({"type": "error", "message": f"Error: outputs.json not found at {os.path.join(self.mock_terraform_directory, 'outputs.json')}"}).decode())
         self.mock_logger.error.assert_called_once()
 
     @patch('asyncio.create_subprocess_exec')
-    @patch('builtins.open', new_callable=MagicMock)
-    @patch('json.load', side_effect=json.JSONDecodeError("Invalid JSON", doc="{}", pos=1))
+    @patch('services.deployment_manager.utils.read_json_file', side_effect=ValueError("Error decoding JSON"))
     # Removed: @patch('core.utils.stream_subprocess_output')
-    async def test_run_infra_deployment_outputs_json_decode_error(self, mock_json_load, mock_open, mock_create_subprocess_exec):
+    async def test_run_infra_deployment_outputs_json_decode_error(self, mock_read_json_file, mock_create_subprocess_exec):
         mock_process = AsyncMock()
         mock_process.stdout = AsyncMock() # Added for actual stream_subprocess_output
         mock_process.stdout.readline.side_effect = [b"Infra log\n", b""] # Added for actual stream_subprocess_output
@@ -224,10 +221,9 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
         self.mock_tf_config.generate_config.assert_called_once()
         mock_create_subprocess_exec.assert_called_once()
         # Removed assert for mock_stream_subprocess_output
-        mock_open.assert_called_once_with(os.path.join(self.mock_terraform_directory, "outputs.json"), "r")
-        mock_json_load.assert_called_once()
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "log", "action": "infra_deploy_log", "message": "Infra log"})) # Added expected log messages
-        self.mock_websocket.send_text.assert_called_with(json.dumps({"type": "error", "message": f"Error: Could not decode outputs.json at {os.path.join(self.mock_terraform_directory, 'outputs.json')}"}))
+        mock_read_json_file.assert_called_once_with(os.path.join(self.mock_terraform_directory, "outputs.json"))
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "log_batch", "action": "infra_deploy_log", "messages": ["Infra log"]}).decode()) # Added expected log messages
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({"type": "error", "message": f"Error: Could not decode outputs.json at {os.path.join(self.mock_terraform_directory, 'outputs.json')}"}).decode())
         self.mock_logger.error.assert_called_once()
 
     @patch('asyncio.create_subprocess_exec', side_effect=Exception("Unexpected error"))
@@ -241,10 +237,28 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
 
         self.mock_tf_config.generate_config.assert_called_once()
         mock_create_subprocess_exec.assert_called_once()
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "info", "message": "Executing infrastructure deployment script..."}))
-        self.mock_websocket.send_text.assert_called_with(json.dumps({"type": "error", "message": "An error occurred during infrastructure deployment: Unexpected error"}))
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "info", "message": "Executing infrastructure deployment script..."}).decode())
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({"type": "error", "message": "An error occurred during infrastructure deployment: Unexpected error"}).decode())
         self.mock_logger.exception.assert_called_once()
 
+    def test_get_services_to_deploy_returns_sorted_services(self):
+        """
+        Test that services come back in sorted order for every component combination.
+        """
+        self.mock_app_config.should_deploy_subscriber.side_effect = app_config.should_deploy_subscriber
+        for bap, bpp, gateway, registry in itertools.product((False, True), repeat=4):
+            components = {"bap": bap, "bpp": bpp, "gateway": gateway, "registry": registry}
+            app_req = AppDeploymentRequest(
+                app_name="test-app", components=components, domain_names={}, image_urls={},
+                registry_url=self.dummy_registry_url, registry_config=self.dummy_registry_config,
+                domain_config=self.dummy_domain_config
+            )
+            with self.subTest(components=components):
+                services = dm._get_services_to_deploy(app_req)
+                self.assertEqual(services, sorted(services))
+                self.assertEqual("registry_admin" in services, registry)
+                self.assertEqual("subscriber" in services, app_config.should_deploy_subscriber(components))
+
     @patch('services.deployment_manager._get_services_to_deploy', return_value=["adapter", "registry"])
     @patch('asyncio.create_subprocess_exec')
     # Removed: @patch('core.utils.stream_subprocess_output')
@@ -257,6 +271,7 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
 
         self.mock_app_config.get_deployment_environment_variables.return_value = {"TEST_ENV_VAR": "value"}
         self.mock_app_config.generate_logs_explorer_urls.return_value = {"adapter": "adapter-logs-url", "registry": "registry-logs-url"}
+        self.mock_app_config.generate_app_configs.return_value = [{"name": "bapTxnCaller", "path": "/bap/caller/"}]
         self.mock_app_config.extract_final_urls.return_value = {"adapter": "https://adapter.com", "registry": "https://registry.com"}
 
 
@@ -270,7 +285,9 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
             domain_config=self.dummy_domain_config
         )
 
-        await dm.run_app_deployment(app_req, self.mock_websocket)
+        # Variables set after import still reach the script.
+        with patch.dict(os.environ, {"SET_AFTER_IMPORT": "yes"}):
+            await dm.run_app_deployment(app_req, self.mock_websocket)
 
         self.mock_app_config.generate_app_configs.assert_called_once_with(app_req)
         mock_get_services_to_deploy.assert_called_once_with(app_req)
@@ -282,12 +299,13 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(kwargs['cwd'], self.mock_terraform_directory)
         self.assertIn("TEST_ENV_VAR", kwargs['env'])
         self.assertEqual(kwargs['env']['TEST_ENV_VAR'], "value")
+        self.assertEqual(kwargs['env']['SET_AFTER_IMPORT'], "yes")
         self.assertIn("PATH", kwargs['env'])
 
         # Removed assert for mock_stream_subprocess_output
-        self.assertEqual(self.mock_websocket.send_text.call_count, 6) # 3 info + 2 log + 1 success
+        self.assertEqual(self.mock_websocket.send_text.call_count, 5) # 3 info + 1 log batch + 1 success
 
-        expected_success_message = json.dumps({
+        expected_success_message = orjson.dumps({
             "type": "success",
             "action": "app_deploy_complete",
             "message": "Application deployment successful!",
@@ -296,19 +314,23 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
                 "services_deployed": ["adapter", "registry"],
                 "logs_explorer_urls": {"adapter": "adapter-logs-url", "registry": "registry-logs-url"},
             }
-        })
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "info", "message": "Generating application configurations..."}))
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "info", "message": "Application configurations generated successfully."}))
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "info", "message": "Executing application deployment script..."}))
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "log", "action": "app_deploy_log", "message": "App log 1"})) # Added expected log messages
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "log", "action": "app_deploy_log", "message": "App log 2"})) # Added expected log messages
+        }).decode()
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "info", "message": "Generating application configurations..."}).decode())
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "info", "message": "Application configurations generated successfully."}).decode())
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "info", "message": "Executing application deployment script..."}).decode())
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "log_batch", "action": "app_deploy_log", "messages": ["App log 1", "App log 2"]}).decode()) # Added expected log messages
         self.mock_websocket.send_text.assert_called_with(expected_success_message)
 
         self.mock_app_config.generate_logs_explorer_urls.assert_called_once_with(["adapter", "registry"])
-        self.mock_app_config.extract_final_urls.assert_called_once_with(app_req.domain_names, ["adapter", "registry"])
+        self.mock_app_config.extract_final_urls.assert_called_once_with(
+            app_req.domain_names, ["adapter", "registry"], [{"name": "bapTxnCaller", "path": "/bap/caller/"}]
+        )
         self.mock_logger.info.assert_any_call("Environment variables for app script prepared.")
         self.mock_logger.info.assert_any_call("Application configuration YAMLs generated successfully.")
-        self.mock_logger.info.assert_any_call(expected_success_message)
+        self.mock_logger.info.assert_any_call(
+            "Application deployment successful; sending %d-byte completion message.", len(expected_success_message)
+        )
+        self.mock_logger.debug.assert_any_call(expected_success_message)
 
 
     async def test_run_app_deployment_config_generation_failure(self):
@@ -325,12 +347,12 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
         await dm.run_app_deployment(app_req, self.mock_websocket)
 
         self.mock_app_config.generate_app_configs.assert_called_once_with(app_req)
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "info", "message": "Generating application configurations..."}))
-        self.mock_websocket.send_text.assert_called_with(json.dumps({
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "info", "message": "Generating application configurations..."}).decode())
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({
             "type": "error",
             "action": "app_config_error",
             "message": "Error generating application configs: Required outputs.json not found or script not found: App config template missing. Ensure infrastructure is deployed."
-        }))
+        }).decode())
         self.mock_logger.error.assert_called_once()
         self.mock_app_config.get_deployment_environment_variables.assert_not_called()
 
@@ -361,12 +383,12 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
         self.mock_app_config.get_deployment_environment_variables.assert_called_once_with(app_req, ["adapter"])
         mock_create_subprocess_exec.assert_called_once()
         # Removed assert for mock_stream_subprocess_output
-        self.mock_websocket.send_text.assert_any_call(json.dumps({"type": "log", "action": "app_deploy_log", "message": "App log error"})) # Added expected log messages
-        self.mock_websocket.send_text.assert_called_with(json.dumps({
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({"type": "log_batch", "action": "app_deploy_log", "messages": ["App log error"]}).decode()) # Added expected log messages
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({
             "type": "error",
             "action": "app_deploy_failed",
             "message": "Application deployment script failed with exit code: 1. Check logs above for details."
-        }))
+        }).decode())
 
     @patch('services.deployment_manager._get_services_to_deploy', return_value=["adapter"])
     @patch('asyncio.create_subprocess_exec', side_effect=Exception("Unexpected app process error"))
@@ -385,11 +407,11 @@ class TestDeploymentManager(unittest.IsolatedAsyncioTestCase):
         mock_get_services_to_deploy.assert_called_once_with(app_req)
         self.mock_app_config.get_deployment_environment_variables.assert_called_once_with(app_req, ["adapter"])
         mock_create_subprocess_exec.assert_called_once()
-        self.mock_websocket.send_text.assert_called_with(json.dumps({
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({
             "type": "error",
             "action": "app_deploy_exception",
             "message": "An unexpected error occurred during app deployment: Unexpected app process error"
-        }))
+        }).decode())
         self.mock_logger.exception.assert_called_once()
 
     @patch('services.deployment_manager.app_config.should_deploy_subscriber')
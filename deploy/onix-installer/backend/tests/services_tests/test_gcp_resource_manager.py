@@ -18,7 +18,6 @@ import unittest
 import asyncio
 import json
 import logging
-import subprocess
 from unittest.mock import MagicMock, AsyncMock, patch, call
 
 from fastapi import HTTPException
@@ -35,12 +34,23 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
         self.mock_logger.handlers = []
         self.mock_logger.propagate = False
         self.mock_logger.setLevel(logging.NOTSET)
+        gcp_resource_manager.clear_regions_cache()
 
     def tearDown(self):
         patch.stopall()
 
+    @staticmethod
+    def _mock_gcloud_process(stdout: bytes = b"", stderr: bytes = b"", returncode: int = 0):
+        """
+        Builds a mock asyncio subprocess whose communicate() returns the given output.
+        """
+        mock_process = MagicMock()
+        mock_process.communicate = AsyncMock(return_value=(stdout, stderr))
+        mock_process.returncode = returncode
+        return mock_process
+
 
-    @patch('services.gcp_resource_manager.resourcemanager_v3.ProjectsClient')
+    @patch('services.gcp_resource_manager.resourcemanager_v3.ProjectsAsyncClient')
     async def test_list_google_cloud_projects_success(self, MockProjectsClient):
         """
         Test successful listing of Google Cloud projects.
@@ -51,22 +61,26 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
         mock_project2 = MagicMock()
         mock_project2.project_id = "project-a"
         
-        # Mock the pager behavior.
-        mock_pager = [mock_project1, mock_project2]
-        
-        MockProjectsClient.return_value.search_projects.return_value = mock_pager
+        # Mock the async pager behavior.
+        mock_pager = MagicMock()
+        mock_pager.__aiter__.return_value = [mock_project1, mock_project2]
+
+        mock_client = MockProjectsClient.return_value
+        mock_client.__aenter__.return_value = mock_client
+        mock_client.search_projects = AsyncMock(return_value=mock_pager)
 
         projects = await gcp_resource_manager.list_google_cloud_projects()
 
         MockProjectsClient.assert_called_once()
-        MockProjectsClient.return_value.search_projects.assert_called_once()
+        mock_client.search_projects.assert_awaited_once()
+        mock_client.__aexit__.assert_awaited_once()
         
         self.assertEqual(projects, ["project-a", "project-b"])
         self.mock_logger.info.assert_called_with("Successfully retrieved 2 Google Cloud projects.")
         self.mock_logger.error.assert_not_called()
         self.mock_logger.exception.assert_not_called()
 
-    @patch('services.gcp_resource_manager.resourcemanager_v3.ProjectsClient', side_effect=GoogleAuthError("Auth failed"))
+    @patch('services.gcp_resource_manager.resourcemanager_v3.ProjectsAsyncClient', side_effect=GoogleAuthError("Auth failed"))
     async def test_list_google_cloud_projects_auth_error(self, MockProjectsClient):
         """
         Test handling of GoogleAuthError when listing projects.
@@ -80,7 +94,7 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
         self.mock_logger.exception.assert_not_called()
         self.mock_logger.info.assert_not_called()
 
-    @patch('services.gcp_resource_manager.resourcemanager_v3.ProjectsClient', side_effect=Exception("Unexpected error"))
+    @patch('services.gcp_resource_manager.resourcemanager_v3.ProjectsAsyncClient', side_effect=Exception("Unexpected error"))
     async def test_list_google_cloud_projects_general_exception(self, MockProjectsClient):
         """
         Test handling of a general unexpected Exception when listing projects.
@@ -94,8 +108,8 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
         self.mock_logger.error.assert_not_called()
         self.mock_logger.info.assert_not_called()
 
-    @patch('services.gcp_resource_manager.asyncio.to_thread')
-    async def test_list_google_cloud_regions_success(self, mock_to_thread):
+    @patch('services.gcp_resource_manager.asyncio.create_subprocess_exec')
+    async def test_list_google_cloud_regions_success(self, mock_create_subprocess_exec):
         """
         Test successful listing of Google Cloud regions via gcloud CLI.
         """
@@ -105,20 +119,14 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
             {"name": "asia-east1", "status": "UP"},
         ]
         
-        mock_result = MagicMock()
-        mock_result.stdout = json.dumps(mock_regions_data)
-        mock_result.returncode = 0
-        
-        mock_to_thread.return_value = mock_result
+        mock_create_subprocess_exec.return_value = self._mock_gcloud_process(json.dumps(mock_regions_data).encode())
 
         regions = await gcp_resource_manager.list_google_cloud_regions()
 
-        mock_to_thread.assert_called_once_with(
-            subprocess.run,
-            ["gcloud", "compute", "regions", "list", "--format=json"],
-            capture_output=True,
-            text=True,
-            check=True
+        mock_create_subprocess_exec.assert_called_once_with(
+            "gcloud", "compute", "regions", "list", "--format=json",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
         )
         self.assertEqual(regions, ["us-central1", "europe-west1", "asia-east1"])
         self.mock_logger.info.assert_has_calls([
@@ -128,8 +136,40 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
         self.mock_logger.error.assert_not_called()
         self.mock_logger.exception.assert_not_called()
 
-    @patch('services.gcp_resource_manager.asyncio.to_thread', side_effect=FileNotFoundError())
-    async def test_list_google_cloud_regions_gcloud_not_found(self, mock_to_thread):
+    @patch('services.gcp_resource_manager.asyncio.create_subprocess_exec')
+    async def test_list_google_cloud_regions_cached(self, mock_create_subprocess_exec):
+        """
+        Test that regions are served from the cache until the TTL expires.
+        """
+        mock_create_subprocess_exec.return_value = self._mock_gcloud_process(b'[{"name": "us-central1"}]')
+
+        with patch('services.gcp_resource_manager.time.monotonic', return_value=1000.0):
+            first = await gcp_resource_manager.list_google_cloud_regions()
+            first.append("mutated-by-caller")
+            second = await gcp_resource_manager.list_google_cloud_regions()
+
+        self.assertEqual(second, ["us-central1"])
+        mock_create_subprocess_exec.assert_called_once()
+
+        expired = 1000.0 + gcp_resource_manager.REGIONS_CACHE_TTL_SECONDS
+        with patch('services.gcp_resource_manager.time.monotonic', return_value=expired):
+            await gcp_resource_manager.list_google_cloud_regions()
+        self.assertEqual(mock_create_subprocess_exec.call_count, 2)
+
+    @patch('services.gcp_resource_manager.asyncio.create_subprocess_exec')
+    async def test_list_google_cloud_regions_concurrent_calls_share_one_fetch(self, mock_create_subprocess_exec):
+        """
+        Test that concurrent callers on a cold cache trigger a single gcloud call.
+        """
+        mock_create_subprocess_exec.return_value = self._mock_gcloud_process(b'[{"name": "us-central1"}]')
+
+        results = await asyncio.gather(*(gcp_resource_manager.list_google_cloud_regions() for _ in range(3)))
+
+        self.assertEqual(results, [["us-central1"]] * 3)
+        mock_create_subprocess_exec.assert_called_once()
+
+    @patch('services.gcp_resource_manager.asyncio.create_subprocess_exec', side_effect=FileNotFoundError())
+    async def test_list_google_cloud_regions_gcloud_not_found(self, mock_create_subprocess_exec):
         """
         Test handling of FileNotFoundError when gcloud command is not found.
         """
@@ -141,20 +181,16 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
         self.mock_logger.error.assert_called_once_with("Error: 'gcloud' command not found. Please ensure the Google Cloud SDK is installed and configured in your system's PATH.")
         self.mock_logger.exception.assert_not_called()
 
-    @patch('services.gcp_resource_manager.asyncio.to_thread')
-    async def test_list_google_cloud_regions_subprocess_called_process_error(self, mock_to_thread):
+    @patch('services.gcp_resource_manager.asyncio.create_subprocess_exec')
+    async def test_list_google_cloud_regions_subprocess_called_process_error(self, mock_create_subprocess_exec):
         """
         Test handling of subprocess.CalledProcessError when gcloud command fails.
         """
         mock_error_string = "ERROR: (gcloud) Insufficient permissions."
         
-        # When subprocess.run is called with text=True, e.stderr is a string.
-        # We need to ensure the mocked CalledProcessError also presents stderr as a string.
-        mock_to_thread.side_effect = subprocess.CalledProcessError(
-            cmd=["gcloud", "compute", "regions", "list"],
-            returncode=1,
-            # Pass stderr as a string directly, as it would be if text=True was used.
-            stderr=mock_error_string 
+        # gcloud exits non-zero and reports the problem on stderr.
+        mock_create_subprocess_exec.return_value = self._mock_gcloud_process(
+            stderr=mock_error_string.encode(), returncode=1
         )
 
         with self.assertRaises(HTTPException) as cm:
@@ -165,16 +201,12 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
         self.mock_logger.error.assert_called_once_with(f"An error occurred while executing the gcloud command. Stderr: {mock_error_string}")
         self.mock_logger.exception.assert_not_called()
 
-    @patch('services.gcp_resource_manager.asyncio.to_thread')
-    async def test_list_google_cloud_regions_json_decode_error(self, mock_to_thread):
+    @patch('services.gcp_resource_manager.asyncio.create_subprocess_exec')
+    async def test_list_google_cloud_regions_json_decode_error(self, mock_create_subprocess_exec):
         """
         Test handling of json.JSONDecodeError when gcloud output is invalid JSON.
         """
-        mock_result = MagicMock()
-        mock_result.stdout = "This is not JSON"
-        mock_result.returncode = 0
-        
-        mock_to_thread.return_value = mock_result
+        mock_create_subprocess_exec.return_value = self._mock_gcloud_process(b"This is not JSON")
 
         with self.assertRaises(HTTPException) as cm:
             await gcp_resource_manager.list_google_cloud_regions()
@@ -184,8 +216,8 @@ class TestGcpUtils(unittest.IsolatedAsyncioTestCase):
         self.mock_logger.error.assert_called_once_with("Error: Could not parse the JSON output from the gcloud command.")
         self.mock_logger.exception.assert_not_called()
 
-    @patch('services.gcp_resource_manager.asyncio.to_thread', side_effect=Exception("Generic error"))
-    async def test_list_google_cloud_regions_general_exception(self, mock_to_thread):
+    @patch('services.gcp_resource_manager.asyncio.create_subprocess_exec', side_effect=Exception("Generic error"))
+    async def test_list_google_cloud_regions_general_exception(self, mock_create_subprocess_exec):
         """
         Test handling of a general unexpected Exception when listing regions.
         """
@@ -14,7 +14,7 @@
 
 import unittest
 import asyncio
-import json
+import orjson
 import logging
 from unittest.mock import MagicMock, AsyncMock, patch, call
 import httpx
@@ -24,6 +24,8 @@ import services.health_checks as hc
 class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
 
     def setUp(self):
+        hc.clear_health_cache()
+
         # Mock logging to capture output.
         self.mock_logger = patch('services.health_checks.logger').start()
         self.mock_logger.handlers = []
@@ -34,11 +36,24 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         self.mock_websocket = AsyncMock()
         self.mock_websocket.send_text = AsyncMock()
 
+        # The client stays connected until a test sets this event.
+        self.client_disconnected = asyncio.Event()
+
+        async def receive():
+            await self.client_disconnected.wait()
+            return {"type": "websocket.disconnect"}
+
+        self.mock_websocket.receive = AsyncMock(side_effect=receive)
+
         self.patcher_timeout = patch('services.health_checks.HealthCheckConstants.HEALTH_CHECK_TIMEOUT_SECONDS', 60)
         self.patcher_delay = patch('services.health_checks.HealthCheckConstants.HEALTH_CHECK_ATTEMPT_DELAY_SECONDS', 1)
         self.patcher_timeout.start()
         self.patcher_delay.start()
 
+        # Disable jitter so retry delays are deterministic.
+        self.mock_random = patch('services.health_checks.random').start()
+        self.mock_random.uniform.return_value = 0
+
     def tearDown(self):
         patch.stopall()
 
@@ -50,26 +65,26 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_client_instance = AsyncMock() 
-        mock_client_instance.get.return_value = mock_response
+        mock_client_instance.head.return_value = mock_response
 
-        result = await hc.perform_single_health_check(
-            "test_service", "test-url.com", self.mock_websocket, mock_client_instance
+        result, result_message = await hc.perform_single_health_check(
+            "test_service", "test-url.com", "https://test-url.com/health", mock_client_instance
         )
 
         expected_health_url = "https://test-url.com/health"
-        mock_client_instance.get.assert_called_once_with(expected_health_url)
+        mock_client_instance.head.assert_called_once_with(expected_health_url)
         self.assertTrue(result)
         self.mock_logger.info.assert_called_once_with(
             f"Health check for test_service at test-url.com (endpoint: {expected_health_url}) PASSED (HTTP 200)."
         )
-        self.mock_websocket.send_text.assert_called_once_with(json.dumps({
+        self.assertEqual(result_message, {
             "type": "success",
             "service": "test_service",
             "url": "test-url.com",
             "health_url": expected_health_url,
             "status_code": 200,
             "message": f"Health check for test_service at test-url.com (endpoint: {expected_health_url}) PASSED (HTTP 200)."
-        }))
+        })
         self.mock_logger.warning.assert_not_called()
         self.mock_logger.exception.assert_not_called()
 
@@ -82,10 +97,10 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         mock_response = MagicMock()
         mock_response.status_code = 404
         mock_client_instance = AsyncMock()
-        mock_client_instance.get.return_value = mock_response
+        mock_client_instance.head.return_value = mock_response
 
-        result = await hc.perform_single_health_check(
-            "test_service", "test-url.com", self.mock_websocket, mock_client_instance
+        result, result_message = await hc.perform_single_health_check(
+            "test_service", "test-url.com", "https://test-url.com/health", mock_client_instance
         )
 
         expected_health_url = "https://test-url.com/health"
@@ -93,14 +108,14 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         self.mock_logger.warning.assert_called_once_with(
             f"Health check for test_service at test-url.com (endpoint: {expected_health_url}) FAILED: HTTP 404."
         )
-        self.mock_websocket.send_text.assert_called_once_with(json.dumps({
+        self.assertEqual(result_message, {
             "type": "warning",
             "service": "test_service",
             "url": "test-url.com",
             "health_url": expected_health_url,
             "status_code": 404,
             "message": f"Health check for test_service at test-url.com (endpoint: {expected_health_url}) FAILED: HTTP 404."
-        }))
+        })
         self.mock_logger.info.assert_not_called()
         self.mock_logger.exception.assert_not_called()
 
@@ -110,19 +125,17 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         Test single health check handling httpx.RequestError.
         """
         mock_client_instance = AsyncMock()
-        mock_client_instance.get.side_effect = httpx.RequestError("Connection failed", request=httpx.Request("GET", "https://test-url.com/health")) 
+        mock_client_instance.head.side_effect = httpx.RequestError("Connection failed", request=httpx.Request("HEAD", "https://test-url.com/health")) 
 
-        result = await hc.perform_single_health_check(
-            "test_service", "test-url.com", self.mock_websocket, mock_client_instance
+        result, sent_message = await hc.perform_single_health_check(
+            "test_service", "test-url.com", "https://test-url.com/health", mock_client_instance
         )
 
         expected_health_url = "https://test-url.com/health"
         self.assertFalse(result)
         self.mock_logger.warning.assert_called_once()
         self.assertIn("FAILED: Request Error - Connection failed", self.mock_logger.warning.call_args[0][0])
-            
-        self.mock_websocket.send_text.assert_called_once()
-        sent_message = json.loads(self.mock_websocket.send_text.call_args[0][0])
+
         self.assertEqual(sent_message["type"], "warning")
         self.assertIn("FAILED: Request Error - Connection failed", sent_message["message"])
         self.assertEqual(sent_message["status_code"], None)
@@ -135,61 +148,352 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         Test single health check handling a general Exception.
         """
         mock_client_instance = AsyncMock()
-        mock_client_instance.get.side_effect = Exception("Unexpected error")
+        mock_client_instance.head.side_effect = Exception("Unexpected error")
 
-        result = await hc.perform_single_health_check(
-            "test_service", "test-url.com", self.mock_websocket, mock_client_instance
+        result, sent_message = await hc.perform_single_health_check(
+            "test_service", "test-url.com", "https://test-url.com/health", mock_client_instance
         )
 
         expected_health_url = "https://test-url.com/health"
         self.assertFalse(result)
         self.mock_logger.exception.assert_called_once_with(f"An unexpected error occurred during health check for test_service: Unexpected error.")
-        self.mock_websocket.send_text.assert_called_once()
-        sent_message = json.loads(self.mock_websocket.send_text.call_args[0][0])
         self.assertEqual(sent_message["type"], "error")
         self.assertIn("An unexpected error occurred during health check for test_service: Unexpected error.", sent_message["message"])
         self.assertEqual(sent_message["status_code"], None)
         self.mock_logger.info.assert_not_called()
         self.mock_logger.warning.assert_not_called()
 
+    def test_get_attempt_delay_backs_off_exponentially_up_to_the_cap(self):
+        """
+        Test that retry delays grow by the backoff factor and stop at the maximum delay.
+        """
+        with patch('services.health_checks.HealthCheckConstants.HEALTH_CHECK_ATTEMPT_DELAY_SECONDS', 10):
+            self.assertEqual(hc.get_attempt_delay(1), 10)
+            self.assertEqual(hc.get_attempt_delay(2), 15)
+            self.assertEqual(hc.get_attempt_delay(3), 22.5)
+            self.assertEqual(hc.get_attempt_delay(10), 60)
+
+    def test_get_attempt_delay_adds_jitter(self):
+        """
+        Test that random jitter within the configured bound is added to the delay.
+        """
+        self.mock_random.uniform.return_value = 2.5
+
+        self.assertEqual(hc.get_attempt_delay(1), 3.5)
+        self.mock_random.uniform.assert_called_once_with(0, 5.0)
+
+    async def test_perform_single_health_check_falls_back_to_get_on_405(self):
+        """
+        Test that a service rejecting HEAD requests is probed again with GET.
+        """
+        not_allowed_response = MagicMock()
+        not_allowed_response.status_code = 405
+        healthy_response = MagicMock()
+        healthy_response.status_code = 200
+        mock_client_instance = AsyncMock()
+        mock_client_instance.head.return_value = not_allowed_response
+        mock_client_instance.get.return_value = healthy_response
+
+        result, result_message = await hc.perform_single_health_check(
+            "test_service", "test-url.com", "https://test-url.com/health", mock_client_instance
+        )
+
+        self.assertTrue(result)
+        self.assertEqual(result_message["status_code"], 200)
+        mock_client_instance.head.assert_called_once_with("https://test-url.com/health")
+        mock_client_instance.get.assert_called_once_with("https://test-url.com/health")
+
+    async def test_run_websocket_health_check_probes_shared_url_once(self):
+        """
+        Test that services sharing a URL are checked with one request and each get a result.
+        """
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_client_instance = AsyncMock()
+        mock_client_instance.head.return_value = mock_response
+
+        await hc.run_websocket_health_check(
+            self.mock_websocket, {"BAP": "adapter.com", "BPP": "adapter.com"}, mock_client_instance
+        )
+
+        mock_client_instance.head.assert_called_once_with("https://adapter.com/health")
+        batch = orjson.loads(self.mock_websocket.send_text.call_args.args[0])
+        self.assertEqual(
+            sorted(m["service"] for m in batch["messages"] if m.get("service")),
+            ["BAP", "BPP"]
+        )
+        self.assertEqual(batch["messages"][-1]["action"], "all_services_healthy")
+
+    def test_build_health_url_strips_trailing_slash(self):
+        """
+        Test that the health endpoint is built from the base URL without a doubled slash.
+        """
+        self.assertEqual(hc.build_health_url("test-url.com/"), "https://test-url.com/health")
+        self.assertEqual(hc.build_health_url("test-url.com"), "https://test-url.com/health")
+
+    async def test_perform_single_health_check_reuses_recent_result(self):
+        """
+        Test that a second check of the same URL within the cache TTL does not hit the network.
+        """
+        mock_response = MagicMock()
+        mock_response.status_code = 503
+        mock_client_instance = AsyncMock()
+        mock_client_instance.head.return_value = mock_response
+
+        with patch('services.health_checks.time') as mock_time:
+            mock_time.monotonic.side_effect = [100.0, 100.5]
+            first, _ = await hc.perform_single_health_check("service_a", "test-url.com", "https://test-url.com/health", mock_client_instance)
+            second, second_message = await hc.perform_single_health_check("service_b", "test-url.com", "https://test-url.com/health", mock_client_instance)
+
+        self.assertFalse(first)
+        self.assertFalse(second)
+        self.assertEqual(second_message["service"], "service_b")
+        self.assertEqual(second_message["status_code"], 503)
+        mock_client_instance.head.assert_called_once_with("https://test-url.com/health")
+
+    async def test_perform_single_health_check_expired_result_is_refetched(self):
+        """
+        Test that a cached result older than the polling delay is not reused.
+        """
+        failing_response = MagicMock()
+        failing_response.status_code = 503
+        healthy_response = MagicMock()
+        healthy_response.status_code = 200
+        mock_client_instance = AsyncMock()
+        mock_client_instance.head.side_effect = [failing_response, healthy_response]
+
+        # The patched polling delay (1s) caps the cache TTL.
+        with patch('services.health_checks.time') as mock_time:
+            mock_time.monotonic.side_effect = [100.0, 101.0, 101.0]
+            first, _ = await hc.perform_single_health_check("service_a", "test-url.com", "https://test-url.com/health", mock_client_instance)
+            second, _ = await hc.perform_single_health_check("service_a", "test-url.com", "https://test-url.com/health", mock_client_instance)
+
+        self.assertFalse(first)
+        self.assertTrue(second)
+        self.assertEqual(mock_client_instance.head.call_count, 2)
+
+
+    async def test_perform_single_health_check_evicts_expired_results(self):
+        """
+        Test that storing a new result drops cached results older than the TTL.
+        """
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_client_instance = AsyncMock()
+        mock_client_instance.head.return_value = mock_response
+        hc._health_cache["https://stale-url.com/health"] = (200, 90.0)
+        hc._health_cache["https://recent-url.com/health"] = (503, 99.5)
+
+        with patch('services.health_checks.time') as mock_time:
+            mock_time.monotonic.return_value = 100.0
+            await hc.perform_single_health_check("service_a", "test-url.com", "https://test-url.com/health", mock_client_instance)
+
+        self.assertEqual(hc._health_cache, {
+            "https://recent-url.com/health": (503, 99.5),
+            "https://test-url.com/health": (200, 100.0),
+        })
 
     async def test_run_websocket_health_check_invalid_input(self):
         """
         Test run_websocket_health_check with invalid input type.
         """
-        await hc.run_websocket_health_check(self.mock_websocket, "not_a_dict")
+        await hc.run_websocket_health_check(self.mock_websocket, "not_a_dict", AsyncMock())
 
         self.mock_logger.error.assert_called_once_with("Invalid payload format received for healthCheck in service.")
-        self.mock_websocket.send_text.assert_called_once_with(json.dumps({
+        self.mock_websocket.send_text.assert_called_once_with(orjson.dumps({
             "type": "error",
             "message": "Invalid payload format. Expected a dictionary of serviceName: serviceUrl strings."
-        }))
+        }).decode())
+
+    async def test_run_websocket_health_check_too_many_services(self):
+        """
+        Test run_websocket_health_check rejects a service map above the size limit.
+        """
+        service_urls = {f"service_{i}": f"url-{i}.com" for i in range(65)}
+        mock_client_instance = AsyncMock()
+
+        await hc.run_websocket_health_check(self.mock_websocket, service_urls, mock_client_instance)
+
+        self.mock_logger.error.assert_called_once_with("Rejected healthCheck request with 65 services.")
+        self.mock_websocket.send_text.assert_called_once_with(orjson.dumps({
+            "type": "error",
+            "message": "Too many service URLs. At most 64 can be checked at once."
+        }).decode())
+        mock_client_instance.head.assert_not_called()
+
+    @patch('services.health_checks.perform_single_health_check')
+    async def test_run_websocket_health_check_limits_concurrent_probes(self, mock_perform_single_health_check):
+        """
+        Test that no more than the configured number of probes run at the same time.
+        """
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow_check(service_name, base_url, health_url, client):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0)
+            in_flight -= 1
+            return True, {"type": "success", "service": service_name}
+
+        mock_perform_single_health_check.side_effect = slow_check
+        service_urls = {f"service_{i}": f"url-{i}.com" for i in range(10)}
+
+        with patch('services.health_checks.HealthCheckConstants.HEALTH_CHECK_MAX_CONCURRENT_PROBES', 3):
+            await hc.run_websocket_health_check(self.mock_websocket, service_urls, AsyncMock())
+
+        self.assertEqual(mock_perform_single_health_check.call_count, 10)
+        self.assertEqual(max_in_flight, 3)
+
+    @patch('services.health_checks.perform_single_health_check')
+    async def test_run_websocket_health_check_sends_results_as_they_finish(self, mock_perform_single_health_check):
+        """
+        Test that a fast service's result is sent without waiting for a slow service.
+        """
+        release_slow_check = asyncio.Event()
+
+        async def check(service_name, base_url, health_url, client):
+            if service_name == "slow_service":
+                await release_slow_check.wait()
+            return True, {"type": "success", "service": service_name}
+
+        mock_perform_single_health_check.side_effect = check
+        service_urls = {"slow_service": "url-slow.com", "fast_service": "url-fast.com"}
+
+        with patch('services.health_checks.time') as mock_time:
+            mock_time.monotonic.return_value = 0
+            health_check = asyncio.create_task(
+                hc.run_websocket_health_check(self.mock_websocket, service_urls, AsyncMock())
+            )
+            while self.mock_websocket.send_text.call_count < 2:
+                await asyncio.sleep(0)
+            self.assertEqual(orjson.loads(self.mock_websocket.send_text.call_args.args[0]), {
+                "type": "batch",
+                "messages": [
+                    {"type": "log", "message": "Attempt 1: Checking 2 service URL(s) for health... (0s elapsed / 60s timeout)"},
+                    {"type": "success", "service": "fast_service"},
+                ]
+            })
+            release_slow_check.set()
+            await health_check
+
+        self.assertEqual(orjson.loads(self.mock_websocket.send_text.call_args.args[0]), {
+            "type": "batch",
+            "messages": [
+                {"type": "success", "service": "slow_service"},
+                {"type": "success", "action": "all_services_healthy", "message": "All deployed service URLs are now healthy and reachable!"},
+            ]
+        })
+        self.assertEqual(self.mock_websocket.send_text.call_count, 3)
+
+    @patch('services.health_checks.perform_single_health_check')
+    async def test_run_websocket_health_check_stops_when_client_disconnects(self, mock_perform_single_health_check):
+        """
+        Test that in-flight probes are cancelled and no further frames are sent after a disconnect.
+        """
+        probe_cancelled = asyncio.Event()
+
+        async def hanging_check(service_name, base_url, health_url, client):
+            self.client_disconnected.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                probe_cancelled.set()
+                raise
+
+        mock_perform_single_health_check.side_effect = hanging_check
+
+        await hc.run_websocket_health_check(self.mock_websocket, {"service_a": "url-a.com"}, AsyncMock())
+
+        self.assertTrue(probe_cancelled.is_set())
+        self.mock_logger.info.assert_any_call("Client disconnected during health checks. Cancelled pending checks.")
+        # Only the initial info frame was sent before the client went away.
+        self.assertEqual(self.mock_websocket.send_text.call_count, 1)
+
+    async def test_run_websocket_health_check_cancel_cancels_request(self):
+        """
+        Test that cancelling the health check also cancels the shared request to the service.
+        """
+        request_started = asyncio.Event()
+        request_cancelled = asyncio.Event()
+
+        async def hanging_head(url):
+            request_started.set()
+            try:
+                await asyncio.Event().wait()
+            except asyncio.CancelledError:
+                request_cancelled.set()
+                raise
+
+        mock_client_instance = AsyncMock()
+        mock_client_instance.head.side_effect = hanging_head
+
+        health_check = asyncio.create_task(hc.run_websocket_health_check(
+            self.mock_websocket, {"BAP": "adapter.com", "BPP": "adapter.com"}, mock_client_instance
+        ))
+        await request_started.wait()
+        health_check.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await health_check
+        await asyncio.wait_for(request_cancelled.wait(), timeout=1)
+
+        mock_client_instance.head.assert_called_once_with("https://adapter.com/health")
+        self.assertEqual(hc._inflight_probes, {})
+
+    async def test_get_health_status_code_keeps_request_for_remaining_waiter(self):
+        """
+        Test that a shared request keeps running while another check still waits on it.
+        """
+        release_response = asyncio.Event()
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+
+        async def slow_head(url):
+            await release_response.wait()
+            return mock_response
+
+        mock_client_instance = AsyncMock()
+        mock_client_instance.head.side_effect = slow_head
+
+        first = asyncio.create_task(hc._get_health_status_code("https://adapter.com/health", mock_client_instance))
+        second = asyncio.create_task(hc._get_health_status_code("https://adapter.com/health", mock_client_instance))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        release_response.set()
+
+        self.assertEqual(await second, 200)
+        self.assertTrue(first.cancelled())
+        mock_client_instance.head.assert_called_once_with("https://adapter.com/health")
 
     async def test_run_websocket_health_check_empty_services(self):
         """
         Test run_websocket_health_check with an empty dictionary of services.
         """
-        await hc.run_websocket_health_check(self.mock_websocket, {})
+        await hc.run_websocket_health_check(self.mock_websocket, {}, AsyncMock())
 
         self.mock_logger.warning.assert_called_once_with("No service URLs provided for health check.")
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({
             "type": "info",
             "message": "Starting health checks for provided service URLs..."
-        }))
-        self.mock_websocket.send_text.assert_called_with(json.dumps({
+        }).decode())
+        self.mock_websocket.send_text.assert_called_with(orjson.dumps({
             "type": "warning",
             "message": "No service URLs provided for health check. Health check skipped."
-        }))
+        }).decode())
         self.assertEqual(self.mock_websocket.send_text.call_count, 2)
 
 
     @patch('services.health_checks.perform_single_health_check', new_callable=AsyncMock)
-    @patch('httpx.AsyncClient')
-    async def test_run_websocket_health_check_all_healthy_first_attempt(self, MockAsyncClient, mock_perform_single_health_check):
+    async def test_run_websocket_health_check_all_healthy_first_attempt(self, mock_perform_single_health_check):
         """
         Test run_websocket_health_check where all services are healthy on the first attempt.
         """
-        mock_perform_single_health_check.return_value = True
+        mock_perform_single_health_check.side_effect = [
+            (True, {"type": "success", "service": "service_a", "message": "a passed"}),
+            (True, {"type": "success", "service": "service_b", "message": "b passed"}),
+        ]
 
         service_urls = {
             "service_a": "url-a.com",
@@ -197,62 +501,56 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         }
 
         mock_client_instance = AsyncMock()
-        MockAsyncClient.return_value.__aenter__.return_value = mock_client_instance
 
-        # Mock event loop time for consistent elapsed_time.
+        # Mock the monotonic clock for consistent elapsed_time.
         # start_time = 0
         # current_time for first log = 0
-        mock_loop = MagicMock()
-        mock_loop.time.side_effect = [0, 0] 
-        with patch('asyncio.get_event_loop', return_value=mock_loop):
-            await hc.run_websocket_health_check(self.mock_websocket, service_urls)
+        with patch('services.health_checks.time') as mock_time:
+            mock_time.monotonic.side_effect = [0, 0]
+            await hc.run_websocket_health_check(self.mock_websocket, service_urls, mock_client_instance)
 
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({
             "type": "info",
             "message": "Starting health checks for provided service URLs..."
-        }))
+        }).decode())
         self.mock_logger.info.assert_any_call("Starting comprehensive health checks for: service_a, service_b")
 
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
-            "type": "log",
-            "message": "Attempt 1: Checking 2 service URL(s) for health... (0s elapsed / 60s timeout)"
-        }))
         self.mock_logger.info.assert_any_call("Attempt 1: Checking 2 services. Elapsed: 0s.")
 
         # Verify individual health checks were called (2 calls for 2 services).
         self.assertEqual(mock_perform_single_health_check.call_count, 2)
-        mock_perform_single_health_check.assert_any_call(
-            "service_a", "url-a.com", self.mock_websocket, mock_client_instance
-        )
-        mock_perform_single_health_check.assert_any_call(
-            "service_b", "url-b.com", self.mock_websocket, mock_client_instance
-        )
-
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
-            "type": "success",
-            "action": "all_services_healthy",
-            "message": "All deployed service URLs are now healthy and reachable!"
-        }))
+        mock_perform_single_health_check.assert_any_call("service_a", "url-a.com", "https://url-a.com/health", mock_client_instance)
+        mock_perform_single_health_check.assert_any_call("service_b", "url-b.com", "https://url-b.com/health", mock_client_instance)
+
+        # The attempt log, both results and the final success are sent together in one batch frame.
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({
+            "type": "batch",
+            "messages": [
+                {"type": "log", "message": "Attempt 1: Checking 2 service URL(s) for health... (0s elapsed / 60s timeout)"},
+                {"type": "success", "service": "service_a", "message": "a passed"},
+                {"type": "success", "service": "service_b", "message": "b passed"},
+                {"type": "success", "action": "all_services_healthy", "message": "All deployed service URLs are now healthy and reachable!"},
+            ]
+        }).decode())
         self.mock_logger.info.assert_any_call("All services are healthy.")
         self.mock_logger.warning.assert_not_called() # No pending services
         self.mock_logger.error.assert_not_called()
             
-        # Total send_text calls: 1 (initial info) + 1 (attempt log) + 1 (final success) = 3
-        self.assertEqual(self.mock_websocket.send_text.call_count, 3)
+        # Total send_text calls: 1 (initial info) + 1 (attempt batch) = 2
+        self.assertEqual(self.mock_websocket.send_text.call_count, 2)
 
 
     @patch('services.health_checks.perform_single_health_check', new_callable=AsyncMock)
-    @patch('httpx.AsyncClient')
     @patch('asyncio.sleep', new_callable=AsyncMock)
-    async def test_run_websocket_health_check_multiple_attempts(self, mock_sleep, MockAsyncClient, mock_perform_single_health_check):
+    async def test_run_websocket_health_check_multiple_attempts(self, mock_sleep, mock_perform_single_health_check):
         """
         Test run_websocket_health_check where services become healthy over multiple attempts.
         """
         # Mock perform_single_health_check to pass service_b on first attempt, service_a on second.
         mock_perform_single_health_check.side_effect = [
-            False,
-            True,
-            True
+            (False, {"type": "warning", "service": "service_a"}),
+            (True, {"type": "success", "service": "service_b"}),
+            (True, {"type": "success", "service": "service_a"}),
         ]
             
         service_urls = {
@@ -260,40 +558,42 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
             "service_b": "url-b.com"
         }
         mock_client_instance = AsyncMock()
-        MockAsyncClient.return_value.__aenter__.return_value = mock_client_instance
 
-        # Mock event loop time
+        # Mock the monotonic clock
         # Sequence:
         # 0: start_time
         # 0: current_time (Attempt 1 log)
         # 1: current_time (Attempt 2 log, after 1 sec sleep)
-        mock_loop = MagicMock()
-        mock_loop.time.side_effect = [0, 0, 1] 
-        with patch('asyncio.get_event_loop', return_value=mock_loop):
-            await hc.run_websocket_health_check(self.mock_websocket, service_urls)
+        with patch('services.health_checks.time') as mock_time:
+            mock_time.monotonic.side_effect = [0, 0, 1]
+            await hc.run_websocket_health_check(self.mock_websocket, service_urls, mock_client_instance)
 
         self.mock_logger.info.assert_any_call("Starting comprehensive health checks for: service_a, service_b")
 
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
-            "type": "log", "message": "Attempt 1: Checking 2 service URL(s) for health... (0s elapsed / 60s timeout)"
-        }))
         self.mock_logger.info.assert_any_call("Attempt 1: Checking 2 services. Elapsed: 0s.")
 
         # Expect one service to be reported unhealthy (service_a).
         self.mock_logger.warning.assert_any_call("1 services still pending health check. Retrying...")
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
-            "type": "log", "message": "1 service URL(s) are not yet healthy. Retrying in 1 seconds..."
-        }))
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({
+            "type": "batch",
+            "messages": [
+                {"type": "log", "message": "Attempt 1: Checking 2 service URL(s) for health... (0s elapsed / 60s timeout)"},
+                {"type": "warning", "service": "service_a"},
+                {"type": "success", "service": "service_b"},
+                {"type": "log", "message": "1 service URL(s) are not yet healthy. Retrying in 1 seconds..."},
+            ]
+        }).decode())
         mock_sleep.assert_called_once_with(1) # Assert delay
 
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
-            "type": "log", "message": "Attempt 2: Checking 1 service URL(s) for health... (1s elapsed / 60s timeout)"
-        }))
         self.mock_logger.info.assert_any_call("Attempt 2: Checking 1 services. Elapsed: 1s.")
-
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
-            "type": "success", "action": "all_services_healthy", "message": "All deployed service URLs are now healthy and reachable!"
-        }))
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({
+            "type": "batch",
+            "messages": [
+                {"type": "log", "message": "Attempt 2: Checking 1 service URL(s) for health... (1s elapsed / 60s timeout)"},
+                {"type": "success", "service": "service_a"},
+                {"type": "success", "action": "all_services_healthy", "message": "All deployed service URLs are now healthy and reachable!"},
+            ]
+        }).decode())
         self.mock_logger.info.assert_any_call("All services are healthy.")
 
         self.assertEqual(mock_perform_single_health_check.call_count, 3) # 2 on first, 1 on second
@@ -301,32 +601,27 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
             
         # Total send_text calls:
         # 1 (initial info)
-        # 1 (attempt 1 log)
-        # 1 (pending message after attempt 1)
-        # 1 (attempt 2 log)
-        # 1 (final success)
-        # Total = 5
-        self.assertEqual(self.mock_websocket.send_text.call_count, 5)
+        # 1 (attempt 1 batch)
+        # 1 (attempt 2 batch)
+        # Total = 3
+        self.assertEqual(self.mock_websocket.send_text.call_count, 3)
 
 
     @patch('services.health_checks.perform_single_health_check', new_callable=AsyncMock)
-    @patch('httpx.AsyncClient')
     @patch('asyncio.sleep', new_callable=AsyncMock)
-    async def test_run_websocket_health_check_timeout(self, mock_sleep, MockAsyncClient, mock_perform_single_health_check):
+    async def test_run_websocket_health_check_timeout(self, mock_sleep, mock_perform_single_health_check):
         """
         Test run_websocket_health_check where the health checks time out.
         """
-        mock_perform_single_health_check.return_value = False
+        mock_perform_single_health_check.return_value = (False, {"type": "warning", "service": "service_a"})
             
         service_urls = {
             "service_a": "url-a.com"
         }
 
-        # Mock the AsyncClient context manager entry
         mock_client_instance = AsyncMock()
-        MockAsyncClient.return_value.__aenter__.return_value = mock_client_instance
 
-        # Mock event loop time to simulate timeout (patched timeout is 60s, delay is 1s)
+        # Mock the monotonic clock to simulate timeout (patched timeout is 60s, delay is 1s)
         # Sequence of time calls needed:
         # 1. start_time (0)
         # 2. current_time for Attempt 1 log (0)
@@ -335,17 +630,15 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         # 62. current_time for Attempt 61 log (60) after 60th sleep
         # 63. current_time that triggers timeout (61) after 61st sleep
         # So, we need 63 values in total for side_effect: [0, 0, 1, ..., 61]
-        mock_loop = MagicMock()
-        mock_loop.time.side_effect = [0] + list(range(62)) 
-        
-        with patch('asyncio.get_event_loop', return_value=mock_loop):
-            await hc.run_websocket_health_check(self.mock_websocket, service_urls)
+        with patch('services.health_checks.time') as mock_time:
+            mock_time.monotonic.side_effect = [0] + list(range(62))
+            await hc.run_websocket_health_check(self.mock_websocket, service_urls, mock_client_instance)
 
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
+        self.mock_websocket.send_text.assert_any_call(orjson.dumps({
             "type": "error",
             "action": "health_check_timeout",
             "message": "Health checks timed out after 61 seconds (1.0 minutes). The following service URLs are still unhealthy: service_a"
-        }))
+        }).decode())
         self.mock_logger.error.assert_called_once_with("Health checks timed out. Unhealthy services: service_a")
             
         self.assertEqual(mock_sleep.call_count, 61)
@@ -358,16 +651,14 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
             
         # Expected WebSocket send_text calls:
         # 1 (initial info)
-        # 61 * (1 attempt log) = 61 messages (for attempts 1 to 61)
-        # 61 * (1 pending message) = 61 messages (sent after each of the 61 failed attempts)
+        # 61 * (1 attempt batch) = 61 messages (for attempts 1 to 61)
         # 1 (Timeout error message)
-        # Total = 1 + 61 + 61 + 1 = 124
-        self.assertEqual(self.mock_websocket.send_text.call_count, 124)
+        # Total = 1 + 61 + 1 = 63
+        self.assertEqual(self.mock_websocket.send_text.call_count, 63)
 
 
     @patch('services.health_checks.perform_single_health_check', new_callable=AsyncMock)
-    @patch('httpx.AsyncClient')
-    async def test_run_websocket_health_check_general_exception_in_loop(self, MockAsyncClient, mock_perform_single_health_check):
+    async def test_run_websocket_health_check_general_exception_in_loop(self, mock_perform_single_health_check):
         """
         Test run_websocket_health_check handling a general Exception within the polling loop.
         """
@@ -378,27 +669,21 @@ class TestHealthChecks(unittest.IsolatedAsyncioTestCase):
         }
 
         mock_client_instance = AsyncMock()
-        MockAsyncClient.return_value.__aenter__.return_value = mock_client_instance
 
-        # Mock event loop time for consistent elapsed_time
+        # Mock the monotonic clock for consistent elapsed_time
         # start_time = 0, current_time = 0 for the first log.
-        mock_loop = MagicMock()
-        mock_loop.time.side_effect = [0, 0] 
-        with patch('asyncio.get_event_loop', return_value=mock_loop):
+        with patch('services.health_checks.time') as mock_time:
+            mock_time.monotonic.side_effect = [0, 0]
             with self.assertRaises(Exception) as cm:
-                await hc.run_websocket_health_check(self.mock_websocket, service_urls)
+                await hc.run_websocket_health_check(self.mock_websocket, service_urls, mock_client_instance)
 
         self.assertEqual(str(cm.exception), "Loop error")
         self.mock_logger.exception.assert_called_once_with("An unexpected error occurred within run_websocket_health_check: Loop error")
-        # Assert initial info and attempt logs are called before the error.
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
+        # Only the initial info is sent; the attempt batch is lost with the error.
+        self.mock_websocket.send_text.assert_called_once_with(orjson.dumps({
             "type": "info",
             "message": "Starting health checks for provided service URLs..."
-        }))
-        self.mock_websocket.send_text.assert_any_call(json.dumps({
-            "type": "log",
-            "message": "Attempt 1: Checking 1 service URL(s) for health... (0s elapsed / 60s timeout)"
-        }))
+        }).decode())
         self.mock_logger.error.assert_not_called()
         self.mock_logger.warning.assert_not_called()
 
@@ -12,16 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import json
+import orjson
 import unittest
 from unittest.mock import patch, mock_open, MagicMock
 import os
 
 # Import the functions and logger to be tested
-from services.ui_state_manager import load_all_data, _save_data, store_bulk_values, logger, _get_db_file_path
+from services.ui_state_manager import load_all_data, _save_data, store_bulk_values, logger, _get_db_file_path, clear_state_cache
 
 class TestUIStateManager(unittest.TestCase):
 
+    def setUp(self):
+        clear_state_cache()
+
     @patch('services.ui_state_manager._get_db_file_path', return_value='dummy/path/ui_state.json')
     def test_load_all_data_file_not_found(self, mock_get_path):
         """
@@ -57,7 +60,7 @@ class TestUIStateManager(unittest.TestCase):
             expected = {"key1": "value1", "key2": 42}
             self.assertEqual(result, expected)
             # Ensure the file was opened for reading
-            m.assert_called_once_with('dummy/path/ui_state.json', 'r')
+            m.assert_called_once_with('dummy/path/ui_state.json', 'rb')
 
     @patch('services.ui_state_manager._get_db_file_path', return_value='dummy/path/ui_state.json')
     def test_load_all_data_json_decode_error(self, mock_get_path):
@@ -102,18 +105,17 @@ class TestUIStateManager(unittest.TestCase):
         m = mock_open()
         data_to_save = {"user": "test", "is_active": True}
         
-        with patch('builtins.open', m):
+        with patch('builtins.open', m), \
+             patch('os.replace') as mock_replace:
             _save_data(data_to_save)
             
-            # Check that the file was opened in write mode
-            m.assert_called_once_with('dummy/path/ui_state.json', 'w')
+            # Check that a temporary file was opened in binary write mode and moved into place
+            m.assert_called_once_with('dummy/path/ui_state.json.tmp', 'wb')
+            mock_replace.assert_called_once_with('dummy/path/ui_state.json.tmp', 'dummy/path/ui_state.json')
             
-            # json.dump with an indent calls write multiple times.
-            # We can get the handle from the mock and check the full content written.
+            # The compact JSON document is written in a single call.
             handle = m()
-            written_content = "".join(call.args[0] for call in handle.write.call_args_list)
-            expected_json_string = json.dumps(data_to_save, indent=4)
-            self.assertEqual(written_content, expected_json_string)
+            handle.write.assert_called_once_with(orjson.dumps(data_to_save))
 
     @patch('services.ui_state_manager._get_db_file_path', return_value='dummy/path/ui_state.json')
     def test_save_data_io_error(self, mock_get_path):
@@ -125,8 +127,25 @@ class TestUIStateManager(unittest.TestCase):
         m.side_effect = IOError("Permission denied")
 
         with patch('builtins.open', m), \
+             patch('os.replace') as mock_replace, \
+             patch('os.unlink') as mock_unlink, \
              self.assertRaises(IOError):
             _save_data({"key": "value"})
+        # The existing state file is never replaced by a failed write, and the temporary file is removed.
+        mock_replace.assert_not_called()
+        mock_unlink.assert_called_once_with('dummy/path/ui_state.json.tmp')
+
+    @patch('services.ui_state_manager._get_db_file_path', return_value='dummy/path/ui_state.json')
+    def test_save_data_replace_error_removes_temp_file(self, mock_get_path):
+        """
+        Test that a failed rename removes the temporary file and re-raises the error.
+        """
+        with patch('builtins.open', mock_open()), \
+             patch('os.replace', side_effect=OSError("Read-only file system")), \
+             patch('os.unlink') as mock_unlink, \
+             self.assertRaisesRegex(OSError, "Read-only file system"):
+            _save_data({"key": "value"})
+        mock_unlink.assert_called_once_with('dummy/path/ui_state.json.tmp')
 
     @patch('services.ui_state_manager._save_data')
     @patch('services.ui_state_manager.load_all_data')
@@ -156,6 +175,46 @@ class TestUIStateManager(unittest.TestCase):
         }
         mock_save_data.assert_called_once_with(expected_data_to_save)
 
+    @patch('services.ui_state_manager._get_db_file_path', return_value='dummy/path/ui_state.json')
+    def test_load_all_data_reads_file_once(self, mock_get_path):
+        """
+        Test that repeated loads are served from memory and return independent copies.
+        """
+        mock_json_content = '{"key1": "value1"}'
+        m = mock_open(read_data=mock_json_content)
+
+        with patch('os.path.exists', return_value=True), \
+             patch('os.path.getsize', return_value=len(mock_json_content)), \
+             patch('builtins.open', m):
+            first = load_all_data()
+            first["key1"] = "mutated"
+            second = load_all_data()
+
+        m.assert_called_once_with('dummy/path/ui_state.json', 'rb')
+        self.assertEqual(second, {"key1": "value1"})
+
+    @patch('services.ui_state_manager._save_data')
+    @patch('services.ui_state_manager._read_state_file', return_value={"existing_key": "old_value"})
+    def test_store_bulk_values_updates_cache(self, mock_read_file, mock_save_data):
+        """
+        Test that stored values are visible to later loads without re-reading the file.
+        """
+        store_bulk_values({"new_key": "new_value"})
+
+        self.assertEqual(load_all_data(), {"existing_key": "old_value", "new_key": "new_value"})
+        mock_read_file.assert_called_once()
+
+    @patch('services.ui_state_manager._save_data', side_effect=IOError("Disk full"))
+    @patch('services.ui_state_manager._read_state_file', return_value={"existing_key": "old_value"})
+    def test_store_bulk_values_failed_save_keeps_cache(self, mock_read_file, mock_save_data):
+        """
+        Test that a failed write does not leave unsaved values in the cache.
+        """
+        with self.assertRaises(IOError):
+            store_bulk_values({"new_key": "new_value"})
+
+        self.assertEqual(load_all_data(), {"existing_key": "old_value"})
+
     def test_get_db_file_path_constructs_correctly(self):
         """
         Test that _get_db_file_path returns the correct path.
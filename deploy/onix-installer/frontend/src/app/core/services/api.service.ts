@@ -39,7 +39,8 @@ export class ApiService {
 
   subscribeToNetwork(payload: any): Observable<any> {
     const subscribeUrl = `${this.apiUrl}api/dynamic-proxy`;
-    return this.http.post(subscribeUrl, payload);
+    // The backend relays the target's raw response body, so read it as text.
+    return this.http.post(subscribeUrl, payload, { responseType: 'text' });
   }
 
     getState(): Observable<any> {
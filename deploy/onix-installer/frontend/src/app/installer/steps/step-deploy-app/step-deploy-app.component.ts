@@ -686,11 +686,14 @@ export class StepAppDeployComponent implements OnInit, OnDestroy {
     }
 
     console.log('Received parsed message for app deployment:', parsedMessage);
-    const { type, action, message: msgContent, data } = parsedMessage;
+    const { type, action, message: msgContent, messages, data } = parsedMessage;
     switch (type) {
       case 'log':
         this.appDeploymentLogs.push(msgContent);
         break;
+      case 'log_batch':
+        this.appDeploymentLogs.push(...(messages || []));
+        break;
       case 'success':
        this.installerStateService.updateAppDeploymentStatus('completed');
         this.appDeploymentLogs.push('Application Deployment Completed Successfully!');
@@ -210,6 +210,11 @@ export class StepDeployInfraComponent implements OnInit, OnDestroy {
       case 'log':
         this.installerStateService.addDeploymentLog(parsedMessage.message);
         break;
+      case 'log_batch':
+        for (const line of parsedMessage.messages || []) {
+          this.installerStateService.addDeploymentLog(line);
+        }
+        break;
       case 'success':
         this.installerStateService.updateDeploymentStatus('completed');
         this.installerStateService.addDeploymentLog('Infrastructure Deployment Completed Successfully!');
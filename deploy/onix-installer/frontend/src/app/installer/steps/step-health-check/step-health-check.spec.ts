@@ -139,6 +139,23 @@ describe('StepHealthCheck', () => {
     expect(component.logMessages).toContain('Gateway is healthy');
   });
 
+  it('should handle each service result inside a batch message from WebSocket', () => {
+    component.runHealthCheck();
+    webSocketService.receiveMessage({
+      type: 'batch',
+      messages: [
+        { service: 'Gateway', type: 'success', message: 'Gateway is healthy' },
+        { service: 'Registry', type: 'error', message: 'Registry connection failed' },
+      ],
+    });
+    fixture.detectChanges();
+
+    expect(component.checkResults.find(c => c.name === 'Gateway')?.status).toBe('success');
+    expect(component.checkResults.find(c => c.name === 'Registry')?.status).toBe('failed');
+    expect(component.logMessages).toContain('Gateway is healthy');
+    expect(component.logMessages).toContain('Registry connection failed');
+  });
+
   it('should handle individual service error message from WebSocket', () => {
     component.runHealthCheck();
     const errorMessage = { service: 'Registry', type: 'error', message: 'Registry connection failed' };
@@ -141,6 +141,12 @@ export class StepHealthCheck implements OnInit, OnDestroy {
     return;
   }
 
+  // The results of one polling attempt arrive together in a single 'batch' message.
+  if (message.type === 'batch') {
+    (message.messages || []).forEach((batchedMessage: any) => this.handleWebSocketMessage(batchedMessage));
+    return;
+  }
+
   console.log('Received from WS:', message);
 
   if (message.service) {